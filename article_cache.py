@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from urllib.parse import urlsplit, urlunsplit
+from http_cache import body_fingerprint
+
+ARTICLE_CACHE_DIR = "article_cache"
+
+def canonical_url(url: str) -> str:
+    """
+    规范化 URL 作为缓存键：scheme/host 小写、去掉默认端口和 #片段。
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+    return urlunsplit((scheme, host, parts.path or "/", parts.query, ""))
+
+class ArticleCache:
+    """
+    已提取正文的本地缓存，按规范化 URL 存放 (article_cache/xx/<sha1>.json)：
+    - content: 各提取模式的结果 ("markdown" 为文本，"dom" 为 html_walker 文档块)，图片只保存地址；
+    - etag / last_modified / fingerprint: 详情页的验证器与规范化正文指纹。
+    ttl 秒内直接使用缓存，不发请求；过期后发送条件请求，304 或正文指纹未变时沿用缓存的提取结果
+    (不再解析)，否则重新提取并覆盖。ttl=None 表示永不过期 (完全离线重建)。
+    """
+    def __init__(self, directory: str = ARTICLE_CACHE_DIR, ttl: float = 7 * 24 * 3600):
+        self.directory = directory
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def _path(self, url: str) -> str:
+        digest = hashlib.sha1(canonical_url(url).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], f"{digest}.json")
+
+    def _load(self, url: str):
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # 不同 URL 的哈希碰撞或手工修改过的文件，当作未命中
+        return entry if entry.get("url") == canonical_url(url) else None
+
+    def _store(self, url: str, entry: dict):
+        path = self._path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp{threading.get_ident()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def fetch(self, url: str, mode: str, fetcher, extractor):
+        """
+        返回 url 在 mode 提取模式下的正文。
+        fetcher(headers) -> FetchResult: 请求详情页 (headers 为条件请求头，可能为空)；
+        extractor(html) -> 正文: 解析并提取。
+        抓取失败 (非 200/304) 时抛出 HTTPError，由调用方处理。
+        """
+        content, pending = self.prepare(url, mode, fetcher)
+        if pending is None:
+            return content
+        return self.complete(pending, extractor(pending.html))
+
+    def prepare(self, url: str, mode: str, fetcher):
+        """
+        fetch() 的网络部分：返回 (正文, None) 表示可以沿用缓存；
+        返回 (None, pending) 表示需要提取 pending.html，提取结果交给 complete() 写回缓存。
+        提取可以放到其他线程或进程中进行，不必占用请求的并发名额。
+        """
+        entry = self._load(url)
+        cached = entry["content"].get(mode) if entry else None
+        if cached is not None and (self.ttl is None or time.time() - entry.get("checked_at", 0) < self.ttl):
+            self._count("hits")
+            return _restore(cached), None
+
+        # 缓存中没有这种模式的结果时只能完整抓取 (304 没有正文可供提取)
+        headers = {}
+        if cached is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        result = fetcher(headers)
+        if cached is not None and result.status_code == 304:
+            self._count("revalidated")
+            entry["checked_at"] = time.time()
+            self._store(url, entry)
+            return _restore(cached), None
+        result.raise_for_status()
+
+        fingerprint = body_fingerprint(result.content)
+        if cached is not None and entry.get("fingerprint") == fingerprint:
+            # 服务器不支持条件请求，但正文没有变化
+            self._count("revalidated")
+            entry.update(checked_at=time.time(), etag=result.headers.get("ETag"), last_modified=result.headers.get("Last-Modified"))
+            self._store(url, entry)
+            return _restore(cached), None
+
+        self._count("misses")
+        return None, _PendingArticle(url, mode, entry, result, fingerprint)
+
+    def complete(self, pending, content):
+        """
+        把 prepare() 返回的待提取页面的提取结果写入缓存，返回 content。
+        """
+        entry = pending.entry
+        if entry is None or entry.get("fingerprint") != pending.fingerprint:
+            # 页面有变化时丢弃其他模式的旧结果
+            entry = {"url": canonical_url(pending.url), "content": {}}
+        entry.update(
+            etag=pending.result.headers.get("ETag"),
+            last_modified=pending.result.headers.get("Last-Modified"),
+            fingerprint=pending.fingerprint,
+            checked_at=time.time(),
+        )
+        entry["content"][pending.mode] = content
+        self._store(pending.url, entry)
+        return content
+
+    def summary(self) -> str:
+        with self._lock:
+            return f"命中 {self.hits}，重新验证 {self.revalidated}，重新提取 {self.misses}"
+
+class _PendingArticle:
+    """
+    prepare() 抓取到、等待提取的详情页。
+    """
+    def __init__(self, url, mode, entry, result, fingerprint):
+        self.url = url
+        self.mode = mode
+        self.entry = entry
+        self.result = result
+        self.fingerprint = fingerprint
+
+    @property
+    def html(self) -> str:
+        return self.result.text()
+
+def _restore(content):
+    # JSON 中的文档块是列表，还原为与 html_walker 输出一致的元组
+    if isinstance(content, list):
+        return [tuple(block) for block in content]
+    return content
+
+# 进程内共享的默认正文缓存
+_default_article_cache = None
+_default_article_cache_lock = threading.Lock()
+
+def get_default_article_cache() -> ArticleCache:
+    global _default_article_cache
+    with _default_article_cache_lock:
+        if _default_article_cache is None:
+            _default_article_cache = ArticleCache()
+        return _default_article_cache
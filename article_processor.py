@@ -7,14 +7,21 @@ except ImportError:
     messagebox = None
 import os
 import re
-import requests
-from bs4 import BeautifulSoup
 from markdownify import markdownify as md
 from docx import Document
 from docx.shared import Pt, Inches
 import time
 import io
-from urllib.parse import urljoin
+import zlib
+from http_client import HttpClient, get_default_client
+from rate_limiter import get_default_rate_limiter
+from retry_policy import get_default_retry_policy
+from image_cache import get_default_image_cache
+from article_cache import get_default_article_cache
+from image_pipeline import ImageOptimizer, HAS_PIL
+from content_extractor import extract_content_node, get_default_scrubber
+from extraction_profiles import get_default_profiles
+from html_walker import PARAGRAPH, IMAGE, TABLE, html_to_blocks, blocks_image_srcs, blocks_text
 
 def parse_txt_file(filepath):
     """
@@ -67,136 +74,150 @@ def parse_txt_file(filepath):
             
     return items
 
-def fetch_article_content(url):
+def fetch_article_content(url, client=None, raise_errors=False, extract_mode="markdown", article_cache=None, extract_pool=None):
     """
     抓取 URL 内容，提取正文，转换为 Markdown
     保留图片标记 ![alt](src)，去除普通链接 [text](url)
+    client: HttpClient，不传则使用默认共享客户端 (自带重试与熔断)
+    raise_errors: 为 True 时抓取失败直接抛出异常，而不是返回 "抓取失败: ..." 文本
+    extract_mode: "markdown" 返回 Markdown 文本；"dom" 直接遍历清洗后的 DOM，返回 html_walker 文档块列表
+                  (不经过 markdownify，保留表格与列表结构)
+    article_cache: 可选的 ArticleCache，命中时不发请求、不解析
+    extract_pool: 可选的 ExtractionPool，在子进程中解析和提取，不受本进程 GIL 限制
     """
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        }
-        # 降低超时时间，避免卡死
-        response = requests.get(url, headers=headers, timeout=10)
-        response.encoding = response.apparent_encoding if response.apparent_encoding else 'utf-8'
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # 尝试定位正文
-        selectors = [
-            {'id': re.compile('vsb_content')}, 
-            {'class_': 'v_news_content'},      
-            {'class_': 'article-2'},           
-            {'class_': 'content-box'},         
-            {'class_': 'bodytext'},            
-            {'class_': 'article-content'},     
-            {'class_': 'main-content'},        
-            {'name': 'article'},               
-        ]
+        source = fetch_article_source(url, client, extract_mode, article_cache)
+        if source.content is None:
+            extract = extract_pool.extract if extract_pool is not None else extract_article
+            source.complete(extract(source.html, url, extract_mode))
+        return source.content
         
-        content_div = None
-        for selector in selectors:
-            if 'name' in selector:
-                found = soup.find(selector['name'])
-            else:
-                found = soup.find('div', **selector)
-            
-            if found and len(found.get_text().strip()) > 10:
-                content_div = found
-                break
-            
-        if not content_div:
-            for script in soup(["script", "style", "nav", "header", "footer"]):
-                script.decompose()
-            content_div = soup.body
-            
+    except Exception as e:
+        if raise_errors:
+            raise
+        return f"抓取失败: {e}"
+
+class ArticleSource:
+    """
+    详情页抓取 (网络部分) 的结果：命中正文缓存时 content 即为正文；
+    否则 html 为待提取的页面，提取完成后调用 complete(content) 写回缓存。
+    """
+    def __init__(self, content=None, html=None, article_cache=None, pending=None):
+        self.content = content
+        self.html = html
+        self.article_cache = article_cache
+        self.pending = pending
+
+    def complete(self, content):
+        if self.article_cache is not None and self.pending is not None:
+            self.article_cache.complete(self.pending, content)
+        self.content = content
+        self.html = None
+        return content
+
+def fetch_article_source(url, client=None, extract_mode="markdown", article_cache=None):
+    """
+    只完成详情页的请求 (及正文缓存的查询/重新验证)，返回 ArticleSource，不做解析。
+    抓取失败时抛出异常。
+    """
+    if client is None:
+        client = get_default_client()
+
+    def download(headers):
+        # 降低超时时间，避免卡死
+        return client.fetch(url, headers=headers or None, timeout=10)
+
+    if article_cache is not None:
+        content, pending = article_cache.prepare(url, extract_mode, download)
+        if pending is None:
+            return ArticleSource(content=content)
+        return ArticleSource(html=pending.html, article_cache=article_cache, pending=pending)
+    response = download({})
+    response.raise_for_status()
+    return ArticleSource(html=response.text())
+
+def extract_article(html, url, extract_mode="markdown"):
+    """
+    从详情页 HTML 提取正文：extract_mode 为 "markdown" 时返回 Markdown 文本，"dom" 时返回文档块列表。
+    """
+    content_div = extract_content_node(html, url)
+    if extract_mode == "dom":
         if not content_div:
-            return "未找到正文内容"
+            return [(PARAGRAPH, "未找到正文内容")]
+        return html_to_blocks(content_div)
+    if not content_div:
+        return "未找到正文内容"
+        
+    # 转换为 Markdown
+    # strip 参数指定要移除格式但保留内容的标签
+    # 移除 h1-h6 避免生成 ##, 移除 b/strong 避免生成 **, 移除 a 避免生成链接(保留文字)
+    strip_tags = ['script', 'style', 'b', 'strong', 'em', 'i', 'u', 'a', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'span', 'font']
+    markdown_text = md(str(content_div), heading_style="ATX", strip=strip_tags)
+    
+    # --- 清理 URL ---
+    
+    # 1. 处理普通 Markdown 链接 [text](url) -> text
+    # 由于上面 strip=['a']，大部分链接已经变成了纯文本，但 markdownify 有时行为不完全一致，保留此正则作为兜底
+    markdown_text = re.sub(r'(?<!\!)\[([^\]]+)\]\([^)]+\)', r'\1', markdown_text)
+    
+    # 2. 再次清理可能残留的 Markdown 符号 (如表格符号 | 或其他)
+    # 这里的需求主要是去除 ** 和 ##
+    markdown_text = markdown_text.replace("**", "").replace("##", "")
+    
+    # 3. 清理多余空行
+    
+    # 2. 移除裸露的 URL (http/https 开头)，但要小心不要误删图片链接中的 URL
+    # 图片链接格式: ![...](http...)
+    # 我们可以先将图片链接保护起来，或者使用更复杂的正则
+    # 简单策略：只匹配前后有空白的 URL，或者不在括号内的 URL
+    # 这里简化处理：暂不移除裸露 URL，以免误伤图片地址。
+    # 如果必须移除，可以先提取图片，替换为占位符，清理后再还原。
+    
+    # 3. 清理多余空行
+    # 将连续的换行符（包括含有空白字符的）替换为单个段落分隔符
+    markdown_text = re.sub(r'\n(\s*\n)+', '\n\n', markdown_text)
+    
+    return markdown_text.strip()
 
-        # --- 1. HTML 预处理：移除干扰元素 ---
-        # 移除 script, style
-        for tag in content_div(["script", "style"]):
-            tag.decompose()
+# 正则匹配 Markdown 图片: ![alt](src)
+IMAGE_PATTERN = re.compile(r'!\[([^\]]*)\]\(([^)]+)\)')
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+# 文章数少于此值时不启动提取进程池：spawn 子进程并导入依赖的开销比在抓取线程中直接提取还大
+EXTRACT_POOL_MIN_ITEMS = 20
 
-        # 移除分享按钮、点击量等干扰信息
-        # 根据 debug 结果，分享按钮在 class 为 bshare-custom 或包含 share 的 div/a 中
-        # 点击量在 time 标签或包含 "点击" 的文本中
-        
-        # 移除特定 class 的元素
-        for tag in content_div.find_all(class_=re.compile(r'share|fenxiang|bshare', re.I)):
-            tag.decompose()
-            
-        # 移除包含特定关键词的短文本节点 (如 "662次点击", "微信", "QQ空间")
-        # 遍历所有文本节点，如果包含关键词且长度较短，则移除其父元素(如果是行内元素)
-        for text_node in content_div.find_all(string=True):
-            text = text_node.strip()
-            if not text:
-                continue
-                
-            # 关键词列表
-            keywords = ["次点击", "次浏览", "QQ空间", "新浪微博", "QQ好友", "bshare"]
-            
-            # 检查是否包含关键词且长度较短，或者是以"上一篇"/"下一篇"开头的导航链接
-            is_garbage = (any(k in text for k in keywords) and len(text) < 50)
-            is_nav = (text.startswith("上一篇") or text.startswith("下一篇")) and len(text) < 200
-            
-            if is_garbage or is_nav:
-                parent = text_node.parent
-                # 如果父元素是 block 元素，可能误删，只删除行内元素或特定标签
-                if parent.name in ['span', 'a', 'time', 'em', 'i', 'b', 'strong', 'small']:
-                    parent.decompose()
-                elif parent.name in ['div', 'p', 'li'] and len(parent.get_text().strip()) < (200 if is_nav else 50):
-                    # 如果是块级元素但内容很少（只有垃圾信息），也删除
-                    parent.decompose()
-
-        # 处理图片 src，确保是绝对路径
-        for img in content_div.find_all('img'):
-            src = img.get('src')
-            if src:
-                img['src'] = urljoin(url, src)
-            
-        # 转换为 Markdown
-        # strip 参数指定要移除格式但保留内容的标签
-        # 移除 h1-h6 避免生成 ##, 移除 b/strong 避免生成 **, 移除 a 避免生成链接(保留文字)
-        strip_tags = ['script', 'style', 'b', 'strong', 'em', 'i', 'u', 'a', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'span', 'font']
-        markdown_text = md(str(content_div), heading_style="ATX", strip=strip_tags)
-        
-        # --- 清理 URL ---
-        
-        # 1. 处理普通 Markdown 链接 [text](url) -> text
-        # 由于上面 strip=['a']，大部分链接已经变成了纯文本，但 markdownify 有时行为不完全一致，保留此正则作为兜底
-        markdown_text = re.sub(r'(?<!\!)\[([^\]]+)\]\([^)]+\)', r'\1', markdown_text)
-        
-        # 2. 再次清理可能残留的 Markdown 符号 (如表格符号 | 或其他)
-        # 这里的需求主要是去除 ** 和 ##
-        markdown_text = markdown_text.replace("**", "").replace("##", "")
-        
-        # 3. 清理多余空行
-        
-        # 2. 移除裸露的 URL (http/https 开头)，但要小心不要误删图片链接中的 URL
-        # 图片链接格式: ![...](http...)
-        # 我们可以先将图片链接保护起来，或者使用更复杂的正则
-        # 简单策略：只匹配前后有空白的 URL，或者不在括号内的 URL
-        # 这里简化处理：暂不移除裸露 URL，以免误伤图片地址。
-        # 如果必须移除，可以先提取图片，替换为占位符，清理后再还原。
-        
-        # 3. 清理多余空行
-        # 将连续的换行符（包括含有空白字符的）替换为单个段落分隔符
-        markdown_text = re.sub(r'\n(\s*\n)+', '\n\n', markdown_text)
-        
-        return markdown_text.strip()
-        
-    except Exception as e:
-        return f"抓取失败: {e}"
+def fetch_image(src, client=None, image_cache=None):
+    """
+    下载图片 (限制 10MB)，返回 FetchResult。
+    image_cache: 可选的 ImageCache，命中时不发请求。
+    """
+    if client is None:
+        client = get_default_client()
+
+    def download(headers):
+        # 降低图片下载超时时间，流式读取以便检查大小
+        # timeout=(connect, read)
+        return client.fetch(src, headers=headers or None, timeout=(3, 5), max_bytes=MAX_IMAGE_BYTES)
+
+    if image_cache is None:
+        return download({})
+    return image_cache.fetch(src, download)
 
-def add_markdown_content_to_doc(doc, markdown_text, progress_callback=None, current_status=None, stop_event=None, download_images=True):
+def add_markdown_content_to_doc(doc, markdown_text, progress_callback=None, current_status=None, stop_event=None, download_images=True, client=None, prefetched_images=None, image_cache=None, image_optimizer=None):
     """
     解析 Markdown 文本，将文字和图片分别添加到 Word 文档
     current_status: (current_index, total_count, title) 用于更新进度
+    client: HttpClient，用于下载图片，不传则使用默认共享客户端
+    prefetched_images: {src: FetchResult 或 Exception}，已预先下载的图片，命中时不再请求
+    image_cache: 可选的 ImageCache (磁盘图片缓存)
+    image_optimizer: 可选的 ImageOptimizer，嵌入前缩小/重新编码图片
+    返回嵌入文档的图片字节数 (供文档大小估算)
     """
-    # 正则匹配图片: ![alt](src)
+    if client is None:
+        client = get_default_client()
+    embedded_bytes = 0
+
     # split 会返回 [text, alt, src, text, alt, src, ...]
-    parts = re.split(r'!\[([^\]]*)\]\(([^)]+)\)', markdown_text)
+    parts = IMAGE_PATTERN.split(markdown_text)
     
     # 统计图片总数
     total_images = markdown_text.count('![')
@@ -237,47 +258,217 @@ def add_markdown_content_to_doc(doc, markdown_text, progress_callback=None, curr
                 else:
                     progress_callback(idx, total, f"正在处理图片链接 ({current_image_idx}/{total_images}): {title}...")
 
-            if not download_images:
-                # 仅保存链接
-                p = doc.add_paragraph()
-                p.add_run(f"[图片: {alt}]").italic = True
-                p.add_run(f"({src})").italic = True
-            else:
-                # 下载并嵌入图片
-                try:
-                    # print(f"正在下载图片: {src}")
-                    headers = {
-                        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-                    }
-                    # 降低图片下载超时时间，使用 stream=True 以便检查大小
-                    # timeout=(connect, read)
-                    with requests.get(src, headers=headers, timeout=(3, 5), stream=True) as img_response:
-                        if img_response.status_code == 200:
-                            # 检查 Content-Length (限制 10MB)
-                            content_length = img_response.headers.get('content-length')
-                            if content_length and int(content_length) > 10 * 1024 * 1024:
-                                p = doc.add_paragraph()
-                                p.add_run(f"[图片过大 ({int(content_length)/1024/1024:.1f}MB)，已跳过]: {src}").italic = True
-                            else:
-                                # 读取内容
-                                image_content = img_response.content
-                                image_stream = io.BytesIO(image_content)
-                                # 插入图片，限制宽度，避免溢出
-                                doc.add_picture(image_stream, width=Inches(5.5))
-                        else:
-                            p = doc.add_paragraph()
-                            p.add_run(f"[图片下载失败 ({img_response.status_code}): {src}]").italic = True
-                except Exception as e:
-                    # 图片下载或插入失败时，保留链接
-                    p = doc.add_paragraph()
-                    p.add_run(f"[图片插入错误: {e}]").italic = True
-                    p.add_run(f" 链接: {src}")
+            embedded_bytes += _add_image_to_doc(doc, alt, src, download_images, client, prefetched_images, image_cache, image_optimizer)
             
             i += 3 # 跳过 alt 和 src
         else:
             i += 1
 
-def generate_word_doc(items, output_path, max_size_mb=100, progress_callback=None, stop_event=None, pause_event=None, start_index=1, download_images=True):
+    return embedded_bytes
+
+def _add_image_to_doc(doc, alt, src, download_images, client, prefetched_images, image_cache, image_optimizer):
+    """
+    嵌入一张图片 (或在不下载/失败时写入提示文字)，返回嵌入的图片字节数。
+    """
+    if not download_images:
+        # 仅保存链接
+        p = doc.add_paragraph()
+        p.add_run(f"[图片: {alt}]").italic = True
+        p.add_run(f"({src})").italic = True
+        return 0
+    # 下载并嵌入图片
+    try:
+        # print(f"正在下载图片: {src}")
+        if prefetched_images is not None and src in prefetched_images:
+            img_response = prefetched_images[src]
+            if isinstance(img_response, Exception):
+                raise img_response
+        else:
+            img_response = fetch_image(src, client, image_cache)
+        if img_response.status_code == 200:
+            # 限制 10MB
+            if img_response.too_large:
+                content_length = img_response.headers.get('content-length')
+                size_text = f"{int(content_length)/1024/1024:.1f}MB" if content_length else "超过 10MB"
+                p = doc.add_paragraph()
+                p.add_run(f"[图片过大 ({size_text})，已跳过]: {src}").italic = True
+            else:
+                image_bytes = img_response.content
+                if image_optimizer is not None:
+                    image_bytes = image_optimizer.process(image_bytes)
+                image_stream = io.BytesIO(image_bytes)
+                # 插入图片，限制宽度，避免溢出
+                doc.add_picture(image_stream, width=Inches(5.5))
+                return len(image_bytes)
+        else:
+            p = doc.add_paragraph()
+            p.add_run(f"[图片下载失败 ({img_response.status_code}): {src}]").italic = True
+    except Exception as e:
+        # 图片下载或插入失败时，保留链接
+        p = doc.add_paragraph()
+        p.add_run(f"[图片插入错误: {e}]").italic = True
+        p.add_run(f" 链接: {src}")
+    return 0
+
+def add_blocks_to_doc(doc, blocks, progress_callback=None, current_status=None, stop_event=None, download_images=True, client=None, prefetched_images=None, image_cache=None, image_optimizer=None):
+    """
+    将 html_walker 产出的文档块 (段落、图片、表格) 直接写入 Word 文档，参数与 add_markdown_content_to_doc 相同。
+    返回嵌入文档的图片字节数。
+    """
+    if client is None:
+        client = get_default_client()
+    embedded_bytes = 0
+    total_images = sum(1 for block in blocks if block[0] == IMAGE)
+    current_image_idx = 0
+
+    for block in blocks:
+        kind = block[0]
+        if kind == PARAGRAPH:
+            doc.add_paragraph(block[1])
+        elif kind == TABLE:
+            rows = block[1]
+            table = doc.add_table(rows=len(rows), cols=len(rows[0]), style='Table Grid')
+            for r, row in enumerate(rows):
+                for c, text in enumerate(row):
+                    if text:
+                        table.cell(r, c).text = text
+        elif kind == IMAGE:
+            _, alt, src = block
+            current_image_idx += 1
+            
+            # 更新进度提示
+            if progress_callback and current_status:
+                idx, total, title = current_status
+                if download_images:
+                    progress_callback(idx, total, f"正在下载图片 ({current_image_idx}/{total_images}): {title}...")
+                else:
+                    progress_callback(idx, total, f"正在处理图片链接 ({current_image_idx}/{total_images}): {title}...")
+            embedded_bytes += _add_image_to_doc(doc, alt, src, download_images, client, prefetched_images, image_cache, image_optimizer)
+
+    return embedded_bytes
+
+def content_image_srcs(content):
+    """
+    正文 (Markdown 文本或文档块列表) 中按出现顺序去重后的图片地址。
+    """
+    if isinstance(content, str):
+        srcs = [src for _, src in IMAGE_PATTERN.findall(content)]
+    else:
+        srcs = blocks_image_srcs(content)
+    return list(dict.fromkeys(srcs))
+
+def content_text(content):
+    return content if isinstance(content, str) else blocks_text(content)
+
+class DocSizeEstimator:
+    """
+    增量估算 docx 文件大小，避免每篇文章后都把整个文档序列化一遍 (总开销随文档大小平方增长)。
+    估算值 = 空文档大小 + 已嵌入图片字节 + 文字的 zlib 压缩大小 x XML 系数。
+    每次真正保存后用实际大小校准 XML 系数，并按剩余空间决定下次核实的时机：
+    估算值再增长剩余空间的一半 (至少 min_step) 时才再保存一次，离上限还远时不会逐篇核实。
+    """
+    def __init__(self, limit_bytes, margin=0.9, min_step=0.01):
+        self.limit_bytes = limit_bytes
+        # 估算值达到 limit_bytes * margin 时才真正保存一次核实
+        self.margin = margin
+        # 两次核实之间估算值至少增长 limit_bytes * min_step
+        self.min_step = min_step
+        self.base_bytes = 0
+        self.image_bytes = 0
+        self.text_bytes = 0
+        self.xml_factor = 2.0
+        self.next_check = 0
+
+    def reset(self, doc):
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        self.base_bytes = buffer.tell()
+        self.image_bytes = 0
+        self.text_bytes = 0
+        self.next_check = 0
+
+    def add(self, text, image_bytes):
+        self.image_bytes += image_bytes
+        self.text_bytes += len(zlib.compress(text.encode('utf-8')))
+
+    @property
+    def estimate(self):
+        return self.base_bytes + self.image_bytes + self.text_bytes * self.xml_factor
+
+    def needs_check(self):
+        return self.estimate >= max(self.limit_bytes * self.margin, self.next_check)
+
+    def calibrate(self, actual_bytes):
+        if self.text_bytes > 0:
+            self.xml_factor = max(0.1, (actual_bytes - self.base_bytes - self.image_bytes) / self.text_bytes)
+        headroom = self.limit_bytes - actual_bytes
+        self.next_check = min(self.limit_bytes, actual_bytes + max(headroom / 2, self.limit_bytes * self.min_step))
+
+def generate_word_doc(items, output_path, max_size_mb=100, progress_callback=None, stop_event=None, pause_event=None, start_index=1, download_images=True, client=None, concurrency=4, fetch_mode="async", image_cache=None, image_optimizer=None, writer="docx", extract_mode="markdown", article_cache=None, extract_workers=0):
+    """
+    抓取 items 中的文章并生成 Word 文档 (超过 max_size_mb 时分卷)。
+    concurrency: 每个 host 的并发请求数；大于 1 时由 fetch_engine 并发预取正文与图片，仍按原顺序写入文档。
+    fetch_mode: "async" 使用 asyncio 抓取引擎；"threads" 使用线程池预取流水线 (主线程写文档的同时后台抓取后续文章)。
+    image_cache: 图片磁盘缓存，不传则使用默认缓存目录 image_cache/，传 False 关闭。
+    image_optimizer: 图片缩放/重新编码，不传则在安装了 Pillow 时使用默认 ImageOptimizer，传 False 关闭。
+    writer: "docx" 使用 python-docx 在内存中构建文档；"stream" 使用 StreamingDocxWriter 边抓取边写入 zip，
+            内存占用不随文章数增长，适合在小内存机器上生成上千篇的合集。
+    extract_mode: "markdown" 经 markdownify 转换正文；"dom" 直接遍历清洗后的 DOM 写入文档，保留表格与列表。
+    article_cache: 已提取正文的本地缓存，不传则使用默认缓存目录 article_cache/，传 False 关闭。
+                   重新生成 (调整分卷大小、切换是否下载图片、断点续传) 时不必重新抓取和解析。
+    extract_workers: 大于 0 时用这么多个子进程解析和提取正文 (ExtractionPool)，抓取线程只下载 HTML；
+                     None 表示按 CPU 核数；0 (默认) 在抓取线程中直接提取。
+                     文章数少于 EXTRACT_POOL_MIN_ITEMS 时总是直接提取。
+    返回重试后仍抓取失败、未写入文档的条目列表，调用方可以不把它们记入历史，下次再抓。
+    """
+    # 整个生成过程共用一个客户端，正文与图片请求复用同一连接池
+    owns_client = client is None
+    if owns_client:
+        client = HttpClient(timeout=10, rate_limiter=get_default_rate_limiter(), retry_policy=get_default_retry_policy())
+    if image_cache is None:
+        image_cache = get_default_image_cache()
+    elif image_cache is False:
+        image_cache = None
+    if article_cache is None:
+        article_cache = get_default_article_cache()
+    elif article_cache is False:
+        article_cache = None
+    if image_optimizer is None:
+        image_optimizer = ImageOptimizer() if HAS_PIL else None
+    elif image_optimizer is False:
+        image_optimizer = None
+    extract_pool = None
+    if (extract_workers is None or extract_workers > 0) and len(items) - (start_index - 1) >= EXTRACT_POOL_MIN_ITEMS:
+        from extract_pool import ExtractionPool
+        extract_pool = ExtractionPool(extract_workers)
+    try:
+        failed_items = _generate_word_doc(items, output_path, max_size_mb, progress_callback, stop_event, pause_event, start_index, download_images, client, concurrency, fetch_mode, image_cache, image_optimizer, writer, extract_mode, article_cache, extract_pool)
+        print(f"[info] 网络统计: {client.stats.summary()}")
+        if article_cache is not None:
+            print(f"[info] 正文缓存: {article_cache.summary()}")
+        if extract_pool is not None:
+            print(f"[info] 进程池提取: {extract_pool.summary()}")
+        print(f"[info] 正文清洗: {get_default_scrubber().summary()}")
+        print(f"[info] 提取配置: {get_default_profiles().summary()}")
+        if image_cache is not None:
+            print(f"[info] 图片缓存: {image_cache.summary()}")
+        if image_optimizer is not None:
+            print(f"[info] 图片压缩: {image_optimizer.summary()}")
+        if client.rate_limiter is not None:
+            print(f"[info] 限速统计: {client.rate_limiter.summary()}")
+        if failed_items:
+            print(f"[warn] {len(failed_items)} 篇文章抓取失败，未写入文档")
+        return failed_items
+    finally:
+        if extract_pool is not None:
+            extract_pool.close()
+        get_default_profiles().save()
+        if image_cache is not None:
+            image_cache.save()
+        if owns_client:
+            client.close()
+
+def _new_document():
     doc = Document()
     
     # 设置默认字体 (可选)
@@ -285,15 +476,37 @@ def generate_word_doc(items, output_path, max_size_mb=100, progress_callback=Non
     font = style.font
     font.name = '微软雅黑'
     font.size = Pt(10)
-    
+    return doc
+
+def _generate_word_doc(items, output_path, max_size_mb, progress_callback, stop_event, pause_event, start_index, download_images, client, concurrency, fetch_mode, image_cache, image_optimizer, writer, extract_mode, article_cache, extract_pool):
     total = len(items)
-    current_part = 1
-    base_name, ext = os.path.splitext(output_path)
-    has_content = False
+    failed_items = []
     
     # 调整切片，start_index 是 1-based
     process_items = items[start_index-1:]
     
+    engine = None
+    fetched_articles = None
+    if concurrency > 1:
+        from fetch_engine import ArticleFetchEngine, PrefetchPipeline
+        if fetch_mode == "threads":
+            engine = PrefetchPipeline(client, workers=concurrency, prefetch=concurrency * 2, download_images=download_images, image_cache=image_cache, stop_event=stop_event, pause_event=pause_event, extract_mode=extract_mode, article_cache=article_cache, extract_pool=extract_pool)
+        else:
+            engine = ArticleFetchEngine(client, per_host_concurrency=concurrency, download_images=download_images, image_cache=image_cache, stop_event=stop_event, pause_event=pause_event, extract_mode=extract_mode, article_cache=article_cache, extract_pool=extract_pool)
+        fetched_articles = engine.fetch_in_order(process_items)
+    try:
+        if writer == "stream":
+            return _build_streaming_documents(process_items, output_path, max_size_mb, progress_callback, stop_event, pause_event, start_index, total, download_images, client, image_cache, image_optimizer, fetched_articles, failed_items, extract_mode, article_cache, extract_pool)
+        return _build_documents(_new_document(), process_items, output_path, max_size_mb, progress_callback, stop_event, pause_event, start_index, total, download_images, client, image_cache, image_optimizer, fetched_articles, failed_items, extract_mode, article_cache, extract_pool)
+    finally:
+        if engine is not None:
+            engine.close()
+
+def _iter_articles(process_items, progress_callback, stop_event, pause_event, start_index, total, client, fetched_articles, failed_items, extract_mode, article_cache, extract_pool):
+    """
+    按顺序产出 (real_index, item, content, images)，处理停止/暂停信号与进度提示；
+    抓取失败的条目记入 failed_items 并跳过。
+    """
     for i, item in enumerate(process_items):
         real_index = start_index + i
         
@@ -301,7 +514,7 @@ def generate_word_doc(items, output_path, max_size_mb=100, progress_callback=Non
         if stop_event and stop_event.is_set():
             if progress_callback:
                 progress_callback(real_index - 1, total, "任务已终止")
-            break
+            return
             
         # 检查暂停信号
         if pause_event:
@@ -313,32 +526,64 @@ def generate_word_doc(items, output_path, max_size_mb=100, progress_callback=Non
         if progress_callback:
             progress_callback(real_index, total, item['title'])
             
-        # 添加标题
-        doc.add_heading(item['title'], level=1)
-        
-        # 添加元数据
-        p = doc.add_paragraph()
-        p.add_run(f"发布日期: {item['date']}\n").bold = True
-        p.add_run(f"原文链接: {item['link']}") # 这里保留原文链接
-        
-        # 抓取内容
-        content = fetch_article_content(item['link'])
-        
-        # 添加正文
-        doc.add_heading('文章内容:', level=2)
-        # 使用新的处理函数
-        add_markdown_content_to_doc(doc, content, progress_callback, (real_index, total, item['title']), stop_event, download_images)
-        
-        # 分页
-        doc.add_page_break()
+        # 抓取内容 (client 已按策略重试；仍失败则跳过该篇，不把错误文本写进文档)
+        images = None
+        try:
+            if fetched_articles is not None:
+                article = next(fetched_articles)
+                article.raise_error()
+                content, images = article.content, article.images
+            else:
+                content = fetch_article_content(item['link'], client, raise_errors=True, extract_mode=extract_mode, article_cache=article_cache, extract_pool=extract_pool)
+        except Exception as e:
+            print(f"[warn] 正文抓取失败，已跳过: {item['title']} ({e})")
+            failed_items.append(item)
+            continue
+        yield real_index, item, content, images
+
+def _add_article_to_doc(doc, real_index, total, item, content, images, progress_callback, stop_event, download_images, client, image_cache, image_optimizer):
+    """
+    写入一篇文章 (标题、元数据、正文、分页符)，返回嵌入的图片字节数。
+    """
+    # 添加标题
+    doc.add_heading(item['title'], level=1)
+    
+    # 添加元数据
+    p = doc.add_paragraph()
+    p.add_run(f"发布日期: {item['date']}\n").bold = True
+    p.add_run(f"原文链接: {item['link']}") # 这里保留原文链接
+    
+    # 添加正文
+    doc.add_heading('文章内容:', level=2)
+    # 使用新的处理函数
+    add_content = add_markdown_content_to_doc if isinstance(content, str) else add_blocks_to_doc
+    embedded_bytes = add_content(doc, content, progress_callback, (real_index, total, item['title']), stop_event, download_images, client, images, image_cache, image_optimizer)
+    
+    # 分页
+    doc.add_page_break()
+    return embedded_bytes
+
+def _build_documents(doc, process_items, output_path, max_size_mb, progress_callback, stop_event, pause_event, start_index, total, download_images, client, image_cache, image_optimizer, fetched_articles, failed_items, extract_mode, article_cache, extract_pool):
+    current_part = 1
+    base_name, ext = os.path.splitext(output_path)
+    has_content = False
+    size_estimator = DocSizeEstimator(max_size_mb * 1024 * 1024)
+    size_estimator.reset(doc)
+
+    for real_index, item, content, images in _iter_articles(process_items, progress_callback, stop_event, pause_event, start_index, total, client, fetched_articles, failed_items, extract_mode, article_cache, extract_pool):
+        embedded_bytes = _add_article_to_doc(doc, real_index, total, item, content, images, progress_callback, stop_event, download_images, client, image_cache, image_optimizer)
+        size_estimator.add(f"{item['title']}\n{item['date']}\n{item['link']}\n{content_text(content)}", embedded_bytes)
         has_content = True
         
-        # 检查文件大小
+        # 检查文件大小：先看增量估算值，接近上限时才真正保存到内存流核实
+        if not size_estimator.needs_check():
+            continue
         try:
             # 保存到内存流以检查大小
             buffer = io.BytesIO()
             doc.save(buffer)
             size_bytes = buffer.tell()
+            size_estimator.calibrate(size_bytes)
             
             if size_bytes > max_size_mb * 1024 * 1024:
                 # 超过大小，保存当前部分
@@ -350,20 +595,14 @@ def generate_word_doc(items, output_path, max_size_mb=100, progress_callback=Non
                     progress_callback(real_index, total, f"已保存分卷: {os.path.basename(part_path)}")
                 
                 # 重置文档
-                doc = Document()
-                style = doc.styles['Normal']
-                font = style.font
-                font.name = '微软雅黑'
-                font.size = Pt(10)
+                doc = _new_document()
                 
                 current_part += 1
                 has_content = False
+                size_estimator.reset(doc)
         except Exception as e:
             print(f"Size check error: {e}")
         
-        # 避免请求过快
-        time.sleep(0.5)
-        
     # 保存剩余内容
     if has_content:
         if current_part == 1:
@@ -372,6 +611,48 @@ def generate_word_doc(items, output_path, max_size_mb=100, progress_callback=Non
             part_path = f"{base_name}_part{current_part}{ext}"
             doc.save(part_path)
 
+    return failed_items
+
+def _build_streaming_documents(process_items, output_path, max_size_mb, progress_callback, stop_event, pause_event, start_index, total, download_images, client, image_cache, image_optimizer, fetched_articles, failed_items, extract_mode, article_cache, extract_pool):
+    """
+    与 _build_documents 相同的流程，但用 StreamingDocxWriter 边写边落盘：
+    每篇文章写完后 writer.size_bytes 即为当前分卷的大小，超过上限立即关闭该分卷并开始下一卷。
+    分卷先按 _partN 命名写入，最终只有一卷时重命名为 output_path。
+    """
+    from docx_stream_writer import StreamingDocxWriter
+    current_part = 1
+    base_name, ext = os.path.splitext(output_path)
+    limit_bytes = max_size_mb * 1024 * 1024
+    doc = StreamingDocxWriter(f"{base_name}_part{current_part}{ext}")
+
+    try:
+        for real_index, item, content, images in _iter_articles(process_items, progress_callback, stop_event, pause_event, start_index, total, client, fetched_articles, failed_items, extract_mode, article_cache, extract_pool):
+            _add_article_to_doc(doc, real_index, total, item, content, images, progress_callback, stop_event, download_images, client, image_cache, image_optimizer)
+            
+            if doc.size_bytes > limit_bytes:
+                doc.close()
+                if progress_callback:
+                    progress_callback(real_index, total, f"已保存分卷: {os.path.basename(doc.path)}")
+                current_part += 1
+                doc = StreamingDocxWriter(f"{base_name}_part{current_part}{ext}")
+    except BaseException:
+        # 中途出错时保留已经写入的内容，文件仍然是完整可打开的 docx
+        if doc.has_content:
+            doc.close()
+        else:
+            doc.abort()
+        raise
+
+    # 保存剩余内容
+    if doc.has_content:
+        doc.close()
+        if current_part == 1:
+            os.replace(doc.path, output_path)
+    else:
+        doc.abort()
+
+    return failed_items
+
 class ProcessorApp:
     def __init__(self, root):
         self.root = root
@@ -0,0 +1,93 @@
+import os
+import re
+import sys
+import time
+import hashlib
+import argparse
+from content_extractor import extract_content_node, HAS_LXML
+
+BENCH_PAGES_DIR = "bench_pages"
+
+def record_pages(urls, directory, timeout=10):
+    """
+    下载详情页原始 HTML 保存到 directory，供离线重复测试。
+    """
+    from http_client import get_default_client
+    client = get_default_client()
+    os.makedirs(directory, exist_ok=True)
+    for url in urls:
+        try:
+            response = client.fetch(url, timeout=timeout)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"[warn] 下载失败: {url} ({e})")
+            continue
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+        with open(os.path.join(directory, f"{name}.html"), "w", encoding="utf-8") as f:
+            # 第一行记录原始 URL，供图片地址补全
+            f.write(f"<!-- {url} -->\n")
+            f.write(response.text())
+        print(f"[info] 已保存: {url}")
+
+def load_pages(directory):
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith((".html", ".htm")):
+            continue
+        with open(os.path.join(directory, name), "r", encoding="utf-8", errors="replace") as f:
+            html = f.read()
+        match = re.match(r'<!-- (\S+) -->', html)
+        pages.append((name, match.group(1) if match else "http://localhost/", html))
+    return pages
+
+def _normalized_text(node) -> str:
+    return re.sub(r'\s+', ' ', node.get_text()).strip() if node else ""
+
+def _time_parser(html, url, parser, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        # 关闭按 host 学习，保证两种解析方式做的是同样的工作
+        node = extract_content_node(html, url, parser=parser, profiles=False)
+    return (time.perf_counter() - start) / repeat * 1000, node
+
+def main():
+    p = argparse.ArgumentParser(description="正文提取性能对比：html.parser 整页解析 vs lxml 定位后只解析正文子树")
+    p.add_argument("--pages", default=BENCH_PAGES_DIR, help="保存详情页 HTML 的目录")
+    p.add_argument("--record", nargs="*", default=[], help="先下载这些 URL 到 --pages 目录")
+    p.add_argument("--record-list", help="先下载爬虫输出 txt 中的链接到 --pages 目录")
+    p.add_argument("--limit", type=int, default=20, help="--record-list 最多下载的条数")
+    p.add_argument("--repeat", type=int, default=10, help="每页重复次数")
+    args = p.parse_args()
+
+    urls = list(args.record)
+    if args.record_list:
+        from article_processor import parse_txt_file
+        urls += [item['link'] for item in parse_txt_file(args.record_list)[:args.limit]]
+    if urls:
+        record_pages(urls, args.pages)
+
+    if not os.path.isdir(args.pages):
+        print(f"[warn] 目录不存在: {args.pages}，请先用 --record 或 --record-list 下载页面")
+        sys.exit(1)
+    if not HAS_LXML:
+        print("[warn] 未安装 lxml，无法对比")
+        sys.exit(1)
+
+    pages = load_pages(args.pages)
+    total_old = total_new = 0.0
+    mismatches = 0
+    print(f"{'页面':<24}{'大小KB':>8}{'html.parser ms':>16}{'lxml ms':>10}{'加速':>8}")
+    for name, url, html in pages:
+        old_ms, old_node = _time_parser(html, url, "html.parser", args.repeat)
+        new_ms, new_node = _time_parser(html, url, "lxml", args.repeat)
+        total_old += old_ms
+        total_new += new_ms
+        same = _normalized_text(old_node) == _normalized_text(new_node)
+        if not same:
+            mismatches += 1
+        print(f"{name[:23]:<24}{len(html.encode('utf-8')) / 1024:>8.1f}{old_ms:>16.2f}{new_ms:>10.2f}{old_ms / max(new_ms, 1e-9):>7.1f}x{'' if same else '  (正文不一致)'}")
+    if pages:
+        print(f"[info] {len(pages)} 页，平均 html.parser {total_old / len(pages):.2f} ms，lxml {total_new / len(pages):.2f} ms，加速 {total_old / max(total_new, 1e-9):.1f}x，正文不一致 {mismatches} 页")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from bench_extraction import record_pages, load_pages
+from list_page import analyze_list_page, parse_sdata, iter_sdata_notices, notice_from_sdata, HAS_LXML
+from scrape_notices import NoticeParser, parse_json_response, extract_form_data
+
+BENCH_LIST_PAGES_DIR = "bench_list_pages"
+# 原来 parse_json_response 使用的非贪婪正则
+LEGACY_SDATA_PATTERN = re.compile(r'var\s+sdata\w+\s*=\s*(\[.*?\]);', re.DOTALL)
+
+def synthetic_page(notices: int = 20, viewstate_kb: int = 200, component_id: str = "a" * 32, sdata_items: int = None, bracket_in_strings: bool = False) -> str:
+    """
+    生成 ViewState 较大的列表页：content-box 通知卡片 + 同样内容的 sdata + 分页链接。
+    sdata_items: sdata 数组的条数 (默认与 notices 相同)；bracket_in_strings 时摘要中含有 "];"，用于检查截断问题。
+    """
+    cards = []
+    items = []
+    for n in range(notices):
+        cards.append(
+            f'<li><a class="content-box" href="/detail/20250904{n:06d}.html"><div class="date"><span>{n % 28 + 1:02d}</span><em>2025-09</em></div>'
+            f'<article class="titletext">通知标题 {n}</article><article class="bodytext">通知摘要 {n}</article></a></li>'
+        )
+    for n in range(notices if sdata_items is None else sdata_items):
+        abstract = f"通知摘要 {n}，附件[1];[2]" if bracket_in_strings else f"通知摘要 {n}"
+        items.append(f'{{"title": "通知标题 {n}", "sjall": "2025-09-{n % 28 + 1:02d} 10:00", "url": "//www.example.edu.cn/detail/20250904{n:06d}.html", "Abstract": "{abstract}"}}')
+    nav = '<a href="/page/x.html">栏目</a>' * 50
+    pager = "".join(f'<a href="/?webpageId=20190417141109v1ewezmjl1uf1hqy9h&amp;{component_id}={p}">{p}</a>' for p in range(1, 11))
+    return (
+        '<html><head><title>通知公告</title></head><body><form method="post" action="./">'
+        f'<input type="hidden" name="__VIEWSTATE" value="{"V" * (viewstate_kb * 1024)}"/>'
+        f'<input type="hidden" name="__EVENTVALIDATION" value="{"E" * 2048}"/>'
+        f'<input type="hidden" name="newsComponentId" value="{component_id}"/><input type="hidden" name="pagesize" value="{notices}"/>'
+        f'<div class="nav">{nav}</div><ul class="list">{"".join(cards)}</ul><div class="pager">{pager}</div>'
+        f'<script>var sdata{component_id[:6]} = [{", ".join(items)}];</script></form></body></html>'
+    )
+
+def old_analysis(html):
+    """
+    crawl_notices 原来对第一页做的全部工作：NoticeParser、sdata 正则、extract_form_data 和两次组件 ID 正则。
+    """
+    parser = NoticeParser()
+    parser.feed(html)
+    json_notices = parse_json_response(html)
+    link_match = re.search(r'webpageId=[^&]+&(?:amp;)?([a-zA-Z0-9]{32,})=\d+', html)
+    input_match = re.search(r'<input[^>]*name="newsComponentId"[^>]*value="([a-zA-Z0-9]{32})"', html)
+    component_id = link_match.group(1) if link_match else (input_match.group(1) if input_match else None)
+    return parser.notices, json_notices, extract_form_data(html, component_id), component_id
+
+def new_analysis(html, parser):
+    page = analyze_list_page(html, parser)
+    component_id = page.link_component_id or page.input_component_id
+    return page.html_notices, page.json_notices, page.form_data(component_id), component_id
+
+def legacy_parse_sdata(html):
+    match = LEGACY_SDATA_PATTERN.search(html)
+    if not match:
+        return []
+    try:
+        return [notice_from_sdata(item) for item in json.loads(match.group(1))]
+    except json.JSONDecodeError:
+        return []
+
+def first_sdata_notice(html):
+    return next(iter_sdata_notices(html), None)
+
+def _time(func, html, repeat, *args):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(html, *args)
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+def main():
+    p = argparse.ArgumentParser(description="列表页解析性能对比：原来的四遍扫描 vs analyze_list_page 一次扫描")
+    p.add_argument("--pages", default=BENCH_LIST_PAGES_DIR, help="保存列表页 HTML 的目录")
+    p.add_argument("--record", nargs="*", default=[], help="先下载这些列表页 URL 到 --pages 目录")
+    p.add_argument("--synthetic", type=int, nargs="*", default=[50, 200, 1000], help="额外测试的合成页面 ViewState 大小 (KB)")
+    p.add_argument("--sdata-items", type=int, nargs="*", default=[1000, 10000], help="额外测试 sdata 解析的合成页面条数 (摘要中含 \"];\")")
+    p.add_argument("--repeat", type=int, default=20, help="每页重复次数")
+    args = p.parse_args()
+
+    if args.record:
+        record_pages(args.record, args.pages)
+    pages = load_pages(args.pages) if os.path.isdir(args.pages) else []
+    pages += [(f"synthetic-{kb}KB", "", synthetic_page(viewstate_kb=kb)) for kb in args.synthetic]
+    if not pages:
+        print("[warn] 没有可测试的页面，请用 --record 下载列表页或指定 --synthetic")
+        sys.exit(1)
+
+    parsers = ["lxml", "html.parser"] if HAS_LXML else ["html.parser"]
+    print(f"{'页面':<24}{'大小KB':>8}{'原来 ms':>10}" + "".join(f"{name + ' ms':>16}" for name in parsers))
+    mismatches = 0
+    for name, _, html in pages:
+        old_ms, old_result = _time(old_analysis, html, args.repeat)
+        cells = []
+        for parser in parsers:
+            new_ms, new_result = _time(new_analysis, html, args.repeat, parser)
+            same = new_result == old_result
+            mismatches += not same
+            cells.append(f"{new_ms:>9.2f} ({old_ms / max(new_ms, 1e-9):.1f}x){'' if same else '!'}")
+        print(f"{name[:23]:<24}{len(html.encode('utf-8')) / 1024:>8.1f}{old_ms:>10.2f}" + "".join(f"{cell:>16}" for cell in cells))
+    print(f"[info] {len(pages)} 页，结果不一致 {mismatches} 次 (标记为 !)")
+
+    # sdata：原来的非贪婪正则 + json.loads vs 按括号匹配逐个 raw_decode
+    sdata_pages = [(name, html) for name, _, html in pages if "sdata" in html]
+    for count in args.sdata_items:
+        sdata_pages.append((f"sdata-{count}", synthetic_page(sdata_items=count)))
+        sdata_pages.append((f"sdata-{count}-brackets", synthetic_page(sdata_items=count, bracket_in_strings=True)))
+    print(f"\n{'页面':<24}{'大小KB':>8}{'条数':>8}{'正则 ms':>10}{'raw_decode ms':>15}{'首条 ms':>10}  说明")
+    for name, html in sdata_pages:
+        legacy_ms, legacy = _time(legacy_parse_sdata, html, args.repeat)
+        new_ms, notices = _time(parse_sdata, html, args.repeat)
+        first_ms, _ = _time(first_sdata_notice, html, args.repeat)
+        note = "一致" if legacy == notices else f"正则结果 {len(legacy)} 条 (被字符串中的 \"];\" 截断)"
+        print(f"{name[:23]:<24}{len(html.encode('utf-8')) / 1024:>8.1f}{len(notices):>8}{legacy_ms:>10.2f}{new_ms:>15.2f}{first_ms:>10.3f}  {note}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+import re
+import threading
+from urllib.parse import urljoin, urlparse
+from bs4 import BeautifulSoup, NavigableString, Tag, CData
+from extraction_profiles import get_default_profiles
+
+# lxml 已在 requirements.txt 中；缺失时退回 BeautifulSoup 自带的 html.parser
+try:
+    import lxml.html
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:
+    lxml = None
+    etree = None
+    HAS_LXML = False
+
+DEFAULT_PARSER = "lxml" if HAS_LXML else "html.parser"
+# 小于此大小的页面直接整页解析，两次解析的固定开销反而更大
+SUBTREE_PARSE_MIN_CHARS = 16 * 1024
+
+# 正文容器选择器，按优先级排列 (与 BeautifulSoup 的 find 参数一致)
+CONTENT_SELECTORS = [
+    {'id': re.compile('vsb_content')},
+    {'class_': 'v_news_content'},
+    {'class_': 'article-2'},
+    {'class_': 'content-box'},
+    {'class_': 'bodytext'},
+    {'class_': 'article-content'},
+    {'class_': 'main-content'},
+    {'name': 'article'},
+]
+
+def _selector_xpath(selector: dict) -> str:
+    """
+    把 CONTENT_SELECTORS 中的一项转换为等价的 XPath (id 为包含匹配，class 为单个类名匹配)。
+    """
+    if 'name' in selector:
+        return f"//{selector['name']}"
+    if 'id' in selector:
+        return f"//div[contains(@id, '{selector['id'].pattern}')]"
+    return f"//div[contains(concat(' ', normalize-space(@class), ' '), ' {selector['class_']} ')]"
+
+# 选择器的 XPath 字符串同时作为 ExtractionProfiles 中记录的选择器标识
+SELECTOR_KEYS = [_selector_xpath(selector) for selector in CONTENT_SELECTORS]
+_SELECTOR_XPATHS = [etree.XPath(key) for key in SELECTOR_KEYS] if HAS_LXML else []
+
+def _selector_order(preferred):
+    """
+    选择器下标的尝试顺序：已学习的选择器排在最前，其余保持原优先级。
+    """
+    order = list(range(len(CONTENT_SELECTORS)))
+    if preferred in SELECTOR_KEYS:
+        index = SELECTOR_KEYS.index(preferred)
+        order.remove(index)
+        order.insert(0, index)
+    return order
+
+# 干扰文字：以"上一篇"/"下一篇"开头的导航 (200 字以内)，或包含点击量/分享关键词的短文本 (50 字以内)
+BOILERPLATE_KEYWORDS = ["次点击", "次浏览", "QQ空间", "新浪微博", "QQ好友", "bshare"]
+NAV_PREFIXES = ["上一篇", "下一篇"]
+NAV_MAX_CHARS = 200
+KEYWORD_MAX_CHARS = 50
+# 所有模式合并为一个正则，一次匹配完成分类；开头的导航分支优先，与原逻辑 "200 if is_nav else 50" 一致
+_BOILERPLATE_PATTERN = re.compile(
+    "^(?P<nav>" + "|".join(map(re.escape, NAV_PREFIXES)) + ")|(?P<keyword>" + "|".join(map(re.escape, BOILERPLATE_KEYWORDS)) + ")"
+)
+_SHARE_CLASS_PATTERN = re.compile(r'share|fenxiang|bshare', re.I)
+# 含干扰文字时直接删除的行内元素；块级元素只在自身文字很少时删除
+_INLINE_REMOVABLE = {'span', 'a', 'time', 'em', 'i', 'b', 'strong', 'small'}
+_BLOCK_REMOVABLE = {'div', 'p', 'li'}
+_DROP_TAGS = {'script', 'style'}
+
+def _boilerplate_limit(text: str) -> int:
+    """
+    text (已 strip) 是干扰文字时返回其所在块级元素被删除的文字长度上限，否则返回 0。
+    """
+    if len(text) >= NAV_MAX_CHARS:
+        return 0
+    match = _BOILERPLATE_PATTERN.search(text)
+    if match is None:
+        return 0
+    if match.group("nav"):
+        return NAV_MAX_CHARS
+    return KEYWORD_MAX_CHARS if len(text) < KEYWORD_MAX_CHARS else 0
+
+# 子树文字统计 (总长度, 开头空白数, 结尾空白数, 是否全是空白)，可以 O(1) 合并，
+# strip 后的长度 = 总长度 - 开头空白 - 结尾空白，不必对每个父元素重复调用 get_text()
+_EMPTY_TEXT = (0, 0, 0, True)
+
+def _text_stats(text: str):
+    length = len(text)
+    stripped = text.lstrip()
+    if not stripped:
+        return (length, length, length, True)
+    return (length, length - len(stripped), length - len(text.rstrip()), False)
+
+def _merge_text_stats(first, second):
+    length = first[0] + second[0]
+    leading = first[0] + second[1] if first[3] else first[1]
+    trailing = first[2] + second[0] if second[3] else second[2]
+    return (length, leading, trailing, first[3] and second[3])
+
+def _stripped_length(stats) -> int:
+    return 0 if stats[3] else stats[0] - stats[1] - stats[2]
+
+class BoilerplateScrubber:
+    """
+    一次遍历 (后序，显式栈) 完成正文清洗：
+    - script/style 与 class 含 share/fenxiang/bshare 的元素进入时即删除，不再遍历其子树；
+    - 文本节点用预编译的合并正则分类 (点击量、分享关键词、上一篇/下一篇导航)；
+    - 元素离开时根据子节点汇总的文字长度决定是否删除，不再反复 get_text()；
+    - 同一遍中把图片 src 转为绝对地址。
+    统计累计清洗的页数和删除的节点数。
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.removed = 0
+
+    def scrub(self, node, url=None) -> int:
+        """
+        原地清洗 node，返回删除的节点数。
+        """
+        removed = 0
+        # 栈帧: [元素, 子节点迭代器, 文字统计, 直接文字子节点中最大的删除阈值]
+        stack = [[node, iter(list(node.children)), _EMPTY_TEXT, 0]]
+        while stack:
+            frame = stack[-1]
+            child = next(frame[1], None)
+            if child is not None:
+                if isinstance(child, NavigableString):
+                    # 与 get_text() 一致，只统计普通文本和 CDATA (注释等不计)
+                    if type(child) is NavigableString or isinstance(child, CData):
+                        text = str(child)
+                        frame[2] = _merge_text_stats(frame[2], _text_stats(text))
+                        stripped = text.strip()
+                        if stripped:
+                            frame[3] = max(frame[3], _boilerplate_limit(stripped))
+                    continue
+                if not isinstance(child, Tag):
+                    continue
+                classes = child.get('class')
+                if child.name in _DROP_TAGS or (classes and _SHARE_CLASS_PATTERN.search(" ".join(classes) if isinstance(classes, list) else classes)):
+                    child.decompose()
+                    removed += 1
+                    continue
+                if child.name == 'img' and url:
+                    src = child.get('src')
+                    if src:
+                        child['src'] = urljoin(url, src)
+                stack.append([child, iter(list(child.children)), _EMPTY_TEXT, 0])
+                continue
+
+            stack.pop()
+            tag, stats, limit = frame[0], frame[2], frame[3]
+            if not stack:
+                break
+            if limit and (tag.name in _INLINE_REMOVABLE or (tag.name in _BLOCK_REMOVABLE and _stripped_length(stats) < limit)):
+                tag.decompose()
+                removed += 1
+                continue
+            parent = stack[-1]
+            parent[2] = _merge_text_stats(parent[2], stats)
+
+        self.record(1, removed)
+        return removed
+
+    def record(self, pages: int, removed: int):
+        """
+        累加清洗统计 (也用于合并进程池子进程中的统计)。
+        """
+        with self._lock:
+            self.pages += pages
+            self.removed += removed
+
+    def summary(self) -> str:
+        with self._lock:
+            return f"清洗 {self.pages} 页，删除 {self.removed} 个干扰节点"
+
+# 进程内共享的默认清洗器
+_default_scrubber = None
+_default_scrubber_lock = threading.Lock()
+
+def get_default_scrubber() -> BoilerplateScrubber:
+    global _default_scrubber
+    with _default_scrubber_lock:
+        if _default_scrubber is None:
+            _default_scrubber = BoilerplateScrubber()
+        return _default_scrubber
+
+def _find_content_bs4(soup, preferred=None):
+    """
+    返回 (正文节点, 命中的选择器下标)，找不到时为 (None, None)。
+    """
+    for index in _selector_order(preferred):
+        selector = CONTENT_SELECTORS[index]
+        if 'name' in selector:
+            found = soup.find(selector['name'])
+        else:
+            found = soup.find('div', **selector)
+
+        if found and len(found.get_text().strip()) > 10:
+            return found, index
+    return None, None
+
+def _find_content_lxml(html, preferred=None):
+    """
+    用 lxml (C 实现) 解析整页并按选择器定位正文，只把正文子树交给 BeautifulSoup 构建对象树。
+    页面中导航、页脚、脚本等大部分节点不会生成 Python 对象。
+    返回 (正文节点, 命中的选择器下标)，定位失败时为 (None, None)。
+    """
+    try:
+        root = lxml.html.document_fromstring(html)
+    except (ValueError, etree.ParserError):
+        return None, None
+    for index in _selector_order(preferred):
+        matches = _SELECTOR_XPATHS[index](root)
+        # 与 soup.find 一致：每个选择器只看文档中的第一个匹配
+        if matches and len(matches[0].text_content().strip()) > 10:
+            element = matches[0]
+            fragment = lxml.html.tostring(element, encoding="unicode", with_tail=False)
+            return BeautifulSoup(fragment, "lxml").find(element.tag), index
+    return None, None
+
+def extract_content_node(html, url, parser=DEFAULT_PARSER, scrubber=None, profiles=None):
+    """
+    解析详情页 HTML，定位正文节点并移除分享按钮、点击量等干扰元素，图片 src 转为绝对地址。
+    parser: "lxml" 时先用 lxml 定位正文、只解析正文子树；"html.parser" 为原来的纯 Python 整页解析。
+    scrubber: BoilerplateScrubber，不传则使用默认实例 (累计清洗统计)。
+    profiles: ExtractionProfiles，按 host 优先尝试已学习的选择器并删除学到的模板块；
+              不传则使用默认实例 (extraction_profiles.json)，传 False 关闭。
+    找不到正文时返回 None。
+    """
+    if profiles is None:
+        profiles = get_default_profiles()
+    host = urlparse(url).netloc
+    preferred = profiles.preferred_selector(host) if profiles else None
+
+    content_div, index = None, None
+    if parser == "lxml" and HAS_LXML and len(html) >= SUBTREE_PARSE_MIN_CHARS:
+        content_div, index = _find_content_lxml(html, preferred)
+
+    if content_div is None:
+        soup = BeautifulSoup(html, parser if HAS_LXML else "html.parser")
+
+        # 尝试定位正文
+        content_div, index = _find_content_bs4(soup, preferred)
+
+        if not content_div:
+            for script in soup(["script", "style", "nav", "header", "footer"]):
+                script.decompose()
+            content_div = soup.body
+
+        if not content_div:
+            return None
+
+    # --- 1. HTML 预处理：移除干扰元素 (一次遍历) ---
+    (scrubber or get_default_scrubber()).scrub(content_div, url)
+
+    if profiles and index is not None:
+        profiles.record_selector(host, SELECTOR_KEYS[index], SELECTOR_KEYS[index] == preferred)
+        profiles.strip_boilerplate(host, url, content_div)
+
+    return content_div
@@ -0,0 +1,71 @@
+import os
+import json
+import time
+
+CURSOR_VERSION = 1
+
+class CrawlCursor:
+    """
+    可恢复的抓取游标：保存一次抓取的翻页进度，中断 (Ctrl-C、异常、CI 超时被杀) 后可以从断点继续。
+    记录下一页页码、翻页方式与 form 状态 (逐页 POST 时是上一页响应中的 ViewState)、Cookie、
+    已见链接和已采集的通知。每次保存都先写临时文件再替换，被杀时文件要么是旧的、要么是新的，不会损坏。
+    """
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self, source: str, method: str) -> dict | None:
+        """
+        读取游标；不存在、无法解析或不属于同一来源/请求方法时返回 None。
+        """
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except Exception as e:
+            print(f"[warn] 读取抓取游标失败 {self.path}: {e}")
+            return None
+        if state.get("version") != CURSOR_VERSION or state.get("source") != source or state.get("method", "").upper() != method.upper():
+            print(f"[warn] 抓取游标 {self.path} 不属于本次抓取 ({state.get('source')}, {state.get('method')})，忽略。")
+            return None
+        return state
+
+    def save(self, source: str, method: str, next_page: int, max_page: int, component_id: str, target_url: str, form_data: dict,
+             parallel: bool, notices: list[dict], seen_links: set, consecutive_duplicates: int, cookies=None):
+        state = {
+            "version": CURSOR_VERSION,
+            "source": source,
+            "method": method.upper(),
+            "saved_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "next_page": next_page,
+            "max_page": max_page,
+            "component_id": component_id,
+            "target_url": target_url,
+            "form_data": form_data,
+            "parallel": parallel,
+            "consecutive_duplicates": consecutive_duplicates,
+            "cookies": [{"name": c.name, "value": c.value, "domain": c.domain, "path": c.path} for c in cookies or []],
+            "seen_links": sorted(seen_links),
+            "notices": notices,
+        }
+        # 先写临时文件再替换，避免写到一半被中断导致游标损坏
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> bool:
+        """
+        删除游标 (抓取正常结束，或从头开始的抓取遇到上次留下的游标)，返回之前是否有游标。
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
+            return True
+        return False
+
+def restore_cookies(cookies, saved: list[dict]):
+    """
+    把游标中保存的 Cookie 放回 client.cookies (逐页 POST 翻页可能依赖会话 Cookie)。
+    """
+    for cookie in saved or []:
+        cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path") or "/")
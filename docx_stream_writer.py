@@ -0,0 +1,341 @@
+import os
+import re
+import zlib
+import hashlib
+import zipfile
+import tempfile
+from xml.sax.saxutils import escape, quoteattr
+from docx.image.image import Image
+
+# WordprocessingML 命名空间
+NS_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+NS_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_WP = "http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing"
+NS_A = "http://schemas.openxmlformats.org/drawingml/2006/main"
+NS_PIC = "http://schemas.openxmlformats.org/drawingml/2006/picture"
+REL_DOCUMENT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+REL_STYLES = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles"
+REL_IMAGE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/image"
+
+# XML 1.0 不允许的控制字符 (网页正文中偶尔出现)
+_ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+_RUN_BREAKS = re.compile(r'(\n|\t)')
+# 关闭时才写入的部件 (rels、[Content_Types].xml 等) 预留的大小
+_TRAILER_RESERVE = 4096
+_TEXT_WIDTH_TWIPS = 11906 - 1800 * 2
+
+_DOCUMENT_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<w:document xmlns:w="{NS_W}" xmlns:r="{NS_R}" xmlns:wp="{NS_WP}" xmlns:a="{NS_A}" xmlns:pic="{NS_PIC}"><w:body>'
+)
+_DOCUMENT_TAIL = (
+    '<w:sectPr><w:pgSz w:w="11906" w:h="16838"/>'
+    '<w:pgMar w:top="1440" w:right="1800" w:bottom="1440" w:left="1800" w:header="851" w:footer="992" w:gutter="0"/>'
+    '</w:sectPr></w:body></w:document>'
+)
+
+class _Run:
+    def __init__(self, text: str):
+        self.text = text
+        self.bold = None
+        self.italic = None
+
+class _Paragraph:
+    """
+    与 python-docx Paragraph 相同的最小接口 (add_run，可设置 bold/italic)。
+    段落在下一个元素写入或文档关闭时才序列化，因此 add_run 后仍可修改格式。
+    """
+    def __init__(self, style: str = None):
+        self.style = style
+        self.runs = []
+
+    def add_run(self, text: str = "") -> _Run:
+        run = _Run(text)
+        self.runs.append(run)
+        return run
+
+class _Cell:
+    def __init__(self):
+        self.text = ""
+
+class _Table:
+    """
+    与 python-docx Table 相同的最小接口 (cell(row, col).text)，同样在下一个元素写入时才序列化。
+    """
+    def __init__(self, rows: int, cols: int, style: str = None):
+        self.style = style
+        self.cols = cols
+        self._cells = [[_Cell() for _ in range(cols)] for _ in range(rows)]
+
+    def cell(self, row_idx: int, col_idx: int) -> _Cell:
+        return self._cells[row_idx][col_idx]
+
+class StreamingDocxWriter:
+    """
+    流式 docx 写入器：直接输出 WordprocessingML，不在内存中构建 python-docx 的 lxml 对象树。
+    - 正文段落序列化后追加到磁盘临时文件，关闭时一次性写入 word/document.xml；
+    - 图片到达时立即作为 word/media/ 部件写入 zip，相同图片只存一份；
+    - size_bytes 随写入实时更新 (已写入 zip 的字节 + 正文的压缩后大小)，调用方据此在达到上限时分卷。
+    提供 add_paragraph / add_heading / add_table / add_picture / add_page_break，
+    与 add_markdown_content_to_doc 使用的 python-docx 接口一致。
+    """
+    def __init__(self, path: str, font_name: str = '微软雅黑', font_size_pt: float = 10):
+        self.path = path
+        self.font_name = font_name
+        self.font_size_pt = font_size_pt
+        self.zip = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED)
+        self._body = tempfile.TemporaryFile()
+        # 只用于统计正文压缩后的大小，与最终写入 zip 时的压缩结果基本一致
+        self._compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+        self._compressed_body = 0
+        self._pending = None
+        self._media = {}
+        self._media_types = {}
+        self._next_shape_id = 1
+        self.has_content = False
+        self.closed = False
+
+    # --- 与 python-docx Document 一致的接口 ---
+
+    def add_paragraph(self, text: str = "", style: str = None) -> _Paragraph:
+        self._flush_pending()
+        paragraph = _Paragraph(style)
+        if text:
+            paragraph.add_run(text)
+        self._pending = paragraph
+        return paragraph
+
+    def add_heading(self, text: str = "", level: int = 1) -> _Paragraph:
+        return self.add_paragraph(text, style=f"Heading{level}")
+
+    def add_table(self, rows: int, cols: int, style: str = None) -> _Table:
+        self._flush_pending()
+        table = _Table(rows, cols, style)
+        self._pending = table
+        return table
+
+    def add_page_break(self):
+        self._flush_pending()
+        self._write('<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+
+    def add_picture(self, image_descriptor, width=None, height=None):
+        """
+        image_descriptor: 文件路径或二进制流；width/height 为 EMU (可直接传 docx.shared.Inches(...))。
+        无法识别的图片格式抛出 python-docx 的 UnrecognizedImageError，与 Document.add_picture 一致。
+        """
+        if isinstance(image_descriptor, (str, os.PathLike)):
+            with open(image_descriptor, "rb") as f:
+                blob = f.read()
+        else:
+            blob = image_descriptor.read()
+        image = Image.from_blob(blob)
+        cx, cy = image.scaled_dimensions(width, height)
+        rel_id, filename = self._add_media(blob, image)
+        self._flush_pending()
+        shape_id = self._next_shape_id
+        self._next_shape_id += 1
+        self._write(
+            '<w:p><w:r><w:drawing>'
+            f'<wp:inline distT="0" distB="0" distL="0" distR="0"><wp:extent cx="{int(cx)}" cy="{int(cy)}"/>'
+            f'<wp:docPr id="{shape_id}" name="Picture {shape_id}"/>'
+            '<wp:cNvGraphicFramePr><a:graphicFrameLocks noChangeAspect="1"/></wp:cNvGraphicFramePr>'
+            f'<a:graphic><a:graphicData uri="{NS_PIC}"><pic:pic>'
+            f'<pic:nvPicPr><pic:cNvPr id="0" name={quoteattr(filename)}/><pic:cNvPicPr/></pic:nvPicPr>'
+            f'<pic:blipFill><a:blip r:embed="{rel_id}"/><a:stretch><a:fillRect/></a:stretch></pic:blipFill>'
+            f'<pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{int(cx)}" cy="{int(cy)}"/></a:xfrm>'
+            '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></pic:spPr>'
+            '</pic:pic></a:graphicData></a:graphic></wp:inline></w:drawing></w:r></w:p>'
+        )
+
+    # --- 序列化 ---
+
+    def _add_media(self, blob: bytes, image: Image):
+        digest = hashlib.sha1(blob).hexdigest()
+        if digest in self._media:
+            return self._media[digest]
+        index = len(self._media) + 1
+        ext = image.ext.lower()
+        filename = f"image{index}.{ext}"
+        # 图片本身已是压缩格式，不再 deflate
+        self.zip.writestr(f"word/media/{filename}", blob, compress_type=zipfile.ZIP_STORED)
+        self._media_types[ext] = image.content_type
+        self._media[digest] = (f"rId{index + 1}", filename)
+        self.has_content = True
+        return self._media[digest]
+
+    def _flush_pending(self):
+        element, self._pending = self._pending, None
+        if element is None:
+            return
+        if isinstance(element, _Table):
+            self._write(self._table_xml(element))
+        else:
+            self._write(self._paragraph_xml(element))
+
+    def _paragraph_xml(self, paragraph: _Paragraph) -> str:
+        parts = ['<w:p>']
+        if paragraph.style:
+            parts.append(f'<w:pPr><w:pStyle w:val="{paragraph.style}"/></w:pPr>')
+        for run in paragraph.runs:
+            parts.append('<w:r>')
+            if run.bold or run.italic:
+                parts.append('<w:rPr>')
+                if run.bold:
+                    parts.append('<w:b/>')
+                if run.italic:
+                    parts.append('<w:i/>')
+                parts.append('</w:rPr>')
+            # 与 python-docx 一致：\n 转为换行，\t 转为制表符
+            for piece in _RUN_BREAKS.split(_ILLEGAL_XML_CHARS.sub('', run.text or '')):
+                if piece == '\n':
+                    parts.append('<w:br/>')
+                elif piece == '\t':
+                    parts.append('<w:tab/>')
+                elif piece:
+                    parts.append(f'<w:t xml:space="preserve">{escape(piece)}</w:t>')
+            parts.append('</w:r>')
+        parts.append('</w:p>')
+        return ''.join(parts)
+
+    def _table_xml(self, table: _Table) -> str:
+        # 表格平均分配版心宽度 (A4 减去左右页边距，单位 twip)
+        col_width = _TEXT_WIDTH_TWIPS // max(1, table.cols)
+        parts = ['<w:tbl><w:tblPr>']
+        if table.style:
+            parts.append(f'<w:tblStyle w:val="{table.style.replace(" ", "")}"/>')
+        parts.append('<w:tblW w:w="0" w:type="auto"/><w:tblLook w:val="04A0"/></w:tblPr><w:tblGrid>')
+        parts.append(f'<w:gridCol w:w="{col_width}"/>' * table.cols)
+        parts.append('</w:tblGrid>')
+        for row in table._cells:
+            parts.append('<w:tr>')
+            for cell in row:
+                paragraph = _Paragraph()
+                if cell.text:
+                    paragraph.add_run(cell.text)
+                parts.append(f'<w:tc><w:tcPr><w:tcW w:w="{col_width}" w:type="dxa"/></w:tcPr>{self._paragraph_xml(paragraph)}</w:tc>')
+            parts.append('</w:tr>')
+        parts.append('</w:tbl>')
+        return ''.join(parts)
+
+    def _write(self, xml: str):
+        data = xml.encode("utf-8")
+        self._body.write(data)
+        self._compressed_body += len(self._compressor.compress(data))
+        self.has_content = True
+
+    @property
+    def size_bytes(self) -> int:
+        """
+        当前文档关闭后的大致文件大小。
+        """
+        pending = 256 if self._pending is not None else 0
+        return self.zip.fp.tell() + self._compressed_body + pending + _TRAILER_RESERVE + 100 * len(self._media)
+
+    def close(self):
+        if self.closed:
+            return
+        self._flush_pending()
+        self.closed = True
+        try:
+            with self.zip.open("word/document.xml", "w", force_zip64=True) as f:
+                f.write(_DOCUMENT_HEAD.encode("utf-8"))
+                self._body.seek(0)
+                while True:
+                    chunk = self._body.read(1024 * 1024)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                f.write(_DOCUMENT_TAIL.encode("utf-8"))
+            self.zip.writestr("word/styles.xml", self._styles_xml())
+            self.zip.writestr("word/_rels/document.xml.rels", self._document_rels_xml())
+            self.zip.writestr("_rels/.rels", self._package_rels_xml())
+            self.zip.writestr("[Content_Types].xml", self._content_types_xml())
+        finally:
+            self.zip.close()
+            self._body.close()
+
+    def abort(self):
+        """
+        放弃当前文件 (没有任何内容时调用，不留下空文档)。
+        """
+        if not self.closed:
+            self.closed = True
+            self.zip.close()
+            self._body.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _styles_xml(self) -> str:
+        font = quoteattr(self.font_name)
+        size = int(round(self.font_size_pt * 2))
+
+        def heading(level, half_points, color):
+            return (
+                f'<w:style w:type="paragraph" w:styleId="Heading{level}"><w:name w:val="heading {level}"/>'
+                '<w:basedOn w:val="Normal"/><w:next w:val="Normal"/><w:qFormat/>'
+                f'<w:pPr><w:keepNext/><w:spacing w:before="{480 if level == 1 else 200}" w:after="0"/><w:outlineLvl w:val="{level - 1}"/></w:pPr>'
+                f'<w:rPr><w:b/><w:color w:val="{color}"/><w:sz w:val="{half_points}"/></w:rPr></w:style>'
+            )
+
+        return (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<w:styles xmlns:w="{NS_W}">'
+            f'<w:docDefaults><w:rPrDefault><w:rPr><w:rFonts w:ascii={font} w:hAnsi={font} w:eastAsia={font} w:cs={font}/>'
+            f'<w:sz w:val="{size}"/><w:szCs w:val="{size}"/><w:lang w:val="en-US" w:eastAsia="zh-CN"/></w:rPr></w:rPrDefault>'
+            '<w:pPrDefault><w:pPr><w:spacing w:after="200" w:line="276" w:lineRule="auto"/></w:pPr></w:pPrDefault></w:docDefaults>'
+            '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/><w:qFormat/></w:style>'
+            + heading(1, 28, "365F91")
+            + heading(2, 26, "4F81BD")
+            + heading(3, 22, "4F81BD")
+            + '<w:style w:type="table" w:default="1" w:styleId="TableNormal"><w:name w:val="Normal Table"/>'
+            '<w:tblPr><w:tblInd w:w="0" w:type="dxa"/><w:tblCellMar><w:top w:w="0" w:type="dxa"/><w:left w:w="108" w:type="dxa"/>'
+            '<w:bottom w:w="0" w:type="dxa"/><w:right w:w="108" w:type="dxa"/></w:tblCellMar></w:tblPr></w:style>'
+            '<w:style w:type="table" w:styleId="TableGrid"><w:name w:val="Table Grid"/><w:basedOn w:val="TableNormal"/>'
+            '<w:pPr><w:spacing w:after="0" w:line="240" w:lineRule="auto"/></w:pPr><w:tblPr><w:tblBorders>'
+            '<w:top w:val="single" w:sz="4" w:space="0" w:color="auto"/><w:left w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+            '<w:bottom w:val="single" w:sz="4" w:space="0" w:color="auto"/><w:right w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+            '<w:insideH w:val="single" w:sz="4" w:space="0" w:color="auto"/><w:insideV w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+            '</w:tblBorders></w:tblPr></w:style>'
+            + '</w:styles>'
+        )
+
+    def _document_rels_xml(self) -> str:
+        rels = [f'<Relationship Id="rId1" Type="{REL_STYLES}" Target="styles.xml"/>']
+        for rel_id, filename in self._media.values():
+            rels.append(f'<Relationship Id="{rel_id}" Type="{REL_IMAGE}" Target="media/{filename}"/>')
+        return (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + ''.join(rels) + '</Relationships>'
+        )
+
+    def _package_rels_xml(self) -> str:
+        return (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'<Relationship Id="rId1" Type="{REL_DOCUMENT}" Target="word/document.xml"/></Relationships>'
+        )
+
+    def _content_types_xml(self) -> str:
+        defaults = [
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>',
+            '<Default Extension="xml" ContentType="application/xml"/>',
+        ]
+        for ext, content_type in sorted(self._media_types.items()):
+            defaults.append(f'<Default Extension="{ext}" ContentType="{content_type}"/>')
+        return (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            + ''.join(defaults)
+            + '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            '<Override PartName="/word/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+            '</Types>'
+        )
@@ -0,0 +1,205 @@
+import os
+import re
+import json
+import hashlib
+import threading
+from bs4 import Tag
+
+EXTRACTION_PROFILES_FILE = "extraction_profiles.json"
+
+# 参与指纹统计的块级元素；文字超过 MAX_BOILERPLATE_CHARS 的块继续向下查找更小的块
+FINGERPRINT_TAGS = {'p', 'div', 'li', 'ul', 'ol', 'table', 'section', 'center', 'blockquote', 'dl', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+MAX_BOILERPLATE_CHARS = 200
+_WHITESPACE = re.compile(r'\s+')
+
+class ExtractionProfiles:
+    """
+    按 host 学习并持久化的正文提取配置：
+    - selector: 上次命中的正文选择器 (XPath 字符串)，下次优先尝试，不匹配时回退到完整的选择器列表；
+    - fingerprints: 正文中较短的块级子树 (标签 + 规范化文字 + 图片地址) 的指纹出现在多少个不同页面中。
+      出现在至少 min_pages 个页面、且占该 host 页面数 min_ratio 以上的块视为模板内容
+      ("打印本页"、"关闭窗口"、固定的来源署名等)，以后提取时直接删除。
+      比例要求较高，"附件：" 这类只在部分文章中出现的短标签不会被误删。
+    同一 URL 重复提取只统计一次，避免基准测试或重试把正文误判为重复内容。
+    journal 为列表时，每次学习 (命中的选择器、页面指纹、删除数) 同时记入其中，
+    进程池的子进程用它把学习结果交回父进程 merge()，配置文件只由父进程保存。
+    """
+    def __init__(self, path: str = EXTRACTION_PROFILES_FILE, min_pages: int = 5, min_ratio: float = 0.6,
+                 max_fingerprints: int = 2000, max_seen_pages: int = 1000):
+        self.path = path
+        self.min_pages = min_pages
+        self.min_ratio = min_ratio
+        self.max_fingerprints = max_fingerprints
+        self.max_seen_pages = max_seen_pages
+        self._lock = threading.Lock()
+        self.hosts = {}
+        self.fast_hits = 0
+        self.fast_misses = 0
+        self.removed = 0
+        self.dirty = False
+        self.journal = None
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.hosts = json.load(f)
+            except Exception as e:
+                print(f"[warn] 读取提取配置失败 {path}: {e}")
+
+    def _profile(self, host: str) -> dict:
+        profile = self.hosts.get(host)
+        if profile is None:
+            profile = {"selector": None, "pages": 0, "seen": [], "fingerprints": {}}
+            self.hosts[host] = profile
+        return profile
+
+    def preferred_selector(self, host: str):
+        with self._lock:
+            profile = self.hosts.get(host)
+            return profile["selector"] if profile else None
+
+    def record_selector(self, host: str, selector: str, fast_path: bool):
+        """
+        记录本页命中的选择器；fast_path 表示是否直接命中了已学习的选择器。
+        """
+        with self._lock:
+            if self.journal is not None:
+                self.journal.append(("selector", host, selector, fast_path))
+            if fast_path:
+                self.fast_hits += 1
+                return
+            profile = self._profile(host)
+            if profile["selector"] is not None:
+                # 已学习的选择器不再匹配 (页面改版等)，改用这次的结果
+                self.fast_misses += 1
+            if profile["selector"] != selector:
+                profile["selector"] = selector
+                self.dirty = True
+
+    def strip_boilerplate(self, host: str, url: str, node) -> int:
+        """
+        统计 node 中短块的指纹，并删除已学习为模板内容的块，返回删除的节点数。
+        """
+        blocks = list(_fingerprint_blocks(node))
+        page_key = hashlib.sha1(url.encode("utf-8")).hexdigest()[:12]
+        fingerprints = list({fingerprint for fingerprint, _, _ in blocks})
+        with self._lock:
+            if self.journal is not None:
+                self.journal.append(("page", host, page_key, fingerprints))
+            self._count_page(host, page_key, fingerprints)
+            profile = self._profile(host)
+            threshold = max(self.min_pages, profile["pages"] * self.min_ratio)
+            counts = profile["fingerprints"]
+            boilerplate = [(tag, length) for fingerprint, tag, length in blocks if counts.get(fingerprint, 0) >= threshold]
+
+        if not boilerplate:
+            return 0
+        # 几乎整篇都是"重复内容"时多半是选择器命中了模板区域，不删除，交给调用方原样输出
+        total_length = len(_WHITESPACE.sub('', node.get_text()))
+        if sum(length for _, length in boilerplate) >= total_length * 0.9:
+            return 0
+        for tag, _ in boilerplate:
+            tag.decompose()
+        with self._lock:
+            if self.journal is not None:
+                self.journal.append(("removed", host, len(boilerplate)))
+            self.removed += len(boilerplate)
+        return len(boilerplate)
+
+    def _count_page(self, host: str, page_key: str, fingerprints):
+        # 调用方持有 self._lock
+        profile = self._profile(host)
+        if page_key in profile["seen"]:
+            return
+        profile["seen"].append(page_key)
+        del profile["seen"][:-self.max_seen_pages]
+        profile["pages"] += 1
+        counts = profile["fingerprints"]
+        for fingerprint in fingerprints:
+            # 重新插入到末尾：字典顺序即最近一次出现的顺序，_prune 用它区分出现次数相同的指纹
+            counts[fingerprint] = counts.pop(fingerprint, 0) + 1
+        self._prune(counts)
+        self.dirty = True
+
+    def snapshot(self) -> dict:
+        """
+        当前学习结果的深拷贝 (可 pickle)，用于初始化进程池的子进程。
+        """
+        with self._lock:
+            return json.loads(json.dumps(self.hosts))
+
+    def drain_journal(self) -> list:
+        with self._lock:
+            journal, self.journal = self.journal, ([] if self.journal is not None else None)
+        return journal or []
+
+    def merge(self, journal):
+        """
+        合并子进程 drain_journal() 交回的学习记录。
+        """
+        for record in journal:
+            kind, host = record[0], record[1]
+            if kind == "selector":
+                self.record_selector(host, record[2], record[3])
+                continue
+            with self._lock:
+                if kind == "page":
+                    self._count_page(host, record[2], record[3])
+                elif kind == "removed":
+                    self.removed += record[2]
+
+    def _prune(self, counts: dict):
+        # 指纹过多时优先丢弃只出现过一次的 (正文段落几乎都只出现一次)；
+        # 次数相同时丢弃最久没有出现的，刚记录的页面中的新指纹不会立即被淘汰
+        if len(counts) <= self.max_fingerprints:
+            return
+        items = list(counts.items())
+        ranked = sorted(range(len(items)), key=lambda i: (items[i][1], i), reverse=True)
+        keep = sorted(ranked[:int(self.max_fingerprints * 0.8)])
+        counts.clear()
+        counts.update(items[i] for i in keep)
+
+    def summary(self) -> str:
+        with self._lock:
+            return f"{len(self.hosts)} 个站点，选择器直接命中 {self.fast_hits} 次、失效 {self.fast_misses} 次，删除模板块 {self.removed} 个"
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            if not self.dirty:
+                return
+            data = json.loads(json.dumps(self.hosts))
+            self.dirty = False
+        # 先写临时文件再替换，避免写到一半被中断导致配置损坏
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+def _fingerprint_blocks(node):
+    """
+    产出 (指纹, 元素, 文字长度)：最外层的、文字不超过 MAX_BOILERPLATE_CHARS 的块级元素。
+    """
+    stack = [child for child in reversed(node.contents) if isinstance(child, Tag)]
+    while stack:
+        tag = stack.pop()
+        if tag.name in FINGERPRINT_TAGS:
+            text = _WHITESPACE.sub(' ', tag.get_text()).strip()
+            if len(text) <= MAX_BOILERPLATE_CHARS:
+                srcs = [img.get('src', '') for img in tag.find_all('img')]
+                if text or srcs:
+                    key = f"{tag.name}|{text}|{' '.join(srcs)}"
+                    yield hashlib.sha1(key.encode("utf-8")).hexdigest()[:16], tag, len(text.replace(' ', ''))
+                continue
+        stack.extend(child for child in reversed(tag.contents) if isinstance(child, Tag))
+
+# 进程内共享的默认提取配置
+_default_profiles = None
+_default_profiles_lock = threading.Lock()
+
+def get_default_profiles() -> ExtractionProfiles:
+    global _default_profiles
+    with _default_profiles_lock:
+        if _default_profiles is None:
+            _default_profiles = ExtractionProfiles()
+        return _default_profiles
@@ -0,0 +1,221 @@
+import time
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from article_processor import fetch_article_content, fetch_article_source, fetch_image, content_image_srcs, content_text
+
+class FetchedArticle:
+    """
+    一篇文章的抓取结果：正文 (Markdown 文本或文档块列表)，以及预先下载好的图片 {src: FetchResult 或 Exception}。
+    """
+    def __init__(self, item):
+        self.item = item
+        self.content = None
+        self.images = {}
+        self.error = None
+
+    def raise_error(self):
+        if self.error is not None:
+            raise self.error
+
+    @property
+    def size_bytes(self) -> int:
+        """
+        在内存中占用的大致字节数 (正文 + 图片)，用于预取缓冲区的内存上限。
+        """
+        size = len(content_text(self.content).encode("utf-8")) if self.content else 0
+        for result in self.images.values():
+            size += getattr(result, "body_bytes", 0)
+        return size
+
+class _OrderedPrefetcher:
+    """
+    按原顺序交付、带上限的预取：
+    - 最多提前 window 篇；
+    - 已抓取完、尚未被取走的内容超过 max_buffer_bytes 时不再提交新任务 (背压)，
+      但总会保证下一篇在抓取中，避免消费者饿死。
+    子类实现 submit(item) -> concurrent.futures.Future[FetchedArticle]。
+    """
+    def __init__(self, window: int, max_buffer_mb: float, stop_event=None, pause_event=None):
+        self.window = window
+        self.max_buffer_bytes = int(max_buffer_mb * 1024 * 1024)
+        self.stop_event = stop_event
+        self.pause_event = pause_event
+
+    def _stopped(self) -> bool:
+        return bool(self.stop_event and self.stop_event.is_set())
+
+    def _paused(self) -> bool:
+        return bool(self.pause_event and self.pause_event.is_set()) and not self._stopped()
+
+    def _buffered_bytes(self, pending) -> int:
+        return sum(future.result().size_bytes for future in pending if future.done() and not future.cancelled())
+
+    def fetch_in_order(self, items):
+        """
+        生成器：按 items 的原始顺序逐篇返回 FetchedArticle。
+        """
+        pending = deque()
+        iterator = iter(items)
+        exhausted = False
+        while True:
+            # 补充预取队列
+            while not exhausted and not self._stopped() and len(pending) < self.window:
+                if pending and self._buffered_bytes(pending) >= self.max_buffer_bytes:
+                    break
+                item = next(iterator, None)
+                if item is None:
+                    exhausted = True
+                    break
+                pending.append(self.submit(item))
+            if not pending:
+                return
+            yield pending.popleft().result()
+
+    def _wait_if_paused(self):
+        # 暂停时工作线程不开始新的请求
+        while self._paused():
+            time.sleep(0.2)
+
+class ArticleFetchEngine(_OrderedPrefetcher):
+    """
+    基于 asyncio 的文章抓取引擎。
+    事件循环运行在后台线程中，阻塞的 HttpClient 请求交给线程池执行；
+    每个 host 用一个 asyncio.Semaphore 限制并发数，正文页与图片可以同时下载。
+    fetch_in_order() 按原列表顺序交付结果，供文档生成按顺序写入。
+    传入 extract_pool 时，详情页下载完即释放 host 的并发名额，解析与提取在进程池中进行。
+    """
+    def __init__(self, client, per_host_concurrency: int = 4, download_images: bool = True, window: int = None,
+                 max_buffer_mb: float = 64, image_cache=None, stop_event=None, pause_event=None, extract_mode: str = "markdown", article_cache=None, extract_pool=None):
+        # 默认最多提前抓取 per_host_concurrency * 4 篇，避免一次把整个列表读进内存
+        super().__init__(window or per_host_concurrency * 4, max_buffer_mb, stop_event, pause_event)
+        self.client = client
+        self.per_host_concurrency = per_host_concurrency
+        self.download_images = download_images
+        self.image_cache = image_cache
+        self.extract_mode = extract_mode
+        self.article_cache = article_cache
+        self.extract_pool = extract_pool
+        self.executor = ThreadPoolExecutor(max_workers=per_host_concurrency * 4, thread_name_prefix="fetch")
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="fetch-engine", daemon=True)
+        self.thread.start()
+        # 只在事件循环线程中访问
+        self._semaphores = {}
+
+    def _semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_host_concurrency)
+            self._semaphores[host] = semaphore
+        return semaphore
+
+    async def _run(self, url: str, func, *args):
+        async with self._semaphore(url):
+            while self._paused():
+                await asyncio.sleep(0.2)
+            return await self.loop.run_in_executor(self.executor, func, *args)
+
+    async def _fetch_article(self, item) -> FetchedArticle:
+        article = FetchedArticle(item)
+        try:
+            article.content = await self._fetch_content(item['link'])
+        except Exception as e:
+            article.error = e
+            return article
+
+        if self.download_images:
+            # 同一篇文章中重复出现的图片只下载一次
+            srcs = content_image_srcs(article.content)
+            results = await asyncio.gather(*(self._run(src, fetch_image, src, self.client, self.image_cache) for src in srcs), return_exceptions=True)
+            article.images = dict(zip(srcs, results))
+        return article
+
+    async def _fetch_content(self, url: str):
+        if self.extract_pool is None:
+            return await self._run(url, fetch_article_content, url, self.client, True, self.extract_mode, self.article_cache)
+        # 只有请求占用 host 的并发名额；提取交给进程池，不同文章的解析可以同时占满所有核
+        source = await self._run(url, fetch_article_source, url, self.client, self.extract_mode, self.article_cache)
+        if source.content is None:
+            content = await self.loop.run_in_executor(self.executor, self.extract_pool.extract, source.html, url, self.extract_mode)
+            source.complete(content)
+        return source.content
+
+    def submit(self, item):
+        """
+        提交一篇文章，返回 concurrent.futures.Future[FetchedArticle]。
+        """
+        return asyncio.run_coroutine_threadsafe(self._fetch_article(item), self.loop)
+
+    async def _cancel_pending(self):
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def close(self):
+        # 中途停止时，取消还在排队的预取任务
+        asyncio.run_coroutine_threadsafe(self._cancel_pending(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        # 停止后未开始的任务直接取消，不再发请求
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class PrefetchPipeline(_OrderedPrefetcher):
+    """
+    线程池版本的生产者/消费者预取 (不依赖 asyncio)：
+    workers 个工作线程抓取并清洗后面的 prefetch 篇文章 (正文 + 图片字节)，
+    主线程同时把当前文章写入 Document，下载与文档组装并行进行。
+    """
+    def __init__(self, client, workers: int = 4, prefetch: int = 8, download_images: bool = True,
+                 max_buffer_mb: float = 64, image_cache=None, stop_event=None, pause_event=None, extract_mode: str = "markdown", article_cache=None, extract_pool=None):
+        super().__init__(prefetch, max_buffer_mb, stop_event, pause_event)
+        self.client = client
+        self.download_images = download_images
+        self.image_cache = image_cache
+        self.extract_mode = extract_mode
+        self.article_cache = article_cache
+        self.extract_pool = extract_pool
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+
+    def _fetch_article(self, item) -> FetchedArticle:
+        article = FetchedArticle(item)
+        self._wait_if_paused()
+        try:
+            article.content = fetch_article_content(item['link'], self.client, raise_errors=True, extract_mode=self.extract_mode, article_cache=self.article_cache, extract_pool=self.extract_pool)
+        except Exception as e:
+            article.error = e
+            return article
+
+        if self.download_images:
+            for src in content_image_srcs(article.content):
+                if self._stopped():
+                    break
+                self._wait_if_paused()
+                try:
+                    article.images[src] = fetch_image(src, self.client, self.image_cache)
+                except Exception as e:
+                    article.images[src] = e
+        return article
+
+    def submit(self, item):
+        return self.executor.submit(self._fetch_article, item)
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
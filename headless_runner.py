@@ -3,11 +3,20 @@ import json
 import time
 import scrape_notices
 import article_processor
-from datetime import datetime
+from http_cache import ValidatorCache
+from list_page import notice_timestamp, timestamp_before, newest_timestamp
+from list_templates import ListTemplateCache
+from rate_limiter import configure_default_rate_limiter
+from datetime import datetime, timedelta
 
 # Configuration
 HISTORY_FILE = "history.json"
+HTTP_CACHE_FILE = "http_cache.json"
+LIST_TEMPLATE_FILE = "list_templates.json"
+WATERMARK_FILE = "watermarks.json"
 OUTPUT_DIR = "output"
+# Per-host request rate ceiling (req/s); the limiter adapts below it and backs off on errors
+MAX_RATE = 2.0
 PRESETS = {
     "官网学校新闻": "https://www.sdxd.edu.cn/page/20190417140037rmry93pvdhwspazvhn.html",
     "官网通知公告": "https://www.sdxd.edu.cn/page/20190417141109v1ewezmjl1uf1hqy9h.html",
@@ -32,6 +41,35 @@ def save_history(history):
     with open(HISTORY_FILE, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
 
+def load_watermarks():
+    # Newest publication timestamp seen per source URL (see list_page.notice_timestamp)
+    if os.path.exists(WATERMARK_FILE):
+        try:
+            with open(WATERMARK_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error loading watermarks: {e}")
+    return {}
+
+def save_watermarks(watermarks):
+    with open(WATERMARK_FILE, "w", encoding="utf-8") as f:
+        json.dump(watermarks, f, indent=2, ensure_ascii=False)
+
+def next_watermark(previous, processed_items, failed_items):
+    """
+    Advance the watermark to the newest processed item, but never past an item that failed:
+    failed articles must still be above the watermark next run so they are picked up again.
+    Full timestamps are exclusive bounds, so a failed item pulls the watermark to one second before it.
+    """
+    watermark = newest_timestamp(processed_items, previous)
+    for item in failed_items:
+        key = notice_timestamp(item)
+        if key and watermark and timestamp_before(key, watermark, or_equal=True):
+            watermark = key
+            if len(key) == 14:
+                watermark = (datetime.strptime(key, "%Y%m%d%H%M%S") - timedelta(seconds=1)).strftime("%Y%m%d%H%M%S")
+    return watermark
+
 def ensure_dir(directory):
     if not os.path.exists(directory):
         os.makedirs(directory)
@@ -39,8 +77,12 @@ def ensure_dir(directory):
 def run():
     print(f"Starting scrape job at {datetime.now()}")
     ensure_dir(OUTPUT_DIR)
+    configure_default_rate_limiter(max_rate=MAX_RATE)
     
     history = load_history()
+    validator_cache = ValidatorCache(HTTP_CACHE_FILE)
+    template_cache = ListTemplateCache(LIST_TEMPLATE_FILE)
+    watermarks = load_watermarks()
     has_updates = False
     
     for name, url in PRESETS.items():
@@ -73,19 +115,18 @@ def run():
                 output_file=temp_txt,
                 is_file=False,
                 timeout=30.0,
-                history=url_history
+                history=url_history,
+                validator_cache=validator_cache,
+                # Skip the initial page and go straight to the page-1 data request when the template still validates
+                template_cache=template_cache,
+                # Stop paging as soon as the list drops below the newest item seen last run
+                watermark=watermarks.get(url)
             )
             
             if new_items:
                 print(f"Found {len(new_items)} new items for {name}")
                 has_updates = True
                 
-                # Update history
-                if url not in history:
-                    history[url] = set()
-                for item in new_items:
-                    history[url].add(item['link'])
-                
                 # Generate Word doc
                 date_str = datetime.now().strftime("%Y%m%d_%H%M%S")
                 doc_name = f"{name}_{date_str}.docx"
@@ -93,19 +134,46 @@ def run():
                 
                 print(f"Generating Word document: {doc_path}")
                 
-                article_processor.generate_word_doc(
+                failed_items = article_processor.generate_word_doc(
                     items=new_items,
                     output_path=doc_path,
                     max_size_mb=100,
                     progress_callback=lambda c, t, title: print(f"  [{c}/{t}] {title}"),
-                    download_images=True
+                    download_images=True,
+                    # Stream straight into the zip so memory stays flat on CI runners
+                    writer="stream",
+                    # Walk the cleaned DOM directly (keeps tables and lists, skips the Markdown round-trip)
+                    extract_mode="dom",
+                    # Parse pages in a small process pool while threads keep downloading; CI runners are
+                    # shared and the rate limiter caps throughput anyway, so two workers are enough
+                    # (small incremental batches skip the pool entirely, see EXTRACT_POOL_MIN_ITEMS)
+                    extract_workers=min(2, os.cpu_count() or 1)
+                )
+                
+                # Update history (articles that still failed after retries are left out and picked up next run)
+                failed_links = {item['link'] for item in failed_items}
+                if url not in history:
+                    history[url] = set()
+                for item in new_items:
+                    if item['link'] not in failed_links:
+                        history[url].add(item['link'])
+                watermarks[url] = next_watermark(
+                    watermarks.get(url),
+                    [item for item in new_items if item['link'] not in failed_links],
+                    failed_items
                 )
+                if failed_links:
+                    print(f"  {len(failed_links)} articles failed and will be retried next run")
+                    # The list page must be fetched again next run for these items to be found
+                    validator_cache.discard(url)
                 
             else:
                 print(f"No new items for {name}")
                 
         except Exception as e:
             print(f"Error processing {name}: {e}")
+            # Forget the validators so the next run does not treat this page as already processed
+            validator_cache.discard(url)
         finally:
             # Clean up temp file
             if os.path.exists(temp_txt):
@@ -117,8 +185,12 @@ def run():
     if has_updates:
         print("Saving history...")
         save_history(history)
+        save_watermarks(watermarks)
     else:
         print("No updates found in any category.")
 
+    validator_cache.save()
+    template_cache.save()
+
 if __name__ == "__main__":
     run()
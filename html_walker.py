@@ -0,0 +1,142 @@
+import re
+from bs4 import NavigableString, Tag, Comment, Doctype, CData, ProcessingInstruction, Declaration
+
+# 文档块 (元组，写入 Word 时按类型分派)：
+#   ("p", text)          一个段落
+#   ("img", alt, src)    一张图片 (src 已是绝对地址)
+#   ("table", rows)      表格，rows 为 [[单元格文字, ...], ...]，各行列数已补齐
+PARAGRAPH = "p"
+IMAGE = "img"
+TABLE = "table"
+
+# 这些标签的开始和结束都会结束当前段落
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'center', 'dd', 'details', 'dialog', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header',
+    'hgroup', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'section', 'summary', 'ul', 'tr', 'caption',
+}
+SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'iframe', 'object', 'embed', 'select', 'button', 'head', 'title', 'meta', 'link'}
+_SKIP_STRINGS = (Comment, Doctype, CData, ProcessingInstruction, Declaration)
+_WHITESPACE = re.compile(r'\s+')
+
+class _Walker:
+    """
+    一次遍历清洗后的正文 DOM，直接产出文档块：
+    - 行内标签 (a/span/strong/font 等) 只保留文字，与 Markdown 路径去掉格式的效果一致；
+    - <br> 和块级标签切分段落，<pre> 按原有换行切分；
+    - 列表项加上 "• " 或 "1. " 前缀，嵌套列表逐级缩进；
+    - 表格保留为表格块，单元格中的图片放在表格之后。
+    """
+    def __init__(self):
+        self.blocks = []
+        self._line = []
+
+    def flush(self, prefix: str = ""):
+        text = _WHITESPACE.sub(' ', ''.join(self._line)).strip()
+        self._line = []
+        if text:
+            self.blocks.append((PARAGRAPH, prefix + text))
+
+    def walk(self, node, list_depth: int = 0):
+        for child in node.children:
+            if isinstance(child, NavigableString):
+                if not isinstance(child, _SKIP_STRINGS):
+                    self._line.append(str(child))
+                continue
+            if not isinstance(child, Tag):
+                continue
+            name = child.name
+            if name in SKIP_TAGS:
+                continue
+            if name == 'br':
+                self.flush()
+            elif name == 'img':
+                src = child.get('src')
+                if src:
+                    self.flush()
+                    self.blocks.append((IMAGE, child.get('alt') or '', src))
+            elif name == 'table':
+                self.flush()
+                self._table(child)
+            elif name in ('ul', 'ol'):
+                self.flush()
+                self._list(child, list_depth)
+            elif name == 'pre':
+                self.flush()
+                for line in child.get_text().splitlines():
+                    line = line.strip()
+                    if line:
+                        self.blocks.append((PARAGRAPH, line))
+            elif name in BLOCK_TAGS:
+                self.flush()
+                self.walk(child, list_depth)
+                self.flush()
+            else:
+                self.walk(child, list_depth)
+
+    def _list(self, node, depth: int):
+        ordered = node.name == 'ol'
+        try:
+            number = int(node.get('start', 1))
+        except ValueError:
+            number = 1
+        indent = "    " * depth
+        for li in node.find_all('li', recursive=False):
+            marker = f"{number}. " if ordered else "• "
+            number += 1
+            first = len(self.blocks)
+            self.walk(li, depth + 1)
+            self.flush()
+            # 列表项的第一个段落加上编号/项目符号，其余段落只缩进
+            marked = False
+            for i in range(first, len(self.blocks)):
+                block = self.blocks[i]
+                if block[0] != PARAGRAPH or block[1].startswith(indent + "    "):
+                    continue
+                self.blocks[i] = (PARAGRAPH, indent + (marker if not marked else " " * len(marker)) + block[1])
+                marked = True
+
+    def _table(self, node):
+        rows = []
+        images = []
+        for tr in node.find_all('tr'):
+            # 跳过嵌套表格中的行，由外层单元格的文字覆盖
+            if tr.find_parent('table') is not node:
+                continue
+            cells = []
+            for cell in tr.find_all(('td', 'th'), recursive=False):
+                walker = _Walker()
+                walker.walk(cell)
+                walker.flush()
+                cells.append("\n".join(block[1] for block in walker.blocks if block[0] == PARAGRAPH))
+                images.extend(block for block in walker.blocks if block[0] == IMAGE)
+            if any(cells):
+                rows.append(cells)
+        if rows:
+            cols = max(len(row) for row in rows)
+            self.blocks.append((TABLE, [row + [''] * (cols - len(row)) for row in rows]))
+        self.blocks.extend(images)
+
+def html_to_blocks(node) -> list:
+    """
+    把清洗后的正文节点转换为文档块列表 (见模块开头的说明)。
+    """
+    walker = _Walker()
+    walker.walk(node)
+    walker.flush()
+    return walker.blocks
+
+def blocks_image_srcs(blocks) -> list:
+    return [block[2] for block in blocks if block[0] == IMAGE]
+
+def blocks_text(blocks) -> str:
+    """
+    文档块中的全部文字 (用于文档大小估算和预取缓冲区统计)。
+    """
+    parts = []
+    for block in blocks:
+        if block[0] == PARAGRAPH:
+            parts.append(block[1])
+        elif block[0] == TABLE:
+            parts.extend("\t".join(row) for row in block[1])
+    return "\n".join(parts)
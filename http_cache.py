@@ -0,0 +1,82 @@
+import os
+import re
+import json
+import hashlib
+import threading
+
+# 每次请求都会变化、但与页面内容无关的部分，计算指纹前先去掉
+_VOLATILE_INPUT_RE = re.compile(rb'<input[^>]*name="__(?:VIEWSTATE|VIEWSTATEGENERATOR|EVENTVALIDATION)"[^>]*>', re.I)
+_WHITESPACE_RE = re.compile(rb'\s+')
+
+def body_fingerprint(content: bytes) -> str:
+    """
+    计算规范化后正文的哈希：去掉 ViewState 等隐藏域并合并空白。
+    """
+    normalized = _VOLATILE_INPUT_RE.sub(b"", content)
+    normalized = _WHITESPACE_RE.sub(b" ", normalized).strip()
+    return hashlib.sha1(normalized).hexdigest()
+
+class ValidatorCache:
+    """
+    持久化的条件请求缓存：按 URL 记录 ETag / Last-Modified 以及正文指纹。
+    - 有验证器时发送 If-None-Match / If-Modified-Since，服务器返回 304 即视为未变化；
+    - 服务器不提供验证器时，比较规范化正文的指纹。
+    更新只保存在内存中，调用方在本次处理成功后再调用 save() 落盘，
+    避免中途失败时把"未处理的新页面"记成"已见过"。
+    """
+    def __init__(self, path: str = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except Exception as e:
+                print(f"[warn] 读取缓存失败 {path}: {e}")
+
+    def conditional_headers(self, url: str) -> dict:
+        with self._lock:
+            entry = self.entries.get(url)
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def update(self, url: str, headers, content: bytes) -> bool:
+        """
+        记录一次 200 响应的验证器与指纹，返回正文是否与上次相同。
+        """
+        fingerprint = body_fingerprint(content)
+        with self._lock:
+            previous = self.entries.get(url, {})
+            self.entries[url] = {
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "fingerprint": fingerprint,
+            }
+        return previous.get("fingerprint") == fingerprint
+
+    def discard(self, url: str):
+        """
+        丢弃某个 URL 的记录 (例如该页面的后续处理失败)，下次运行会重新完整抓取。
+        以 "url#..." 为键的相关记录 (如按分页模板直接请求的第 1 页数据) 一并丢弃。
+        """
+        with self._lock:
+            self.entries.pop(url, None)
+            for key in [key for key in self.entries if key.startswith(f"{url}#")]:
+                del self.entries[key]
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = dict(self.entries)
+        # 先写临时文件再替换，避免写到一半被中断导致缓存损坏
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
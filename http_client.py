@@ -0,0 +1,226 @@
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from requests.compat import chardet
+from rate_limiter import parse_retry_after, get_default_rate_limiter
+from retry_policy import get_default_retry_policy
+
+# brotli 为可选依赖：安装了 brotli/brotlicffi 时 urllib3 才能解码 br，此时才向服务器声明支持
+try:
+    import brotli  # noqa: F401
+    HAS_BROTLI = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        HAS_BROTLI = True
+    except ImportError:
+        HAS_BROTLI = False
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+ACCEPT_ENCODING = "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"
+CHUNK_SIZE = 64 * 1024
+
+class FetchResult:
+    """
+    一次请求的结果：已解码的正文字节，以及传输统计。
+    wire_bytes 为网络上实际传输的 (压缩后) 字节数，body_bytes 为解压后的字节数。
+    """
+    def __init__(self, url, status_code, headers, content, wire_bytes, too_large=False, not_modified=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.wire_bytes = wire_bytes
+        self.body_bytes = len(content)
+        self.content_encoding = headers.get("Content-Encoding", "identity")
+        # Content-Length 或实际读取量超过 max_bytes 时为 True，此时 content 为空
+        self.too_large = too_large
+        # 条件请求命中 (304，或正文指纹与上次相同) 时为 True；304 时 content 为空
+        self.not_modified = not_modified
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 400
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+    @property
+    def apparent_encoding(self):
+        return chardet.detect(self.content)["encoding"]
+
+    def text(self, encoding: str = None, errors: str = "replace") -> str:
+        return self.content.decode(encoding or self.apparent_encoding or "utf-8", errors=errors)
+
+    def transfer_summary(self) -> str:
+        return f"传输 {self.wire_bytes / 1024:.1f} KB ({self.content_encoding})，解压后 {self.body_bytes / 1024:.1f} KB"
+
+class TransferStats:
+    """
+    客户端累计的传输统计 (线程安全)。
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.wire_bytes = 0
+        self.body_bytes = 0
+
+    def record(self, result: FetchResult):
+        with self._lock:
+            self.requests += 1
+            self.wire_bytes += result.wire_bytes
+            self.body_bytes += result.body_bytes
+
+    def summary(self) -> str:
+        with self._lock:
+            ratio = self.body_bytes / self.wire_bytes if self.wire_bytes else 1.0
+            return f"{self.requests} 个请求，传输 {self.wire_bytes / 1024:.1f} KB，解压后 {self.body_bytes / 1024:.1f} KB (压缩比 {ratio:.1f}x)"
+
+class HttpClient:
+    """
+    统一的 HTTP 客户端层。
+    基于 requests.Session：每个 host 一个连接池并保持 keep-alive，避免每个请求都重新握手。
+    每个实例拥有独立的 Cookie Jar，一次抓取会话使用一个实例，并行抓取之间互不干扰。
+    validator_cache: 可选的 http_cache.ValidatorCache，用于条件请求。
+    rate_limiter: 可选的 rate_limiter.RateLimiter，每个请求发出前按 host 取令牌，并反馈延迟与状态码。
+    retry_policy: 可选的 retry_policy.RetryPolicy，fetch() 按其重试并经过 host 熔断器。
+    """
+    def __init__(self, user_agent: str = DEFAULT_USER_AGENT, timeout: float = 30.0, pool_connections: int = 4, pool_maxsize: int = 8, validator_cache=None, rate_limiter=None, retry_policy=None):
+        self.timeout = timeout
+        self.validator_cache = validator_cache
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.stats = TransferStats()
+        self.session = requests.Session()
+        # pool_connections: 缓存多少个 host 的连接池; pool_maxsize: 每个 host 最多保持的连接数
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": user_agent,
+            "Accept-Encoding": ACCEPT_ENCODING,
+            "Connection": "keep-alive",
+        })
+
+    @property
+    def cookies(self):
+        return self.session.cookies
+
+    def request(self, method: str, url: str, data: dict = None, headers: dict = None, timeout=None, stream: bool = False) -> requests.Response:
+        """
+        发送请求并返回 Response。调用方负责在 stream=True 时关闭响应，以便连接归还连接池。
+        """
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(url)
+        start = time.monotonic()
+        try:
+            response = self.session.request(
+                method,
+                url,
+                data=data,
+                headers=headers,
+                timeout=timeout if timeout is not None else self.timeout,
+                stream=stream,
+            )
+        except requests.RequestException:
+            if self.rate_limiter is not None:
+                self.rate_limiter.report(url, error=True)
+            raise
+        if self.rate_limiter is not None:
+            # stream=True 时这里只收到了响应头，延迟不受正文大小影响
+            self.rate_limiter.report(
+                url,
+                latency=time.monotonic() - start,
+                status_code=response.status_code,
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            )
+        return response
+
+    def get(self, url: str, headers: dict = None, timeout=None, stream: bool = False) -> requests.Response:
+        return self.request("GET", url, headers=headers, timeout=timeout, stream=stream)
+
+    def post(self, url: str, data: dict = None, headers: dict = None, timeout=None) -> requests.Response:
+        return self.request("POST", url, data=data, headers=headers, timeout=timeout)
+
+    def fetch(self, url: str, method: str = "GET", data: dict = None, headers: dict = None, timeout=None, max_bytes: int = None, conditional: bool = False, idempotent: bool = None) -> FetchResult:
+        """
+        以流式方式读取响应，边读边解压 (gzip/deflate/br)，并记录压缩前后的字节数。
+        max_bytes: 解压后正文的上限，超过时停止读取并返回 too_large=True 的结果。
+        conditional: 对 GET 请求使用 validator_cache 发送条件请求，结果的 not_modified 表示页面未变化。
+        只有能接受"未变化时没有正文"的调用方才应开启。
+        idempotent: 请求是否可以安全重试，默认 GET/HEAD 为 True。只读的 POST (如翻页) 可显式传 True。
+        """
+        def send():
+            return self._fetch_once(url, method, data, headers, timeout, max_bytes, conditional)
+
+        if self.retry_policy is None:
+            return send()
+        if idempotent is None:
+            idempotent = method.upper() in ("GET", "HEAD")
+        return self.retry_policy.call(
+            url,
+            send,
+            idempotent=idempotent,
+            retry_after_of=lambda result: parse_retry_after(result.headers.get("Retry-After")),
+        )
+
+    def _fetch_once(self, url: str, method: str, data: dict, headers: dict, timeout, max_bytes: int, conditional: bool) -> FetchResult:
+        use_cache = conditional and self.validator_cache is not None and method.upper() == "GET"
+        if use_cache:
+            headers = {**(headers or {}), **self.validator_cache.conditional_headers(url)}
+
+        with self.request(method, url, data=data, headers=headers, timeout=timeout, stream=True) as response:
+            if use_cache and response.status_code == 304:
+                result = FetchResult(response.url, 304, response.headers, b"", response.raw.tell(), not_modified=True)
+                self.stats.record(result)
+                return result
+
+            content_length = response.headers.get("Content-Length")
+            # 未压缩时 Content-Length 即正文大小，可以在读取前直接拒绝
+            if max_bytes and content_length and "Content-Encoding" not in response.headers and int(content_length) > max_bytes:
+                result = FetchResult(response.url, response.status_code, response.headers, b"", 0, too_large=True)
+                self.stats.record(result)
+                return result
+
+            buffer = bytearray()
+            too_large = False
+            for chunk in response.raw.stream(CHUNK_SIZE, decode_content=True):
+                buffer += chunk
+                if max_bytes and len(buffer) > max_bytes:
+                    too_large = True
+                    break
+
+            result = FetchResult(
+                response.url,
+                response.status_code,
+                response.headers,
+                b"" if too_large else bytes(buffer),
+                response.raw.tell(),
+                too_large=too_large,
+            )
+        if use_cache and result.status_code == 200 and not too_large:
+            result.not_modified = self.validator_cache.update(url, result.headers, result.content)
+        self.stats.record(result)
+        return result
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+# 进程内共享的默认客户端，供未显式传入 client 的调用方使用
+_default_client = None
+_default_client_lock = threading.Lock()
+
+def get_default_client() -> HttpClient:
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HttpClient(rate_limiter=get_default_rate_limiter(), retry_policy=get_default_retry_policy())
+        return _default_client
@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from http_client import FetchResult
+
+IMAGE_CACHE_DIR = "image_cache"
+
+class ImageCache:
+    """
+    按内容寻址的图片磁盘缓存：
+    - 索引按 URL 记录内容哈希和验证器 (ETag / Last-Modified)；
+    - 图片字节按 sha256 存放，不同 URL 的相同图片 (校徽、横幅等) 只存一份；
+    - 总大小超过 max_size_mb 时按最近使用时间 (LRU) 淘汰。
+    超过 revalidate_after 秒的条目会用条件请求向服务器确认，304 时继续使用缓存。
+    """
+    def __init__(self, directory: str = IMAGE_CACHE_DIR, max_size_mb: float = 500, revalidate_after: float = 7 * 24 * 3600):
+        self.directory = directory
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.revalidate_after = revalidate_after
+        self.index_path = os.path.join(directory, "index.json")
+        self._lock = threading.Lock()
+        self.urls = {}
+        self.blobs = {}
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.dirty = False
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.urls = data.get("urls", {})
+                self.blobs = data.get("blobs", {})
+            except Exception as e:
+                print(f"[warn] 读取图片缓存索引失败: {e}")
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def _read_blob(self, digest: str) -> bytes | None:
+        try:
+            with open(self._blob_path(digest), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _touch(self, digest: str):
+        blob = self.blobs.get(digest)
+        if blob:
+            blob["last_access"] = time.time()
+            self.dirty = True
+
+    def get(self, url: str):
+        """
+        返回 (content, entry)。未命中时 content 为 None。
+        """
+        with self._lock:
+            entry = self.urls.get(url)
+            if not entry or entry["hash"] not in self.blobs:
+                return None, None
+            self._touch(entry["hash"])
+            entry = dict(entry)
+        content = self._read_blob(entry["hash"])
+        if content is None:
+            # 文件被手动删除等情况，当作未命中
+            with self._lock:
+                self.urls.pop(url, None)
+                self.blobs.pop(entry["hash"], None)
+                self.dirty = True
+        return content, entry
+
+    def put(self, url: str, headers, content: bytes):
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._blob_path(digest)
+        with self._lock:
+            exists = digest in self.blobs
+        if not exists:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp{threading.get_ident()}"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        with self._lock:
+            now = time.time()
+            self.blobs.setdefault(digest, {"size": len(content), "last_access": now})["last_access"] = now
+            self.urls[url] = {
+                "hash": digest,
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "content_type": headers.get("Content-Type"),
+                "checked_at": now,
+            }
+            self.dirty = True
+            self._evict()
+
+    def _evict(self):
+        total = sum(blob["size"] for blob in self.blobs.values())
+        if total <= self.max_size_bytes:
+            return
+        # 淘汰到上限的 90%，避免每次写入都触发淘汰
+        target = self.max_size_bytes * 0.9
+        evicted = set()
+        for digest, blob in sorted(self.blobs.items(), key=lambda kv: kv[1]["last_access"]):
+            if total <= target:
+                break
+            total -= blob["size"]
+            evicted.add(digest)
+            try:
+                os.remove(self._blob_path(digest))
+            except OSError:
+                pass
+        for digest in evicted:
+            del self.blobs[digest]
+        self.urls = {url: entry for url, entry in self.urls.items() if entry["hash"] not in evicted}
+
+    def _count(self, name: str):
+        # 缓存由多个抓取线程共享，计数也在锁内更新
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def fetch(self, url: str, fetcher) -> FetchResult:
+        """
+        优先从缓存读取图片，必要时通过 fetcher(headers) -> FetchResult 请求网络并写入缓存。
+        """
+        content, entry = self.get(url)
+        if content is not None:
+            if time.time() - entry.get("checked_at", 0) < self.revalidate_after:
+                self._count("hits")
+                return self._cached_result(url, entry, content)
+            headers = {}
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+            if headers:
+                result = fetcher(headers)
+                if result.status_code == 304:
+                    self._count("revalidated")
+                    with self._lock:
+                        if url in self.urls:
+                            self.urls[url]["checked_at"] = time.time()
+                            self.dirty = True
+                    return self._cached_result(url, entry, content)
+                self._store(url, result)
+                return result
+
+        self._count("misses")
+        result = fetcher({})
+        self._store(url, result)
+        return result
+
+    def _store(self, url: str, result: FetchResult):
+        if result.status_code == 200 and not result.too_large and result.content:
+            self.put(url, result.headers, result.content)
+
+    def _cached_result(self, url: str, entry: dict, content: bytes) -> FetchResult:
+        headers = {"Content-Type": entry.get("content_type") or "application/octet-stream"}
+        return FetchResult(url, 200, headers, content, 0)
+
+    def summary(self) -> str:
+        with self._lock:
+            total = sum(blob["size"] for blob in self.blobs.values())
+            count = len(self.blobs)
+            return f"命中 {self.hits}，重新验证 {self.revalidated}，未命中 {self.misses}，缓存 {count} 个文件 {total / 1024 / 1024:.1f} MB"
+
+    def save(self):
+        with self._lock:
+            if not self.dirty:
+                return
+            data = {"urls": dict(self.urls), "blobs": dict(self.blobs)}
+            self.dirty = False
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+# 进程内共享的默认图片缓存
+_default_image_cache = None
+_default_image_cache_lock = threading.Lock()
+
+def get_default_image_cache() -> ImageCache:
+    global _default_image_cache
+    with _default_image_cache_lock:
+        if _default_image_cache is None:
+            _default_image_cache = ImageCache()
+        return _default_image_cache
@@ -0,0 +1,82 @@
+import io
+import threading
+
+# Pillow 为可选依赖：未安装时图片按原样嵌入
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    Image = None
+    HAS_PIL = False
+
+# 与 add_markdown_content_to_doc 中 doc.add_picture(width=Inches(5.5)) 保持一致
+DISPLAY_WIDTH_INCHES = 5.5
+# python-docx 能直接识别的格式 (Pillow 的格式名)
+DOCX_FORMATS = {"JPEG", "PNG", "GIF", "BMP", "TIFF"}
+
+class ImageOptimizer:
+    """
+    嵌入 Word 前的图片处理：
+    - 宽度超过 显示宽度 x dpi 的图片按比例缩小；
+    - 照片重新编码为 JPEG (quality)，带透明通道或调色板的图片编码为 PNG；
+    - python-docx 不支持的格式 (WebP 等) 以及动图 GIF (取第一帧) 转换为 JPEG/PNG。
+    只有结果更小、或原格式无法嵌入时才替换原始字节。
+    """
+    def __init__(self, display_width_inches: float = DISPLAY_WIDTH_INCHES, dpi: int = 150, jpeg_quality: int = 80):
+        self.max_width = int(display_width_inches * dpi)
+        self.jpeg_quality = jpeg_quality
+        self._lock = threading.Lock()
+        self.images = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def process(self, data: bytes) -> bytes:
+        try:
+            result = self._process(data)
+        except Exception as e:
+            # 无法解析的图片交给 python-docx 自行处理 (可能报错，由调用方提示)
+            print(f"[warn] 图片处理失败，按原样嵌入: {e}")
+            result = data
+        with self._lock:
+            self.images += 1
+            self.bytes_in += len(data)
+            self.bytes_out += len(result)
+        return result
+
+    def _process(self, data: bytes) -> bytes:
+        with Image.open(io.BytesIO(data)) as img:
+            source_format = img.format
+            animated = getattr(img, "is_animated", False)
+            needs_convert = source_format not in DOCX_FORMATS or animated
+            needs_resize = img.width > self.max_width
+            if not needs_convert and not needs_resize and source_format in ("PNG", "GIF", "BMP"):
+                # 小尺寸图标、截图等保持原样，重新编码通常收益不大
+                return data
+
+            img.seek(0)
+            frame = img.copy()
+
+        if needs_resize:
+            height = max(1, round(frame.height * self.max_width / frame.width))
+            frame = frame.resize((self.max_width, height), Image.LANCZOS)
+
+        has_alpha = frame.mode in ("RGBA", "LA") or (frame.mode == "P" and "transparency" in frame.info)
+        out = io.BytesIO()
+        if has_alpha or (frame.mode == "P" and source_format in ("PNG", "GIF")):
+            if frame.mode not in ("RGBA", "LA", "P", "L", "RGB"):
+                frame = frame.convert("RGBA")
+            frame.save(out, format="PNG", optimize=True)
+        else:
+            if frame.mode not in ("RGB", "L"):
+                frame = frame.convert("RGB")
+            frame.save(out, format="JPEG", quality=self.jpeg_quality, optimize=True, progressive=True)
+        result = out.getvalue()
+
+        if needs_convert or len(result) < len(data):
+            return result
+        return data
+
+    def summary(self) -> str:
+        with self._lock:
+            saved = self.bytes_in - self.bytes_out
+            return f"处理 {self.images} 张，{self.bytes_in / 1024 / 1024:.1f} MB -> {self.bytes_out / 1024 / 1024:.1f} MB (节省 {saved / 1024 / 1024:.1f} MB)"
@@ -0,0 +1,352 @@
+import re
+import json
+from html.parser import HTMLParser
+from urllib.parse import urlsplit, urlunsplit
+
+# lxml 已在 requirements.txt 中；缺失时退回标准库 html.parser (结果相同，只是较慢)
+try:
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:
+    etree = None
+    HAS_LXML = False
+
+# 分页链接中的组件 ID：...?webpageId=XXX&<组件ID>=<页码>
+# (属性值中的 &amp; 已被解析器还原，脚本文字中可能仍是 &amp;)
+_LINK_COMPONENT_PATTERN = re.compile(r'webpageId=[^&]+&(?:amp;)?([a-zA-Z0-9]{32,})=(\d+)')
+# 分页栏中的总页数文字："共 54 页"、"1/54 页"
+_TOTAL_PAGES_PATTERN = re.compile(r'共\s*(\d+)\s*页|\d+\s*/\s*(\d+)\s*页')
+_INPUT_COMPONENT_PATTERN = re.compile(r'[a-zA-Z0-9]{32}')
+# var sdata... = [...]  只用正则定位赋值语句，数组本身由 JSONDecoder 按括号匹配解析
+_SDATA_ASSIGNMENT = re.compile(r'var\s+sdata\w+\s*=\s*(?=\[)')
+_JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DECODER = json.JSONDecoder()
+# 详情页 URL 中的发布时间：/detail/20250904143732....html
+_DETAIL_TIMESTAMP = re.compile(r'/detail/(\d{14})')
+_NOTICE_DATE = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})')
+
+def notice_from_sdata(item: dict) -> dict:
+    """
+    把 sdata 数组中的一项转换为通知 dict (title/date/link/body)。
+    """
+    link = item.get("url", "")
+    if link.startswith("//"):
+        link = "https:" + link
+    elif link.startswith("/"):
+        # 假设是相对路径，需要 base_url，但这里没有 context
+        # 暂时保留原样，或者假设是 https://www.sdxd.edu.cn
+        pass
+    return {
+        "title": item.get("title", ""),
+        "date": item.get("sjall", "").split(" ")[0], # 只取日期部分
+        "link": link,
+        "body": item.get("Abstract", "")
+    }
+
+def link_key(link: str) -> str:
+    """
+    链接去掉 scheme 和 host 后的部分 (路径 + 查询)，用于比较来源不同的链接：
+    HTML 卡片中是 //www.sdxd.edu.cn/...，sdata 中的链接被 notice_from_sdata 改写为 https://...
+    """
+    parts = urlsplit(link.strip())
+    return urlunsplit(("", "", parts.path, parts.query, ""))
+
+def notice_timestamp(notice: dict) -> str | None:
+    """
+    通知发布时间的可比较形式：优先使用详情页 URL 中的 14 位时间戳 (YYYYMMDDhhmmss)，
+    其次是 date 字段 (YYYYMMDD)；都没有时返回 None。
+    """
+    match = _DETAIL_TIMESTAMP.search(notice.get("link", ""))
+    if match:
+        return match.group(1)
+    match = _NOTICE_DATE.search(notice.get("date", ""))
+    if match:
+        year, month, day = match.groups()
+        return f"{year}{int(month):02d}{int(day):02d}"
+    return None
+
+def timestamp_before(a: str, b: str, or_equal: bool = False) -> bool:
+    """
+    a 是否早于 b。精度不同时 (日期与时间戳) 只比较共同的前缀，同一天不算更早。
+    or_equal 为 True 时，两者都是完整时间戳 (14 位) 且相等也返回 True。
+    高水位线是排他的 (等于它的条目上次已经见过，用 or_equal=True)；--since 是包含的 (当天的条目要保留)。
+    日期精度时无法区分同一天的先后，高水位线也按包含处理，宁可重复也不漏掉。
+    """
+    n = min(len(a), len(b))
+    if or_equal and len(a) == len(b) == 14:
+        return a <= b
+    return a[:n] < b[:n]
+
+def newest_timestamp(notices, current: str = None) -> str | None:
+    """
+    notices 中最新的发布时间 (与 current 比较取较新者)，用于更新高水位线。
+    """
+    newest = current
+    for notice in notices:
+        key = notice_timestamp(notice)
+        if key and (newest is None or timestamp_before(newest, key) or key.startswith(newest)):
+            newest = key
+    return newest
+
+def iter_sdata_items(text: str):
+    """
+    生成器：逐个产出第一个 var sdata... = [...] 数组中的元素 (原始 dict)。
+    从 "[" 开始用 JSONDecoder.raw_decode 逐个解码元素，字符串中出现的 "];" 不会截断数组，
+    也不需要先找到数组结尾；调用方只需要前几条时 (遇到历史记录即停止) 后面的元素不会被解码。
+    没有 sdata 数组时不产出任何元素；数组格式错误时抛出 json.JSONDecodeError。
+    """
+    match = _SDATA_ASSIGNMENT.search(text)
+    if not match:
+        return
+    pos = _JSON_WHITESPACE.match(text, match.end() + 1).end()
+    if text.startswith("]", pos):
+        return
+    while True:
+        item, pos = _DECODER.raw_decode(text, pos)
+        yield item
+        pos = _JSON_WHITESPACE.match(text, pos).end()
+        if text.startswith(",", pos):
+            pos = _JSON_WHITESPACE.match(text, pos + 1).end()
+        elif text.startswith("]", pos):
+            return
+        else:
+            raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+
+def iter_sdata_notices(text: str):
+    """
+    生成器：逐条产出 sdata 中的通知 dict (见 notice_from_sdata)，跳过不是对象的元素。
+    """
+    for item in iter_sdata_items(text):
+        if isinstance(item, dict):
+            yield notice_from_sdata(item)
+
+def parse_sdata(text: str) -> list[dict]:
+    """
+    提取第一个 var sdata... = [...] 并转换为通知列表；没有或解析失败时返回空列表。
+    """
+    try:
+        return list(iter_sdata_notices(text))
+    except json.JSONDecodeError as e:
+        print(f"[warn] JSON 解析失败: {e}")
+        return []
+
+class ListPage:
+    """
+    列表页一次解析的结果：
+    - html_notices: content-box 卡片中的通知 (与 NoticeParser 相同)；
+    - json_notices: var sdata... = [...] 中的通知 (与 parse_json_response 相同，首次访问时才解析 JSON)；
+    - forms: 页面中所有完整 form 的 (字段, newsComponentId 取值集合)；
+    - link_component_id: 第一个分页链接 (webpageId=...&<ID>=<页码>) 中的组件 ID；
+    - input_component_id: 第一个 newsComponentId 隐藏域中的 32 位组件 ID；
+    - page_links: {组件 ID: 分页链接中出现的最大页码}；total_pages: 分页栏文字中的总页数 (没有时为 None)。
+    """
+    def __init__(self, html_notices, sdata_texts, forms, link_component_id, input_component_id, page_links=None, total_pages=None):
+        self.html_notices = html_notices
+        self.sdata_texts = sdata_texts
+        self.forms = forms
+        self.link_component_id = link_component_id
+        self.input_component_id = input_component_id
+        self.page_links = page_links or {}
+        self.total_pages = total_pages
+        self._json_notices = None
+
+    @property
+    def json_notices(self) -> list[dict]:
+        if self._json_notices is None:
+            self._json_notices = []
+            for text in self.sdata_texts:
+                self._json_notices = parse_sdata(text)
+                if self._json_notices:
+                    break
+        return self._json_notices
+
+    @property
+    def notices(self) -> list[dict]:
+        """
+        翻页响应中的通知：优先使用 JSON 数据，回退到 HTML 解析。
+        """
+        return self.json_notices or self.html_notices
+
+    def page_count_hint(self, component_id: str = None):
+        """
+        分页栏给出的页数：优先使用 "共 N 页" 文字，其次是该组件分页链接中的最大页码。
+        分页栏可能只显示附近几页，链接页码只能作为下限参考；没有线索时返回 None。
+        """
+        if self.total_pages:
+            return self.total_pages
+        return self.page_links.get(component_id) if component_id else None
+
+    def form_data(self, target_component_id: str = None) -> dict:
+        """
+        与 extract_form_data 相同的选择规则：优先包含目标组件 ID 的 form (最后一个)，
+        其次第一个包含 __VIEWSTATE 的 form，最后回退到第一个非空 form。返回副本。
+        """
+        target = viewstate = first = None
+        for fields, component_ids in self.forms:
+            if not first:
+                first = fields
+            if viewstate is None and "__VIEWSTATE" in fields:
+                viewstate = fields
+            if target_component_id and (target_component_id in component_ids or target_component_id in fields):
+                target = fields
+        chosen = target or viewstate or first
+        return dict(chosen) if chosen else {}
+
+class _ListPageBuilder:
+    """
+    解析事件 (start/end/data) 的处理器，同时完成 NoticeParser、extract_form_data 和组件 ID 检测的工作。
+    接口与 lxml 解析器的 target 一致，也由 _StdlibTokenizer 转发标准库 HTMLParser 的事件。
+    """
+    def __init__(self):
+        # content-box 通知卡片
+        self.notices = []
+        self.current_notice = {}
+        self.in_content_box = False
+        self.in_title = False
+        self.in_body = False
+        self.in_date_day = False
+        self.in_date_year = False
+        self.temp_data = ""
+        # form
+        self.forms = []
+        self.in_form = False
+        self.form_fields = {}
+        self.form_component_ids = set()
+        # 组件 ID 与 sdata
+        self.link_component_id = None
+        self.input_component_id = None
+        self.page_links = {}
+        self.total_pages = None
+        self.sdata_texts = []
+        # 两个标签之间的连续文字 (解析器可能分多次给出)
+        self._text = []
+
+    def _flush_text(self):
+        if not self._text:
+            return
+        text = "".join(self._text)
+        self._text = []
+        if "sdata" in text:
+            self.sdata_texts.append(text)
+        if "webpageId=" in text:
+            self._scan_page_links(text)
+        if self.total_pages is None and "页" in text:
+            match = _TOTAL_PAGES_PATTERN.search(text)
+            if match:
+                self.total_pages = int(match.group(1) or match.group(2))
+
+    def _scan_page_links(self, text):
+        for match in _LINK_COMPONENT_PATTERN.finditer(text):
+            component_id, page_no = match.group(1), int(match.group(2))
+            if self.link_component_id is None:
+                self.link_component_id = component_id
+            if page_no > self.page_links.get(component_id, 0):
+                self.page_links[component_id] = page_no
+
+    def start(self, tag, attrs):
+        self._flush_text()
+        for value in attrs.values():
+            if value and "webpageId=" in value:
+                self._scan_page_links(value)
+
+        classes = (attrs.get("class") or "").split()
+        if "content-box" in classes:
+            self.in_content_box = True
+            self.current_notice = {"title": "", "body": "", "date": "", "link": attrs.get("href", "")}
+        if self.in_content_box:
+            if "titletext" in classes:
+                self.in_title = True
+                self.temp_data = ""
+            elif "bodytext" in classes:
+                self.in_body = True
+                self.temp_data = ""
+            elif tag == "span":
+                self.in_date_day = True
+                self.temp_data = ""
+            elif tag == "em":
+                self.in_date_year = True
+                self.temp_data = ""
+
+        if tag == "form":
+            self.in_form = True
+            self.form_fields = {}
+            self.form_component_ids = set()
+        elif tag == "input":
+            name = attrs.get("name")
+            value = attrs.get("value", "")
+            if name == "newsComponentId":
+                if self.input_component_id is None and value and _INPUT_COMPONENT_PATTERN.fullmatch(value):
+                    self.input_component_id = value
+                if self.in_form:
+                    self.form_component_ids.add(value)
+            if name and self.in_form:
+                self.form_fields[name] = value
+
+    def end(self, tag):
+        self._flush_text()
+        if self.in_content_box:
+            if tag == "a":
+                day = self.current_notice.pop("day", "")
+                year_month = self.current_notice.pop("year_month", "")
+                if day and year_month:
+                    self.current_notice["date"] = f"{year_month}-{day}"
+                self.notices.append(self.current_notice)
+                self.current_notice = {}
+                self.in_content_box = False
+            elif self.in_title and tag == "article":
+                self.current_notice["title"] = self.temp_data.strip()
+                self.in_title = False
+            elif self.in_body and tag == "article":
+                self.current_notice["body"] = self.temp_data.strip()
+                self.in_body = False
+            elif self.in_date_day and tag == "span":
+                self.current_notice["day"] = self.temp_data.strip()
+                self.in_date_day = False
+            elif self.in_date_year and tag == "em":
+                self.current_notice["year_month"] = self.temp_data.strip()
+                self.in_date_year = False
+
+        if tag == "form" and self.in_form:
+            self.in_form = False
+            self.forms.append((self.form_fields, self.form_component_ids))
+
+    def data(self, data):
+        self._text.append(data)
+        if self.in_title or self.in_body or self.in_date_day or self.in_date_year:
+            self.temp_data += data
+
+    def close(self) -> ListPage:
+        self._flush_text()
+        return ListPage(self.notices, self.sdata_texts, self.forms, self.link_component_id, self.input_component_id, self.page_links, self.total_pages)
+
+class _StdlibTokenizer(HTMLParser):
+    def __init__(self, builder):
+        super().__init__()
+        self.builder = builder
+
+    def handle_starttag(self, tag, attrs):
+        self.builder.start(tag, dict(attrs))
+
+    def handle_endtag(self, tag):
+        self.builder.end(tag)
+
+    def handle_data(self, data):
+        self.builder.data(data)
+
+def analyze_list_page(html: str, parser: str = None) -> ListPage:
+    """
+    只对列表页做一次词法扫描，同时得到通知 (HTML 卡片与 sdata JSON)、各 form 的隐藏字段和组件 ID，
+    代替 NoticeParser + parse_json_response + extract_form_data + 两次组件 ID 正则的四遍扫描。
+    parser: "lxml" 使用 libxml2 (C 实现) 分词，事件直接交给处理器，不构建文档树；
+            "html.parser" 使用标准库；默认在安装了 lxml 时使用 lxml。
+    """
+    builder = _ListPageBuilder()
+    if (parser or "lxml") == "lxml" and HAS_LXML:
+        # huge_tree: ViewState 等超长属性值不受 libxml2 默认长度限制
+        lxml_parser = etree.HTMLParser(target=builder, huge_tree=True)
+        lxml_parser.feed(html)
+        return lxml_parser.close()
+    tokenizer = _StdlibTokenizer(builder)
+    tokenizer.feed(html)
+    tokenizer.close()
+    return builder.close()
@@ -0,0 +1,69 @@
+import os
+import json
+import threading
+
+class ListTemplateCache:
+    """
+    持久化的列表页分页模板：按栏目 (列表页 URL，其中包含 webpageId) 记录检测到的组件 ID、翻页请求 URL、
+    分页 form 的隐藏字段，以及 POST 翻页是否无状态 (见 scrape_notices.probe_stateless_post)。
+    有模板时 crawl_notices 不再请求初始页面，直接发送第 1 页的数据请求；
+    响应中找不到同一个组件 ID 或没有通知时视为模板失效，丢弃后回退到完整的初始请求。
+    与 ValidatorCache 相同，更新只保存在内存中，由调用方在运行结束后调用 save() 落盘。
+    """
+    def __init__(self, path: str = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except Exception as e:
+                print(f"[warn] 读取分页模板失败 {path}: {e}")
+
+    def get(self, key: str) -> dict | None:
+        """
+        返回模板副本 {"component_id", "target_url", "form", "stateless_post"}，没有时返回 None。
+        """
+        with self._lock:
+            entry = self.entries.get(key)
+            if not entry or not entry.get("component_id") or not entry.get("target_url"):
+                return None
+            return {**entry, "form": dict(entry.get("form") or {})}
+
+    def update(self, key: str, component_id: str, target_url: str, form_data: dict):
+        """
+        记录 (或刷新) 一个栏目的模板；组件 ID 或目标 URL 改变时，之前的 POST 探测结果作废。
+        """
+        with self._lock:
+            previous = self.entries.get(key, {})
+            same_target = previous.get("component_id") == component_id and previous.get("target_url") == target_url
+            self.entries[key] = {
+                "component_id": component_id,
+                "target_url": target_url,
+                "form": dict(form_data),
+                "stateless_post": previous.get("stateless_post") if same_target else None,
+            }
+
+    def set_stateless_post(self, key: str, stateless: bool):
+        with self._lock:
+            if key in self.entries:
+                self.entries[key]["stateless_post"] = stateless
+
+    def discard(self, key: str):
+        """
+        丢弃失效的模板，下次运行重新请求初始页面检测。
+        """
+        with self._lock:
+            self.entries.pop(key, None)
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = dict(self.entries)
+        # 先写临时文件再替换，避免写到一半被中断导致文件损坏
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,170 @@
+import time
+import threading
+from urllib.parse import urlparse
+
+class HostRateLimiter:
+    """
+    单个 host 的令牌桶限速器，速率按 AIMD 自适应调整：
+    - 响应正常且延迟平稳时，每次成功请求把速率加 increase_step (加性增)；
+    - 遇到 429/5xx、网络错误或延迟明显上升时，把速率乘以 backoff_factor (乘性减)。
+    默认最多 2 req/s，对学校网站足够礼貌；需要更快时由调用方显式提高 max_rate (见 configure_default_rate_limiter)。
+    """
+    def __init__(self, rate: float = 1.0, min_rate: float = 0.2, max_rate: float = 2.0, burst: float = 4.0,
+                 increase_step: float = 0.2, backoff_factor: float = 0.5, latency_factor: float = 2.0, min_latency_delta: float = 0.2):
+        self.rate = min(rate, max_rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase_step = increase_step
+        self.backoff_factor = backoff_factor
+        self.latency_factor = latency_factor
+        # 延迟上升至少超过基线这么多秒才算异常，避免毫秒级抖动触发降速
+        self.min_latency_delta = min_latency_delta
+
+        self._cond = threading.Condition()
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        # 服务器要求暂停 (Retry-After) 时，在此时间点之前不发出请求
+        self.blocked_until = 0.0
+        self.waiting = 0
+
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        # 延迟的指数滑动平均，以及观察到的最低平均延迟 (作为健康基线)
+        self.latency_ewma = None
+        self.latency_baseline = None
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """
+        阻塞直到可以发出下一个请求。
+        """
+        with self._cond:
+            self.waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if now < self.blocked_until:
+                        self._cond.wait(self.blocked_until - now)
+                        continue
+                    if self.tokens >= 1.0:
+                        self.tokens -= 1.0
+                        return
+                    self._cond.wait((1.0 - self.tokens) / self.rate)
+            finally:
+                self.waiting -= 1
+
+    def report(self, latency: float = None, status_code: int = None, error: bool = False, retry_after: float = None):
+        """
+        反馈一次请求的结果，用于调整速率。
+        latency: 从发出请求到收到响应头的秒数。
+        """
+        with self._cond:
+            self.requests += 1
+            now = time.monotonic()
+            self._refill(now)
+
+            if error or status_code == 429 or (status_code is not None and status_code >= 500):
+                self.errors += 1
+                self._backoff(self.backoff_factor)
+                if retry_after:
+                    self.blocked_until = max(self.blocked_until, now + retry_after)
+            elif latency is not None:
+                self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+                if self.latency_baseline is None or self.latency_ewma < self.latency_baseline:
+                    self.latency_baseline = self.latency_ewma
+                if (self.latency_ewma > self.latency_baseline * self.latency_factor
+                        and self.latency_ewma - self.latency_baseline > self.min_latency_delta):
+                    # 延迟上升说明服务器开始吃力，温和降速
+                    self._backoff(0.8)
+                else:
+                    self.rate = min(self.max_rate, self.rate + self.increase_step)
+            self._cond.notify_all()
+
+    def _backoff(self, factor: float):
+        self.throttled += 1
+        self.rate = max(self.min_rate, self.rate * factor)
+        # 降速后清空已积累的令牌，避免立即突发
+        self.tokens = min(self.tokens, 1.0)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "rate": round(self.rate, 2),
+                "queue_depth": self.waiting,
+                "requests": self.requests,
+                "errors": self.errors,
+                "throttled": self.throttled,
+                "latency_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+            }
+
+class RateLimiter:
+    """
+    按 host 分别限速，host 之间互不影响。参数透传给每个 HostRateLimiter。
+    """
+    def __init__(self, **host_options):
+        self.host_options = host_options
+        self._lock = threading.Lock()
+        self.hosts = {}
+
+    def _host(self, url: str) -> HostRateLimiter:
+        host = urlparse(url).netloc
+        with self._lock:
+            limiter = self.hosts.get(host)
+            if limiter is None:
+                limiter = HostRateLimiter(**self.host_options)
+                self.hosts[host] = limiter
+            return limiter
+
+    def acquire(self, url: str):
+        self._host(url).acquire()
+
+    def report(self, url: str, latency: float = None, status_code: int = None, error: bool = False, retry_after: float = None):
+        self._host(url).report(latency, status_code, error, retry_after)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hosts = dict(self.hosts)
+        return {host: limiter.stats() for host, limiter in hosts.items()}
+
+    def summary(self) -> str:
+        parts = []
+        for host, s in self.stats().items():
+            parts.append(f"{host}: {s['rate']} req/s, 排队 {s['queue_depth']}, 请求 {s['requests']}, 降速 {s['throttled']} 次, 平均延迟 {s['latency_ms']} ms")
+        return "; ".join(parts) if parts else "无请求"
+
+def parse_retry_after(value) -> float | None:
+    """
+    解析 Retry-After 头 (只支持秒数形式)。
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+# 进程内共享的默认限速器，同一 host 的并行抓取共用一个速率预算
+_default_rate_limiter = None
+_default_rate_limiter_lock = threading.Lock()
+
+def get_default_rate_limiter() -> RateLimiter:
+    global _default_rate_limiter
+    with _default_rate_limiter_lock:
+        if _default_rate_limiter is None:
+            _default_rate_limiter = RateLimiter()
+        return _default_rate_limiter
+
+def configure_default_rate_limiter(**host_options) -> RateLimiter:
+    """
+    用新的参数替换进程内默认限速器 (如 max_rate=5.0 提高速率上限)，应在开始抓取前调用。
+    """
+    global _default_rate_limiter
+    with _default_rate_limiter_lock:
+        _default_rate_limiter = RateLimiter(**host_options)
+        return _default_rate_limiter
@@ -0,0 +1,188 @@
+import time
+import random
+import threading
+from urllib.parse import urlparse
+import requests
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class CircuitOpenError(requests.ConnectionError):
+    """
+    目标 host 的熔断器处于打开状态，本次请求未发出。
+    """
+
+class CircuitBreaker:
+    """
+    单个 host 的熔断器：
+    - closed: 正常放行，连续失败达到 failure_threshold 次后打开；
+    - open: 拒绝请求，reset_timeout 秒后进入 half_open；
+    - half_open: 只放行一个探测请求，成功则关闭，失败则重新打开 (等待时间翻倍，最长 max_reset_timeout)。
+    """
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, max_reset_timeout: float = 300.0):
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+
+    def allow(self) -> float:
+        """
+        返回 0 表示可以发出请求，否则返回建议等待的秒数。
+        """
+        with self._lock:
+            if self.state == "closed":
+                return 0.0
+            now = time.monotonic()
+            if self.state == "open":
+                remaining = self.opened_at + self.reset_timeout - now
+                if remaining > 0:
+                    return remaining
+                self.state = "half_open"
+                self.probe_in_flight = False
+            # half_open: 同一时间只允许一个探测请求
+            if self.probe_in_flight:
+                return 1.0
+            self.probe_in_flight = True
+            return 0.0
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                print("[info] 熔断恢复，目标服务器已可访问")
+            self.state = "closed"
+            self.failures = 0
+            self.probe_in_flight = False
+            self.reset_timeout = self.base_reset_timeout
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open":
+                self.reset_timeout = min(self.max_reset_timeout, self.reset_timeout * 2)
+                self._open()
+            elif self.state == "closed" and self.failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self.probe_in_flight = False
+        print(f"[warn] 连续失败 {self.failures} 次，熔断 {self.reset_timeout:.1f} 秒")
+
+class RetryBudget:
+    """
+    重试预算：每个首次请求存入 ratio 个令牌，每次重试消耗 1 个。
+    服务器大面积故障时，重试量被限制在正常请求量的 ratio 倍以内，避免重试风暴。
+    开始时有 min_tokens 个令牌；令牌最多积累到 max_tokens 个，长时间正常运行之后遇到故障，
+    也只能先连续重试 max_tokens 次，之后按 ratio 的比例重试。
+    """
+    def __init__(self, ratio: float = 0.2, min_tokens: float = 10.0, max_tokens: float = 50.0):
+        self.ratio = ratio
+        self.max_tokens = max(min_tokens, max_tokens)
+        self.tokens = min_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return True
+            return False
+
+class RetryPolicy:
+    """
+    共享的重试策略：带抖动的指数退避 (full jitter) + 重试预算 + 按 host 的熔断器。
+    非幂等请求只在连接阶段失败 (请求肯定没有发出) 时重试。
+    """
+    def __init__(self, max_attempts: int = 4, base_delay: float = 0.5, max_delay: float = 20.0,
+                 retry_statuses: set = None, budget: RetryBudget = None, **breaker_options):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = RETRY_STATUSES if retry_statuses is None else retry_statuses
+        self.budget = budget if budget is not None else RetryBudget()
+        self.breaker_options = breaker_options
+        self._lock = threading.Lock()
+        self.breakers = {}
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        host = urlparse(url).netloc
+        with self._lock:
+            breaker = self.breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(**self.breaker_options)
+                self.breakers[host] = breaker
+            return breaker
+
+    def backoff(self, attempt: int, retry_after: float = None) -> float:
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    def is_retryable_error(self, error: Exception, idempotent: bool) -> bool:
+        if isinstance(error, CircuitOpenError):
+            return False
+        if not idempotent:
+            return isinstance(error, requests.ConnectTimeout)
+        return isinstance(error, (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError))
+
+    def call(self, url: str, send, idempotent: bool = True, retry_after_of=None):
+        """
+        执行 send()，按策略重试。
+        send: 无参函数，返回带 status_code 属性的结果或抛出异常。
+        retry_after_of: 从结果中取 Retry-After 秒数的函数 (可选)。
+        达到上限后返回最后一次的结果 (由调用方判断状态码) 或抛出最后一次的异常。
+        """
+        breaker = self.breaker(url)
+        self.budget.deposit()
+        attempt = 0
+        while True:
+            wait = breaker.allow()
+            if wait > 0:
+                if attempt + 1 >= self.max_attempts:
+                    raise CircuitOpenError(f"熔断中，暂停访问 {urlparse(url).netloc}: {url}")
+                print(f"[warn] {urlparse(url).netloc} 熔断中，{wait:.1f} 秒后重试")
+                time.sleep(wait)
+                attempt += 1
+                continue
+
+            try:
+                result = send()
+            except Exception as e:
+                breaker.record_failure()
+                if not self.is_retryable_error(e, idempotent) or attempt + 1 >= self.max_attempts or not self.budget.withdraw():
+                    raise
+                delay = self.backoff(attempt)
+                print(f"[warn] 请求失败 ({e})，{delay:.1f} 秒后第 {attempt + 1} 次重试: {url}")
+            else:
+                if result.status_code not in self.retry_statuses:
+                    breaker.record_success()
+                    return result
+                breaker.record_failure()
+                if not idempotent or attempt + 1 >= self.max_attempts or not self.budget.withdraw():
+                    return result
+                delay = self.backoff(attempt, retry_after_of(result) if retry_after_of else None)
+                print(f"[warn] 服务器返回 {result.status_code}，{delay:.1f} 秒后第 {attempt + 1} 次重试: {url}")
+
+            time.sleep(delay)
+            attempt += 1
+
+# 进程内共享的默认重试策略，熔断状态按 host 在所有客户端之间共享
+_default_retry_policy = None
+_default_retry_policy_lock = threading.Lock()
+
+def get_default_retry_policy() -> RetryPolicy:
+    global _default_retry_policy
+    with _default_retry_policy_lock:
+        if _default_retry_policy is None:
+            _default_retry_policy = RetryPolicy()
+        return _default_retry_policy
@@ -1,47 +1,32 @@
 import argparse
 import sys
-import time
-import urllib.request
-import urllib.error
-import re
-import json
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse, parse_qs, urlencode
 from html.parser import HTMLParser
+from http_client import HttpClient, FetchResult, get_default_client
+from http_cache import ValidatorCache
+from rate_limiter import get_default_rate_limiter, configure_default_rate_limiter
+from list_page import analyze_list_page, parse_sdata, link_key, notice_timestamp, timestamp_before, newest_timestamp
+from list_templates import ListTemplateCache
+from crawl_cursor import CrawlCursor, restore_cookies
+from retry_policy import get_default_retry_policy
+
+# 无法确定总页数时的翻页上限
+DEFAULT_MAX_PAGE = 70
+# 探测总页数时的页码上限：_page_limit 的倍数 (对超出范围的页码返回默认页的服务器不会一直探测下去)
+DISCOVERY_FACTOR = 4
+# 各站点 (POST 目标 URL) 是否接受用第 1 页的 form 状态请求任意页码，每个站点只探测一次
+_stateless_post_sites = {}
+_stateless_post_lock = threading.Lock()
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
 def parse_json_response(html: str) -> list[dict]:
     """
     尝试从 HTML 中提取 var sdata... = [...] 格式的 JSON 数据
     """
-    notices = []
-    # 匹配 var sdata... = [...];
-    # 注意：JSON 可能跨多行，使用 DOTALL
-    pattern = re.compile(r'var\s+sdata\w+\s*=\s*(\[.*?\]);', re.DOTALL)
-    match = pattern.search(html)
-    
-    if match:
-        json_str = match.group(1)
-        try:
-            data = json.loads(json_str)
-            for item in data:
-                link = item.get("url", "")
-                if link.startswith("//"):
-                    link = "https:" + link
-                elif link.startswith("/"):
-                    # 假设是相对路径，需要 base_url，但这里没有 context
-                    # 暂时保留原样，或者假设是 https://www.sdxd.edu.cn
-                    pass
-                    
-                notice = {
-                    "title": item.get("title", ""),
-                    "date": item.get("sjall", "").split(" ")[0], # 只取日期部分
-                    "link": link,
-                    "body": item.get("Abstract", "")
-                }
-                notices.append(notice)
-        except json.JSONDecodeError as e:
-            print(f"[warn] JSON 解析失败: {e}")
-            
-    return notices
+    return parse_sdata(html)
 
 class NoticeParser(HTMLParser):
     def __init__(self):
@@ -110,29 +95,35 @@ class NoticeParser(HTMLParser):
         if self.in_title or self.in_body or self.in_date_day or self.in_date_year:
             self.temp_data += data
 
-import http.cookiejar
-
-# 全局 Opener，用于保持 Cookie
-cookie_jar = http.cookiejar.CookieJar()
-opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cookie_jar))
+def fetch_page(url: str, timeout: float, user_agent: str, data: dict = None, referer: str = None, extra_headers: dict = None, client: HttpClient = None, conditional: bool = False) -> FetchResult:
+    """
+    通过共享的 HttpClient 发送请求 (连接池 + keep-alive，自动协商 gzip/deflate/br 压缩)。
+    client 为空时使用进程内默认客户端；一次抓取会话应传入自己的 client 以隔离 Cookie。
+    conditional 为 True 时发送条件请求 (需要 client 配置了 validator_cache)。
+    """
+    if client is None:
+        client = get_default_client()
 
-def fetch(url: str, timeout: float, user_agent: str, data: dict = None, referer: str = None, extra_headers: dict = None) -> str:
     headers = {"User-Agent": user_agent}
     if referer:
         headers["Referer"] = referer
     if extra_headers:
         headers.update(extra_headers)
-        
-    req = urllib.request.Request(url, headers=headers)
+
     if data:
-        encoded_data = urlencode(data).encode('utf-8')
-        req.data = encoded_data
-        req.method = 'POST'
         # 移除 AJAX 头，以获取完整页面（包含 ViewState）
-        # req.add_header("X-Requested-With", "XMLHttpRequest")
-    
-    with opener.open(req, timeout=timeout) as response:
-        return response.read().decode('utf-8', errors='ignore')
+        # headers["X-Requested-With"] = "XMLHttpRequest"
+        # 翻页 POST 只读取数据，可以安全重试
+        result = client.fetch(url, method="POST", data=data, headers=headers, timeout=timeout, idempotent=True)
+    else:
+        result = client.fetch(url, headers=headers, timeout=timeout, conditional=conditional)
+
+    result.raise_for_status()
+    print(f"  [net] {result.transfer_summary()}")
+    return result
+
+def fetch(url: str, timeout: float, user_agent: str, data: dict = None, referer: str = None, extra_headers: dict = None, client: HttpClient = None) -> str:
+    return fetch_page(url, timeout, user_agent, data, referer, extra_headers, client).text('utf-8', errors='ignore')
 
 def extract_form_data(html: str, target_component_id: str = None) -> dict:
     """
@@ -208,6 +199,320 @@ def extract_form_data(html: str, target_component_id: str = None) -> dict:
         return parser.first_form_data
     return {}
 
+def iter_post_pages(target_url: str, referer: str, form_data: dict, component_id: str, first_page: int, max_page: int, timeout: float, client: HttpClient, prefetched: dict = None):
+    """
+    串行 POST 翻页，按页码产出 (页码, ListPage, None)；请求失败时产出 (页码, None, 异常) 后结束。
+    每页请求使用上一页响应中的 __VIEWSTATE 等隐藏字段 (form_data 原地更新，产出某页时已是请求下一页的状态)，因此不能并发。
+    prefetched: {页码: ListPage}，已经用同样的 form 状态抓取过的页 (如探测时抓取的第 first_page 页) 不再请求。
+    """
+    prefetched = prefetched or {}
+    for current_page in range(first_page, max_page + 1):
+        analysis = prefetched.pop(current_page, None)
+        if analysis is None:
+            # 注意：参数名就是 component_id
+            current_form_data = form_data.copy()
+            current_form_data[component_id] = str(current_page)
+            
+            print(f"[{current_page}/{max_page}] 正在抓取第 {current_page} 页 (POST to {target_url})...")
+            try:
+                html = fetch(target_url, timeout, USER_AGENT, data=current_form_data, referer=referer, extra_headers={"X-Requested-With": "XMLHttpRequest"}, client=client)
+            except Exception as e:
+                yield current_page, None, e
+                return
+
+            # 一次扫描得到本页的通知与 form 数据
+            analysis = analyze_list_page(html)
+
+        # 尝试从当前页面更新 form_data (用于获取新的 __VIEWSTATE 等)
+        # 注意：这里也需要指定 target_component_id，否则可能提取到错误的 form
+        # 在交付本页之前更新，调用方此时保存的 form_data 就是请求下一页所需的状态
+        new_form_data = analysis.form_data(target_component_id=component_id)
+        if new_form_data:
+            # 只更新隐藏字段，保留核心参数
+            for k, v in new_form_data.items():
+                if k not in ['webpageId', 'newsComponentId', component_id]:
+                    form_data[k] = v
+        else:
+            print(f"[warn] 响应中未找到目标 Form ({component_id})，无法更新 ViewState，翻页可能失败。")
+        yield current_page, analysis, None
+
+def get_page_fetcher(base_url: str, webpage_id: str, component_id: str, timeout: float, referer: str, client: HttpClient):
+    """
+    返回 fetch_page_no(页码) -> ListPage：GET 方式的页码 URL 为 /?webpageId=...&<component_id>=<页码>，
+    与前一页的响应无关，可以任意顺序、并发请求。
+    """
+    def fetch_page_no(page_no):
+        # GET 方式：直接构造 URL
+        # 格式: /?webpageId=...&componentId=page
+        query_params = {
+            "webpageId": webpage_id,
+            component_id: str(page_no)
+        }
+        next_url = f"{base_url}?{urlencode(query_params)}"
+        print(f"正在抓取第 {page_no} 页 (GET {next_url})...")
+        return analyze_list_page(fetch(next_url, timeout, USER_AGENT, referer=referer, client=client))
+    return fetch_page_no
+
+def get_post_page_fetcher(target_url: str, referer: str, form_data: dict, component_id: str, timeout: float, client: HttpClient):
+    """
+    返回 fetch_page_no(页码) -> ListPage：每次都用同一份 form 快照 (通常是第 1 页的隐藏字段) 只修改页码后 POST。
+    只有服务器不校验 ViewState 与页码的对应关系时才能这样翻页，见 probe_stateless_post。
+    """
+    snapshot = dict(form_data)
+
+    def fetch_page_no(page_no):
+        current_form_data = dict(snapshot)
+        current_form_data[component_id] = str(page_no)
+        print(f"正在抓取第 {page_no} 页 (POST to {target_url})...")
+        return analyze_list_page(fetch(target_url, timeout, USER_AGENT, data=current_form_data, referer=referer, extra_headers={"X-Requested-With": "XMLHttpRequest"}, client=client))
+    return fetch_page_no
+
+def probe_stateless_post(fetch_page_no, first_notices: list[dict], concurrency: int = 2) -> tuple[bool | None, dict]:
+    """
+    检查服务器是否接受用第 1 页的 form 快照请求任意页码：同时抓取第 2、3 页 (fetch_page_no 来自 get_post_page_fetcher)。
+    链接按 link_key 比较 (第 1 页的 HTML 卡片与 sdata 中的链接形式不同)。返回 (结论, {页码: ListPage})：
+    - True: 第 1、2、3 页都有通知且两两不重复，说明 ViewState 不绑定页码，可以并发翻页；
+    - False: 第 2 页正常，第 3 页却重复了第 1 或第 2 页的内容 (服务器对过期的 ViewState 返回默认页)，只能逐页翻页；
+    - None: 无法判断 (有空页，或第 2 页与第 1 页重复)，本次逐页翻页，结论不应保存。
+    第 2 页本来就只依赖第 1 页的状态，总是正确结果；第 3 页只在结论为 True 时保留，可供翻页使用。
+    """
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, 2)), thread_name_prefix="list-page") as executor:
+        futures = {page_no: executor.submit(fetch_page_no, page_no) for page_no in (2, 3)}
+        pages = {page_no: future.result() for page_no, future in futures.items()}
+    first, second, third = ({link_key(notice.get("link", "")) for notice in notices} - {""}
+                            for notices in (first_notices, pages[2].notices, pages[3].notices))
+    if not first or not second or not third or second & first:
+        stateless = None
+    else:
+        stateless = not third & (first | second)
+    if not stateless:
+        # 第 3 页的结果不可信，只保留第 2 页
+        del pages[3]
+    return stateless, pages
+
+def iter_pages_concurrently(fetch_page_no, first_page: int, max_page: int, concurrency: int = 4, is_last_page=None, prefetched: dict = None, is_all_new=None):
+    """
+    用 concurrency 个线程并发调用 fetch_page_no(页码) (同一 host，仍受 client 的自适应限速器约束)，
+    按页码顺序产出 (页码, ListPage, None)；请求失败时产出 (页码, None, 异常) 后结束。
+    is_last_page(notices): 某页 (按完成顺序，不必等前面的页) 满足时不再提交更大的页码，
+    用于空页或全部是历史内容的页。prefetched: {页码: ListPage}，探测总页数时已经抓取的页不再请求。
+    is_all_new(notices): 增量运行时传入。提前请求的页数从 1 开始，交付的页满足它 (全部是新内容) 时才加倍，
+    通常只需一两页的增量运行不会多发请求；为空时一开始就提前 concurrency * 2 页。
+    调用方提前停止时应 close() 生成器，未开始的请求会被取消。
+    """
+    lock = threading.Lock()
+    last_page = [max_page]
+    prefetched = prefetched or {}
+    full_window = max(1, concurrency) * 2
+    window = full_window if is_all_new is None else 1
+
+    def check_page(page_no, analysis):
+        if is_last_page is not None and is_last_page(analysis.notices):
+            with lock:
+                last_page[0] = min(last_page[0], page_no)
+        return analysis
+
+    for page_no, analysis in prefetched.items():
+        check_page(page_no, analysis)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="list-page")
+    futures = {}
+    next_submit = first_page
+    try:
+        for page_no in range(first_page, max_page + 1):
+            # 最多提前 window 页，已知的最后一页之后不再提交
+            while next_submit < page_no + window:
+                with lock:
+                    if next_submit > last_page[0]:
+                        break
+                if next_submit not in prefetched:
+                    futures[next_submit] = executor.submit(lambda n: check_page(n, fetch_page_no(n)), next_submit)
+                next_submit += 1
+            if page_no in prefetched:
+                analysis = prefetched.pop(page_no)
+            else:
+                future = futures.pop(page_no, None)
+                if future is None:
+                    return
+                try:
+                    analysis = future.result()
+                except Exception as e:
+                    yield page_no, None, e
+                    return
+            yield page_no, analysis, None
+            if window < full_window and is_all_new(analysis.notices):
+                window = min(full_window, window * 2)
+    finally:
+        for future in futures.values():
+            future.cancel()
+        # 等待已经发出的请求结束，调用方随后可能关闭 client
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def discover_page_count(has_notices, hint: int = None, known_page: int = 0, limit: int = None) -> tuple[int, int]:
+    """
+    查找最后一个有通知的页码 (假设有内容的页从第 1 页开始连续，之后都是空页或重复前面内容的默认页)。
+    has_notices(页码) -> bool：请求该页并返回是否有 (不重复的) 通知。
+    hint: 分页栏给出的页数，先验证第 hint 页有内容且第 hint + 1 页为空 (两次请求即可确定)；
+    否则从已知有内容的页 (known_page 或 hint) 开始按 1、2、4、8... 的步长向后探测到第一个空页，
+    再在最后一个有内容的页与第一个空页之间二分查找。
+    limit: 最多探测到的页码，默认为 _page_limit(hint) 的 DISCOVERY_FACTOR 倍。
+    返回 (页数, 探测请求数)；页数为 0 表示第 1 页就是空页，第 limit 页仍有内容时返回 limit。
+    """
+    if limit is None:
+        limit = _page_limit(hint) * DISCOVERY_FACTOR
+    probes = 0
+
+    def probe(page_no):
+        nonlocal probes
+        probes += 1
+        return has_notices(page_no)
+
+    # low: 已知有内容的最大页码；high: 已知为空的最小页码
+    low, high = known_page, None
+    if hint and low < hint < limit:
+        if probe(hint):
+            low = hint
+            if not probe(hint + 1):
+                return hint, probes
+            low = hint + 1
+        else:
+            high = hint
+    step = 1
+    while high is None:
+        if low >= limit:
+            return limit, probes
+        candidate = min(low + step, limit)
+        if probe(candidate):
+            low = candidate
+            step *= 2
+        else:
+            high = candidate
+    while high - low > 1:
+        middle = (low + high) // 2
+        if probe(middle):
+            low = middle
+        else:
+            high = middle
+    return low, probes
+
+def _fetch_template_first_page(template: dict, method: str, base_url: str, webpage_id: str, referer: str, timeout: float, client: HttpClient) -> FetchResult:
+    """
+    按缓存的分页模板直接发送第 1 页的数据请求 (与翻页请求相同)。
+    """
+    component_id = template["component_id"]
+    if method.upper() == "GET":
+        url = f"{base_url}?{urlencode({'webpageId': webpage_id, component_id: '1'})}"
+        print(f"请求第 1 页数据 (GET {url})...")
+        return fetch_page(url, timeout, USER_AGENT, referer=template["target_url"], client=client)
+    form_data = dict(template["form"])
+    form_data[component_id] = "1"
+    print(f"请求第 1 页数据 (POST to {template['target_url']})...")
+    return fetch_page(template["target_url"], timeout, USER_AGENT, data=form_data, referer=referer, extra_headers={"X-Requested-With": "XMLHttpRequest"}, client=client)
+
+def _probe_stateless_post(target_url: str, referer: str, form_data: dict, component_id: str, timeout: float, client: HttpClient, concurrency: int, first_notices: list[dict], prefetched: dict) -> bool | None:
+    """
+    每个站点 (POST 目标 URL) 只探测一次是否可以无状态翻页，得出结论后在进程内记住；探测时抓到的页存入 prefetched。
+    返回 probe_stateless_post 的结论，探测失败或无法判断时返回 None (本次逐页翻页，下次运行重新探测)。
+    """
+    with _stateless_post_lock:
+        stateless = _stateless_post_sites.get(target_url)
+    if stateless is not None:
+        print(f"[info] POST 翻页方式: {'无状态 (并发)' if stateless else '依赖上一页 ViewState (逐页)'}")
+        return stateless
+    print("探测 POST 翻页是否依赖上一页的 ViewState...")
+    try:
+        stateless, pages = probe_stateless_post(get_post_page_fetcher(target_url, referer, form_data, component_id, timeout, client), first_notices, concurrency)
+    except Exception as e:
+        print(f"[warn] 探测失败: {e}，使用逐页 POST 翻页")
+        return None
+    prefetched.update(pages)
+    if stateless is None:
+        print("[info] 无法确定翻页是否依赖 ViewState (探测页为空或内容重复)，本次使用逐页 POST 翻页。")
+        return None
+    with _stateless_post_lock:
+        _stateless_post_sites[target_url] = stateless
+    if stateless:
+        print("[info] 服务器接受第 1 页的 form 状态请求任意页码，POST 翻页改为并发抓取。")
+    else:
+        print("[info] 翻页依赖上一页的 ViewState，使用逐页 POST 翻页。")
+    return stateless
+
+def _page_limit(hint: int = None) -> int:
+    """
+    未经探测确认的翻页上限：分页栏可能只显示附近几页，因此不低于 DEFAULT_MAX_PAGE，
+    仍以空页、历史记录等条件提前停止。
+    """
+    return max(hint or 0, DEFAULT_MAX_PAGE)
+
+def _discover_page_count(fetch_page_no, hint: int, first_notices: list[dict], prefetched: dict):
+    """
+    用 fetch_page_no 探测实际页数，抓到的页存入 prefetched；探测失败时返回 None (回退到 _page_limit)。
+    超出范围的页码可能返回默认页而不是空页：多数链接与页码更小的页重复的页也算作没有通知。
+    """
+    def link_keys(notices):
+        return {link_key(notice.get("link", "")) for notice in notices} - {""}
+
+    def has_notices(page_no):
+        if page_no not in prefetched:
+            prefetched[page_no] = fetch_page_no(page_no)
+        keys = link_keys(prefetched[page_no].notices)
+        if not keys:
+            return False
+        earlier = link_keys(first_notices)
+        for other_no, other in prefetched.items():
+            if other_no < page_no:
+                earlier |= link_keys(other.notices)
+        if len(keys & earlier) * 2 > len(keys):
+            print(f"[info] 第 {page_no} 页重复了前面页的内容，视为超出总页数")
+            return False
+        return True
+
+    # 从第 1 页开始连续有内容的已抓取页 (如无状态 POST 探测时的第 2、3 页) 不必再探测
+    known_page = 1 if first_notices else 0
+    while known_page + 1 in prefetched and prefetched[known_page + 1].notices:
+        known_page += 1
+    print(f"探测总页数 (分页栏: {hint or '无'})...")
+    try:
+        page_count, probes = discover_page_count(has_notices, hint, known_page)
+    except Exception as e:
+        print(f"[warn] 探测总页数失败: {e}，改为翻页到空页为止")
+        prefetched.clear()
+        return None
+    print(f"[info] 共 {page_count} 页 (探测请求 {probes} 次，其中 {sum(1 for n, page in prefetched.items() if n <= page_count and page.notices)} 页将直接用于翻页)")
+    return page_count
+
+def parse_date_bound(value: str) -> str:
+    """
+    把 --since/--until 的日期 (YYYY-MM-DD、YYYY/MM/DD 或 YYYYMMDD) 转为可与 notice_timestamp 比较的 YYYYMMDD。
+    """
+    digits = value.strip().replace("-", "").replace("/", "")
+    try:
+        return datetime.strptime(digits, "%Y%m%d").strftime("%Y%m%d")
+    except ValueError:
+        raise ValueError(f"无效的日期: {value}") from None
+
+def find_first_page_until(fetch_page_no, until: str, first_page: int, last_page: int, prefetched: dict) -> int:
+    """
+    列表按发布时间倒序时，二分查找第一个包含不晚于 until 的通知的页 (空页也算)，之前的页全部晚于 until，不必抓取。
+    抓到的页存入 prefetched 供翻页使用；first_page 本身已满足时只请求一次。
+    """
+    def reaches(page_no):
+        if page_no not in prefetched:
+            prefetched[page_no] = fetch_page_no(page_no)
+        keys = [key for key in map(notice_timestamp, prefetched[page_no].notices) if key]
+        return not keys or not timestamp_before(until, keys[-1])
+
+    if reaches(first_page):
+        return first_page
+    low, high = first_page + 1, last_page
+    while low < high:
+        middle = (low + high) // 2
+        if reaches(middle):
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
 def parse_url_info(url_str: str) -> tuple[str, str, str] | None:
     """
     解析 URL，返回 (base_url, webpage_id, component_id)
@@ -244,13 +549,48 @@ def parse_url_info(url_str: str) -> tuple[str, str, str] | None:
     base_url = f"{parsed.scheme}://{parsed.netloc}/"
     return base_url, webpage_id, comp_id
 
-def crawl_notices(source: str, output_file: str, is_file: bool = False, timeout: float = 30.0, start_page: int = 2, method: str = "POST", history: set = None) -> list[dict]:
+def crawl_notices(source: str, output_file: str, is_file: bool = False, timeout: float = 30.0, start_page: int = 2, method: str = "POST", history: set = None, client: HttpClient = None, validator_cache: ValidatorCache = None, concurrency: int = 4, max_page: int = None, template_cache: ListTemplateCache = None,
+                  cursor_path: str = None, resume: bool = False, checkpoint_every: int = 5,
+                  watermark: str = None, since: str = None, until: str = None) -> list[dict]:
     """
     抓取通知。
     :param history: 已知链接集合 (set)。如果提供，遇到其中的链接将视为旧内容。
+    :param client: HTTP 客户端。不传则为本次抓取新建一个 (独立连接池与 Cookie)，结束时关闭。
+    :param validator_cache: 条件请求缓存，仅在新建 client 时使用。增量模式下第一页未变化则直接返回空列表。
+    :param concurrency: GET 或无状态 POST 翻页时同时请求的页数 (同一 host)；1 为逐页抓取。
+                        POST 方式会先探测服务器是否接受第 1 页的 form 状态请求任意页码 (每个站点一次，增量运行不探测)。
+                        增量运行 (history 或高水位线/since) 从逐页开始，遇到全部是新内容的页才逐步增加并发。
+    :param max_page: 最后抓取的页码 (与 start_page 一起可把完整抓取拆成多段)。
+                     为空时自动确定：可以并发翻页 (GET 或无状态 POST) 的完整抓取探测实际页数，其余情况参考分页栏，
+                     没有线索时为 DEFAULT_MAX_PAGE。
+    :param template_cache: 分页模板缓存 (组件 ID、翻页 URL、form 字段)。有该栏目的模板时跳过初始页面，
+                           直接请求第 1 页数据；调用方负责在运行结束后 save()。
+    :param cursor_path: 抓取游标文件。翻页时每 checkpoint_every 页、以及中断或出错时保存进度，正常结束后删除；
+                        不使用 resume 时，开始抓取前删除上次留下的游标。
+    :param resume: 从 cursor_path 中的进度继续 (跳过第一页，沿用已采集的通知、已见链接和 form 状态)。
+    :param watermark: 高水位线，即上次运行见过的最新发布时间 (notice_timestamp 的形式，见 list_page.newest_timestamp)。
+                      不晚于它的条目跳过 (等于它的条目上次已经见过)；列表按发布时间倒序，某页最后一条已不晚于它时停止翻页，通常只需请求第 1 页。
+    :param since: 起始日期 (YYYY-MM-DD，含当天)，在翻页时过滤：早于它的条目跳过，翻到早于它的页即停止。
+    :param until: 截止日期 (YYYY-MM-DD，含当天)，晚于它的条目跳过；可以并发翻页且已知总页数时，
+                  先二分查找 until 所在的页，跳过前面的页。
     :return: 抓取到的所有通知列表 (list of dict)
     """
     print(f"开始处理: {source}")
+
+    owns_client = client is None
+    if owns_client:
+        client = HttpClient(timeout=timeout, validator_cache=validator_cache, rate_limiter=get_default_rate_limiter(), retry_policy=get_default_retry_policy())
+    try:
+        cursor = CrawlCursor(cursor_path) if cursor_path else None
+        return _crawl_notices(source, output_file, is_file, timeout, start_page, method, history, client, concurrency, max_page, template_cache,
+                              cursor, resume, max(1, checkpoint_every), watermark,
+                              parse_date_bound(since) if since else None, parse_date_bound(until) if until else None)
+    finally:
+        if owns_client:
+            client.close()
+
+def _crawl_notices(source: str, output_file: str, is_file: bool, timeout: float, start_page: int, method: str, history: set, client: HttpClient, concurrency: int, max_page: int, template_cache: ListTemplateCache,
+                   cursor: CrawlCursor, resume: bool, checkpoint_every: int, watermark: str, since: str, until: str) -> list[dict]:
     
     all_notices = []
     new_items_count = 0
@@ -265,233 +605,377 @@ def crawl_notices(source: str, output_file: str, is_file: bool = False, timeout:
     base_url, webpage_id, component_id = url_info if url_info else (None, None, None)
     
     form_data = None
+    template_key = None
+    from_template = False
+    
+    # history 中的链接可能来自 HTML 卡片 (//host/...) 或 sdata (https://host/...)，按 link_key 比较，
+    # 使用分页模板时第 1 页来自 sdata，也能认出以前从 HTML 卡片记录的链接
+    history_keys = {link_key(link) for link in history} if history else set()
+
+    def in_history(link):
+        return link_key(link) in history_keys
+
+    # 下限是高水位线与 since：超出下限的条目跳过，翻到超出下限的页即停止；晚于 until 的条目跳过
+    lower_bound = bool(since or watermark)
+
+    def below_lower_bound(key):
+        # since 包含当天；等于高水位线的条目上次已经见过 (见 timestamp_before)
+        return bool(since and timestamp_before(key, since) or watermark and timestamp_before(key, watermark, or_equal=True))
+
+    def out_of_range(notice):
+        """
+        返回 "newer" (晚于 until)、"older" (早于下限)，在范围内或没有发布时间时返回 None。
+        """
+        key = notice_timestamp(notice)
+        if key is None:
+            return None
+        if until and timestamp_before(until, key):
+            return "newer"
+        if below_lower_bound(key):
+            return "older"
+        return None
+
+    def reached_lower_bound(page_notices):
+        # 列表按发布时间倒序：本页最后一条有发布时间的通知已早于下限，之后的页不会再有范围内的内容
+        # (只看最后一条，置顶的旧通知不会导致提前停止)
+        if not lower_bound:
+            return False
+        keys = [key for key in map(notice_timestamp, page_notices) if key]
+        return bool(keys) and below_lower_bound(keys[-1])
+    
+    # 从抓取游标恢复：跳过第一页，直接从中断处继续翻页
+    state = cursor.load(source, method) if cursor is not None and resume else None
+    if resume and state is None:
+        print("[info] 没有可恢复的抓取游标，从头开始抓取。")
+    elif cursor is not None and not resume and cursor.clear():
+        # 从头开始的抓取不读取上次中断留下的游标，删除它，避免之后误用 --resume 恢复到过时的进度
+        print(f"[info] 已删除上次中断留下的抓取游标 {cursor.path} (本次从头抓取，继续上次的进度请使用 --resume)")
     
     # 抓取第一页
     target_url = ""
     try:
-        if is_file:
+        if state is not None:
+            print(f"[info] 从抓取游标恢复 (保存于 {state['saved_at']})：从第 {state['next_page']} 页继续，已采集 {len(state['notices'])} 条")
+            parsed_source = urlparse(source)
+            initial_url = f"{parsed_source.scheme}://{parsed_source.netloc}{parsed_source.path}"
+            all_notices = state["notices"]
+            seen_links = set(state["seen_links"])
+            component_id = state["component_id"]
+            target_url = state["target_url"]
+            form_data = state["form_data"]
+            max_page = max_page or state["max_page"]
+            restore_cookies(client.cookies, state["cookies"])
+            analysis = None
+            notices = []
+        elif is_file:
             with open(source, "r", encoding="utf-8") as f:
                 html = f.read()
+            analysis = analyze_list_page(html)
         else:
             # 初始请求使用原始 URL，以确保获取正确的页面内容和 Form 数据
             parsed_source = urlparse(source)
             # 去除 fragment
             initial_url = f"{parsed_source.scheme}://{parsed_source.netloc}{parsed_source.path}"
-            print(f"请求初始页面: {initial_url}")
+            # 分页模板按栏目的列表页 URL (含 webpageId) 记录
+            template_key = initial_url
+            template = template_cache.get(template_key) if template_cache is not None else None
+            if template is not None:
+                print(f"[info] 使用缓存的分页模板 (组件 ID: {template['component_id']})，跳过初始页面，直接请求第 1 页数据")
+                try:
+                    page = _fetch_template_first_page(template, method, base_url, webpage_id, initial_url, timeout, client)
+                except Exception as e:
+                    print(f"[warn] 使用分页模板请求第 1 页失败: {e}")
+                    page = None
+                # 先做不需要解析的检查：组件 ID 必须出现在响应中 (服务器对未知参数可能直接返回默认页)
+                if page is not None and template["component_id"].encode() not in page.content:
+                    page = None
+                # 增量模式：第 1 页数据与上次相同 (指纹忽略 ViewState) 时不可能有新内容，不必解析。
+                # 数据请求与初始页面的响应不同，单独记录在 "列表页 URL#组件ID=1" 下，不覆盖初始页面的验证器；
+                # 丢弃列表页 URL 的记录时一并丢弃 (见 ValidatorCache.discard)
+                data_key = f"{initial_url}#{template['component_id']}=1"
+                if page is not None and history and client.validator_cache is not None and client.validator_cache.update(data_key, page.headers, page.content):
+                    print("[info] 第 1 页自上次运行以来未变化，跳过解析。")
+                    return all_notices
+                analysis = analyze_list_page(page.text('utf-8', errors='ignore')) if page is not None else None
+                # 校验：响应中有通知，且仍能找到同一个组件 ID
+                if analysis is not None and analysis.notices and template["component_id"] in (analysis.link_component_id, analysis.input_component_id):
+                    from_template = True
+                    component_id = template["component_id"]
+                    target_url = template["target_url"]
+                    # 使用第 1 页响应中最新的隐藏字段 (ViewState)，没有时使用模板中保存的
+                    form_data = analysis.form_data(target_component_id=component_id) or template["form"]
+                    template_cache.update(template_key, component_id, target_url, form_data)
+                    if template["stateless_post"] is not None:
+                        with _stateless_post_lock:
+                            _stateless_post_sites.setdefault(target_url, template["stateless_post"])
+                else:
+                    print("[warn] 分页模板已失效 (响应中没有通知或组件 ID 已改变)，重新请求初始页面。")
+                    template_cache.discard(template_key)
+                    if client.validator_cache is not None:
+                        client.validator_cache.discard(initial_url)
+
+            if not from_template:
+                print(f"请求初始页面: {initial_url}")
             
-            html = fetch(initial_url, timeout, "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+                # 增量模式下使用条件请求：页面自上次运行以来未变化时，不可能有新内容
+                page = fetch_page(initial_url, timeout, USER_AGENT, client=client, conditional=bool(history))
+                if page.not_modified:
+                    print("[info] 第 1 页自上次运行以来未变化，跳过解析。")
+                    return all_notices
+                html = page.text('utf-8', errors='ignore')
+                # 一次扫描得到通知、form 隐藏字段和组件 ID
+                analysis = analyze_list_page(html)
             
-            # DEBUG: Save Page 1 HTML - Removed for cleanup
-            # with open("d:\\pachong\\debug_page1.html", "w", encoding="utf-8") as f:
-            #    f.write(html)
+                # DEBUG: Save Page 1 HTML - Removed for cleanup
+                # with open("d:\\pachong\\debug_page1.html", "w", encoding="utf-8") as f:
+                #    f.write(html)
             
-            # 尝试自动检测页面中的真实 Component ID
-            # 1. 查找类似 ?webpageId=...&COMPONENT_ID=... 的链接
-            # 注意：HTML 中可能是 &amp;，且 ID 长度可能为 32 或 33
-            real_comp_id_match = re.search(r'webpageId=[^&]+&(?:amp;)?([a-zA-Z0-9]{32,})=\d+', html)
-            if real_comp_id_match:
-                found_comp_id = real_comp_id_match.group(1)
-                if found_comp_id != component_id:
-                    print(f"[info] 检测到页面实际分页组件 ID 为: {found_comp_id} (原: {component_id})")
-                    component_id = found_comp_id
+                # 尝试自动检测页面中的真实 Component ID
+                # 1. 查找类似 ?webpageId=...&COMPONENT_ID=... 的链接
+                # 注意：HTML 中可能是 &amp;，且 ID 长度可能为 32 或 33
+                found_comp_id = analysis.link_component_id
+                if found_comp_id:
+                    if found_comp_id != component_id:
+                        print(f"[info] 检测到页面实际分页组件 ID 为: {found_comp_id} (原: {component_id})")
+                        component_id = found_comp_id
             
-            # 2. 如果还没找到，尝试查找 hidden input
-            if not component_id:
-                 input_match = re.search(r'<input[^>]*name="newsComponentId"[^>]*value="([a-zA-Z0-9]{32})"', html)
-                 if input_match:
-                     component_id = input_match.group(1)
-                     print(f"[info] 从隐藏域检测到组件 ID: {component_id}")
-
-            # 如果是分页模式，尝试提取 form 数据
-            if component_id:
-                print(f"尝试提取分页 Form 数据 (Component ID: {component_id})...")
-                form_data = extract_form_data(html, target_component_id=component_id)
+                # 2. 如果还没找到，尝试查找 hidden input
+                if not component_id:
+                     if analysis.input_component_id:
+                         component_id = analysis.input_component_id
+                         print(f"[info] 从隐藏域检测到组件 ID: {component_id}")
+
+                # 如果是分页模式，尝试提取 form 数据
+                if component_id:
+                    print(f"尝试提取分页 Form 数据 (Component ID: {component_id})...")
+                    form_data = analysis.form_data(target_component_id=component_id)
                 
-                if form_data:
-                    print("成功提取目标 Form 数据，将使用 POST 请求翻页。")
-                    # 打印关键参数以供调试
-                    print(f"  pagesize: {form_data.get('pagesize')}")
-                    print(f"  newstype: {form_data.get('newstype')}")
+                    if form_data:
+                        print("成功提取目标 Form 数据，将使用 POST 请求翻页。")
+                        # 打印关键参数以供调试
+                        print(f"  pagesize: {form_data.get('pagesize')}")
+                        print(f"  newstype: {form_data.get('newstype')}")
+                    
+                        # 构造 POST 请求的目标 URL (通常是 /?webpageId=...)
+                        if webpage_id:
+                            target_url = f"{base_url}?webpageId={webpage_id}"
+                        else:
+                            target_url = initial_url
+                        print(f"翻页 POST URL: {target_url}")
+                        if template_cache is not None:
+                            template_cache.update(template_key, component_id, target_url, form_data)
                     
-                    # 构造 POST 请求的目标 URL (通常是 /?webpageId=...)
-                    if webpage_id:
-                        target_url = f"{base_url}?webpageId={webpage_id}"
                     else:
+                        print("[warn] 未找到包含目标 Component ID 的 Form 数据！将尝试使用默认/空数据。")
+                        # 尝试回退到第一个 Form? 或者报错?
+                        # 暂时尝试手动构造，但很可能失败
+                        form_data = {
+                            'newsComponentId': component_id,
+                        }
                         target_url = initial_url
-                    print(f"翻页 POST URL: {target_url}")
-                    
-                else:
-                    print("[warn] 未找到包含目标 Component ID 的 Form 数据！将尝试使用默认/空数据。")
-                    # 尝试回退到第一个 Form? 或者报错?
-                    # 暂时尝试手动构造，但很可能失败
-                    form_data = {
-                        'newsComponentId': component_id,
-                    }
-                    target_url = initial_url
 
 
     except Exception as e:
         print(f"[error] 获取第一页失败: {e}", file=sys.stderr)
         return []
 
-    # 解析第一页
-    parser = NoticeParser()
-    parser.feed(html)
-    
-    notices = parser.notices
-    if not notices:
-        print("[info] HTML 解析未找到内容，尝试提取 JSON 数据...")
-        notices = parse_json_response(html)
-        if notices:
-            print(f"[info] 使用 JSON 数据解析成功 (发现 {len(notices)} 条)")
-
-    # 检查第一页内容
-    page1_new_items = 0
-    for notice in notices:
-        link = notice.get("link", "")
-        if link not in seen_links:
-            seen_links.add(link)
-            # 检查是否在历史记录中
-            if history and link in history:
-                continue # 跳过历史记录
+    if state is None:
+        # 解析第一页
+        notices = analysis.html_notices
+        if not notices:
+            print("[info] HTML 解析未找到内容，尝试提取 JSON 数据...")
+            notices = analysis.json_notices
+            if notices:
+                print(f"[info] 使用 JSON 数据解析成功 (发现 {len(notices)} 条)")
+
+        # 检查第一页内容
+        page1_new_items = 0
+        page1_newer_items = 0
+        for notice in notices:
+            link = notice.get("link", "")
+            if link not in seen_links:
+                seen_links.add(link)
+                # 检查是否在历史记录中
+                if in_history(link):
+                    continue # 跳过历史记录
+                # 检查发布时间是否在范围内
+                position = out_of_range(notice)
+                if position:
+                    page1_newer_items += position == "newer"
+                    continue
             
-            all_notices.append(notice)
-            page1_new_items += 1
+                all_notices.append(notice)
+                page1_new_items += 1
             
-    print(f"第 1 页发现 {len(notices)} 条通知，其中新内容 {page1_new_items} 条")
+        print(f"第 1 页发现 {len(notices)} 条通知，其中新内容 {page1_new_items} 条")
     
-    # 如果第一页全是旧内容，且提供了 history，则可能不需要继续翻页
-    if history and page1_new_items == 0 and len(notices) > 0:
-        print("第 1 页全部为历史内容，停止抓取。")
-        # 写入空文件或不写入？根据需求，这里直接返回
-        return all_notices
+        # 如果第一页全是旧内容，且提供了 history，则可能不需要继续翻页
+        if history and page1_new_items == 0 and page1_newer_items == 0 and len(notices) > 0:
+            print("第 1 页全部为历史内容，停止抓取。")
+            # 写入空文件或不写入？根据需求，这里直接返回
+            return all_notices
+
+        # 第 1 页已经翻到高水位线 (或 since) 之前：不再翻页，常见的增量运行只需这一次请求
+        stop_paging = reached_lower_bound(notices)
+        if stop_paging:
+            print("第 1 页已到达高水位线/起始日期，不再翻页。")
+    else:
+        stop_paging = False
 
     # 翻页循环
+    paging = completed = failed = False
+    next_page = None
+
+    def save_checkpoint():
+        # 只在开始翻页之后调用，此时翻页所需的状态都已确定
+        cursor.save(source, method, next_page, max_page, component_id, target_url, form_data, fetch_page_no is not None,
+                    all_notices, seen_links, consecutive_duplicates, client.cookies)
+
     try:
-        if not is_file and form_data and target_url:
+        if not is_file and form_data and target_url and not stop_paging:
             # 如果第一页没有发现内容（可能是因为内容是动态加载的），则从第 1 页开始抓取
-            if len(parser.notices) == 0:
+            if state is not None:
+                current_page = state["next_page"]
+            elif len(analysis.html_notices) == 0 and not from_template:
                 print("初始页面未发现内容，尝试从第 1 页开始 POST 抓取...")
                 current_page = 1
             else:
                 current_page = start_page
                 
-            max_page = 70
-            consecutive_duplicates = 0
+            consecutive_duplicates = state["consecutive_duplicates"] if state is not None else 0
+            hint = analysis.page_count_hint(component_id) if analysis is not None else None
+            prefetched = {}
             
-            while current_page <= max_page:
-                time.sleep(1.0) # 增加延时到 1s，避免服务器拒绝
-                
-                # 更新页码参数
-                if method.upper() == "GET":
-                    # GET 方式：直接构造 URL
-                    # 格式: /?webpageId=...&componentId=page
-                    query_params = {
-                        "webpageId": webpage_id,
-                        component_id: str(current_page)
-                    }
-                    next_url = f"{base_url}?{urlencode(query_params)}"
-                    print(f"[{current_page}/{max_page}] 正在抓取第 {current_page} 页 (GET {next_url})...")
-                    try:
-                        html = fetch(next_url, timeout, "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36", referer=target_url)
-                    except Exception as e:
-                        print(f"[warn] 获取第 {current_page} 页失败: {e}")
-                        break
+            # Use initial_url as Referer if available, otherwise target_url
+            req_referer = initial_url if 'initial_url' in locals() else target_url
+            fetch_page_no = None
+            
+            # 请求间隔由 client 的自适应限速器控制 (按服务器延迟与错误率调整)，不再固定 sleep
+            if method.upper() == "GET":
+                # GET 方式的页码 URL 只由 webpageId 和组件页码决定，可以并发抓取，按页码顺序交付
+                fetch_page_no = get_page_fetcher(base_url, webpage_id, component_id, timeout, target_url, client)
+            elif (current_page <= 3 or state is not None) and (max_page or _page_limit(hint)) >= 3:
+                if state is not None:
+                    # 沿用中断前的翻页方式，不再探测
+                    stateless = state["parallel"]
+                elif history or lower_bound:
+                    # 增量运行通常只需要一两页，不为此多发探测请求，只沿用已知的结论
+                    with _stateless_post_lock:
+                        stateless = _stateless_post_sites.get(target_url)
                 else:
-                    # POST 方式
-                    # 注意：参数名就是 component_id
-                    current_form_data = form_data.copy()
-                    current_form_data[component_id] = str(current_page)
-                    
-                    print(f"[{current_page}/{max_page}] 正在抓取第 {current_page} 页 (POST to {target_url})...")
-                    # print(f"DEBUG: POST Data keys: {list(current_form_data.keys())}")
-                    
-                    # Use initial_url as Referer if available, otherwise target_url
-                    req_referer = initial_url if 'initial_url' in locals() else target_url
-                    
-                    try:
-                        html = fetch(target_url, timeout, "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36", data=current_form_data, referer=req_referer, extra_headers={"X-Requested-With": "XMLHttpRequest"})
-                        
-                        # DEBUG: Save first POST response - Removed for cleanup
-                        # if current_page == 1 or current_page == start_page:
-                        #      with open(f"d:\\pachong\\debug_post_page{current_page}.html", "w", encoding="utf-8") as f:
-                        #         f.write(html)
+                    # POST 方式：如果服务器接受第 1 页的 form 快照请求任意页码，同样可以并发抓取
+                    stateless = _probe_stateless_post(target_url, req_referer, form_data, component_id, timeout, client, concurrency, notices, prefetched)
+                    # 只保存确定的结论，无法判断时下次运行重新探测
+                    if template_cache is not None and stateless is not None:
+                        template_cache.set_stateless_post(template_key, stateless)
+                if stateless:
+                    fetch_page_no = get_post_page_fetcher(target_url, req_referer, form_data, component_id, timeout, client)
+            
+            if fetch_page_no is not None:
+                if max_page is None and not history and not watermark and state is None:
+                    # 完整抓取：先确定实际页数，探测时抓到的页直接用于翻页
+                    max_page = _discover_page_count(fetch_page_no, hint, notices, prefetched)
+                if until and max_page and state is None:
+                    # 日期范围回填：跳过所有通知都晚于 until 的页
+                    seek_page = find_first_page_until(fetch_page_no, until, current_page, max_page, prefetched)
+                    if seek_page > current_page:
+                        print(f"[info] 第 {current_page}-{seek_page - 1} 页的通知都晚于 {until}，从第 {seek_page} 页开始")
+                        current_page = seek_page
+                def is_last_page(page_notices):
+                    return (not page_notices or bool(history) and all(in_history(notice.get("link", "")) for notice in page_notices)
+                            or reached_lower_bound(page_notices))
+                def is_all_new(page_notices):
+                    return bool(page_notices) and not any(in_history(notice.get("link", "")) or out_of_range(notice) == "older"
+                                                          for notice in page_notices)
+                pages = iter_pages_concurrently(fetch_page_no, current_page, max_page or _page_limit(hint), concurrency, is_last_page,
+                                                {n: page for n, page in prefetched.items() if n >= current_page},
+                                                is_all_new if history or lower_bound else None)
+            else:
+                # 每页依赖上一页的 ViewState，无法探测任意页码，只参考分页栏
+                pages = iter_post_pages(target_url, req_referer, form_data, component_id, current_page, max_page or _page_limit(hint), timeout, client,
+                                        {n: page for n, page in prefetched.items() if n == current_page})
 
-                    except Exception as e:
-                        print(f"[warn] 获取第 {current_page} 页失败: {e}")
+            next_page = first_page = current_page
+            paging = True
+
+            try:
+                for current_page, analysis, error in pages:
+                    if error is not None:
+                        print(f"[warn] 获取第 {current_page} 页失败 (重试后仍失败): {error}")
+                        failed = True
                         break
 
-                # 优先尝试解析 JSON 数据
-                json_notices = parse_json_response(html)
-                current_notices = []
-                
-                if json_notices:
-                    # print(f"DEBUG: Found {len(json_notices)} notices via JSON")
-                    current_notices = json_notices
-                else:
-                    # 回退到 HTML 解析
-                    parser = NoticeParser()
-                    parser.feed(html)
-                    current_notices = parser.notices
+                    # 优先使用 JSON 数据，回退到 HTML 解析
+                    current_notices = analysis.json_notices or analysis.html_notices
                 
-                new_count = 0
-                page_has_history_item = False
+                    new_count = 0
+                    newer_count = 0
+                    page_has_history_item = False
                 
-                for notice in current_notices:
-                    link = notice.get("link", "")
-                    if link not in seen_links:
-                        seen_links.add(link)
+                    for notice in current_notices:
+                        link = notice.get("link", "")
+                        if link not in seen_links:
+                            seen_links.add(link)
                         
-                        if history and link in history:
-                            page_has_history_item = True
-                            continue # 跳过历史记录
+                            if in_history(link):
+                                page_has_history_item = True
+                                continue # 跳过历史记录
+                            position = out_of_range(notice)
+                            if position:
+                                newer_count += position == "newer"
+                                continue
                             
-                        all_notices.append(notice)
-                        new_count += 1
-                
-                print(f"  -> 本页发现 {len(current_notices)} 条通知，新增 {new_count} 条")
+                            all_notices.append(notice)
+                            new_count += 1
                 
-                # 如果本页发现了历史记录中的条目，且没有新条目（或者策略是只要遇到旧的就停止），则停止
-                # 假设是按时间倒序，一旦遇到旧的，后面都是旧的
-                if history and page_has_history_item and new_count == 0:
-                     print("遇到历史记录，停止抓取。")
-                     break
+                    print(f"  -> [{current_page}/{max_page or _page_limit(hint)}] 第 {current_page} 页发现 {len(current_notices)} 条通知，新增 {new_count} 条")
                 
-                if len(current_notices) == 0:
-                    print("当前页未发现任何通知，停止翻页")
-                    break
+                    # 如果本页发现了历史记录中的条目，且没有新条目（或者策略是只要遇到旧的就停止），则停止
+                    # 假设是按时间倒序，一旦遇到旧的，后面都是旧的
+                    if history and page_has_history_item and new_count == 0:
+                         print("遇到历史记录，停止抓取。")
+                         break
                 
-                # 尝试从当前页面更新 form_data (用于获取新的 __VIEWSTATE 等)
-                # 注意：这里也需要指定 target_component_id，否则可能提取到错误的 form
-                new_form_data = extract_form_data(html, target_component_id=component_id)
-                if new_form_data:
-                    # print(f"DEBUG: Updated form data from response. Keys: {list(new_form_data.keys())}")
-                    # 只更新隐藏字段，保留核心参数
-                    for k, v in new_form_data.items():
-                        if k not in ['webpageId', 'newsComponentId', component_id]:
-                            form_data[k] = v
-                else:
-                    print(f"[warn] 响应中未找到目标 Form ({component_id})，无法更新 ViewState，翻页可能失败。")
-                
-                # 如果连续两页内容完全一样（新增为0），可能是分页参数无效
-                # 用户反馈：有的标题前面几个字相同但是不同内容，不要轻易停止
-                # 改为：如果连续 3 页都没有新增内容，再停止
-                if new_count == 0:
-                    consecutive_duplicates += 1
-                    print(f"[warn] 本页未发现新内容 (连续 {consecutive_duplicates} 次)")
-                    if consecutive_duplicates >= 5:
-                        print("连续 5 页未发现新内容，停止翻页。")
+                    if len(current_notices) == 0:
+                        print("当前页未发现任何通知，停止翻页")
                         break
-                else:
-                    consecutive_duplicates = 0
 
-                current_page += 1
+                    if reached_lower_bound(current_notices):
+                        print("已到达高水位线/起始日期，停止翻页。")
+                        break
+                
+                    # 如果连续两页内容完全一样（新增为0），可能是分页参数无效
+                    # 用户反馈：有的标题前面几个字相同但是不同内容，不要轻易停止
+                    # 改为：如果连续 3 页都没有新增内容，再停止
+                    # (全部晚于 until 而被跳过的页不算)
+                    if new_count == 0 and newer_count == 0:
+                        consecutive_duplicates += 1
+                        print(f"[warn] 本页未发现新内容 (连续 {consecutive_duplicates} 次)")
+                        if consecutive_duplicates >= 5:
+                            print("连续 5 页未发现新内容，停止翻页。")
+                            break
+                    else:
+                        consecutive_duplicates = 0
+
+                    next_page = current_page + 1
+                    if cursor is not None and (next_page - first_page) % checkpoint_every == 0:
+                        save_checkpoint()
+                completed = not failed
+            finally:
+                # 提前结束时关闭生成器 (并发模式下取消尚未开始的请求)
+                pages.close()
 
     except KeyboardInterrupt:
         print("\n[info] 用户中断，正在保存已抓取的数据...")
     except Exception as e:
         print(f"\n[error] 发生错误: {e}，正在保存已抓取的数据...")
     finally:
+        if cursor is not None and paging:
+            if completed:
+                cursor.clear()
+            else:
+                save_checkpoint()
+                print(f"[info] 抓取进度已保存到 {cursor.path}，使用 --resume 从第 {next_page} 页继续")
         if output_file:
             with open(output_file, "w", encoding="utf-8") as f:
                 for notice in all_notices:
@@ -507,6 +991,9 @@ def crawl_notices(source: str, output_file: str, is_file: bool = False, timeout:
                     f.write("-" * 50 + "\n")
 
             print(f"全部完成。共采集通知 {len(all_notices)} 条，已写入 {output_file}")
+        print(f"[info] 网络统计: {client.stats.summary()}")
+        if client.rate_limiter is not None:
+            print(f"[info] 限速统计: {client.rate_limiter.summary()}")
             
     return all_notices
 
@@ -522,9 +1009,30 @@ if __name__ == "__main__":
     parser.add_argument("--start-page", type=int, default=2, help="起始页码 (默认为 2)")
     parser.add_argument("--method", default="POST", help="请求方法 (POST 或 GET)")
     parser.add_argument("--timeout", type=float, default=30.0, help="请求超时时间 (秒)")
+    parser.add_argument("--concurrency", type=int, default=4, help="GET 或无状态 POST 翻页时同时请求的页数 (默认 4，1 为逐页抓取)")
+    parser.add_argument("--template-cache", help="分页模板缓存文件 (如 list_templates.json)；有模板时跳过初始页面")
+    parser.add_argument("--cursor", help="抓取游标文件 (默认为 <输出文件>.cursor.json)，中断后可用 --resume 继续；不加 --resume 时删除已有的游标并从头抓取")
+    parser.add_argument("--resume", action="store_true", help="从抓取游标保存的进度继续")
+    parser.add_argument("--checkpoint-every", type=int, default=5, help="每抓取多少页保存一次抓取游标 (默认 5)")
+    parser.add_argument("--watermark", help="高水位线 (上次运行输出的最新发布时间，如 20250904143732)，不晚于它的通知不再抓取")
+    parser.add_argument("--since", type=parse_date_bound, help="只抓取该日期及之后发布的通知 (YYYY-MM-DD)")
+    parser.add_argument("--until", type=parse_date_bound, help="只抓取该日期及之前发布的通知 (YYYY-MM-DD)")
+    parser.add_argument("--max-page", type=int, help="最后抓取的页码 (默认自动确定；与 --start-page 一起可分段抓取)")
+    parser.add_argument("--max-rate", type=float, help="每个 host 的请求速率上限 (次/秒，默认 2)")
     args = parser.parse_args()
+    if args.max_rate:
+        configure_default_rate_limiter(max_rate=args.max_rate)
+    template_cache = ListTemplateCache(args.template_cache) if args.template_cache else None
+    cursor_path = args.cursor or f"{args.output}.cursor.json"
     
     if args.file:
-        crawl_notices(args.file, args.output, is_file=True, start_page=args.start_page, method=args.method, timeout=args.timeout)
+        notices = crawl_notices(args.file, args.output, is_file=True, start_page=args.start_page, method=args.method, timeout=args.timeout, concurrency=args.concurrency, max_page=args.max_page, template_cache=template_cache,
+                      cursor_path=cursor_path, resume=args.resume, checkpoint_every=args.checkpoint_every,
+                      watermark=args.watermark, since=args.since, until=args.until)
     else:
-        crawl_notices(args.url, args.output, is_file=False, start_page=args.start_page, method=args.method, timeout=args.timeout)
+        notices = crawl_notices(args.url, args.output, is_file=False, start_page=args.start_page, method=args.method, timeout=args.timeout, concurrency=args.concurrency, max_page=args.max_page, template_cache=template_cache,
+                      cursor_path=cursor_path, resume=args.resume, checkpoint_every=args.checkpoint_every,
+                      watermark=args.watermark, since=args.since, until=args.until)
+    if template_cache is not None:
+        template_cache.save()
+    print(f"[info] 高水位线: {newest_timestamp(notices, args.watermark) or '无'} (下次增量运行可传给 --watermark)")
@@ -0,0 +1,162 @@
+"""
+测试用的列表页：与学校网站相同的结构 (分页 form + ViewState、分页栏、sdata 脚本，第 1 页另有 HTML 卡片)。
+第 n 条通知 (从 0 开始) 按发布时间倒序排列，每天一条。
+"""
+import json
+from datetime import datetime, timedelta
+from list_page import analyze_list_page
+
+COMPONENT_ID = "a" * 32
+WEBPAGE_ID = "20190417141109v1ewezmjl1uf1hqy9h"
+HOST = "www.sdxd.edu.cn"
+NEWEST = datetime(2025, 9, 4, 14, 37, 32)
+
+def item_time(n: int) -> datetime:
+    return NEWEST - timedelta(days=n)
+
+def item_timestamp(n: int) -> str:
+    return item_time(n).strftime("%Y%m%d%H%M%S")
+
+def sdata_item(n: int) -> dict:
+    return {
+        "title": f"通知 {n}",
+        "sjall": item_time(n).strftime("%Y-%m-%d %H:%M"),
+        "url": f"//{HOST}/detail/{item_timestamp(n)}n{n}.html",
+        "Abstract": f"摘要 {n}",
+    }
+
+def page_items(page: int, total: int, per: int = 10) -> list[dict]:
+    """
+    共 total 条、每页 per 条时第 page 页的 sdata 项 (超出范围为空)。
+    """
+    return [sdata_item(n) for n in range((page - 1) * per, min(page * per, total))]
+
+def list_html(items: list[dict], page: int = 1, pager: int = None, cards: bool = False, viewstate: str = None) -> str:
+    """
+    列表页 HTML。pager: 分页栏显示的页数；cards: 同时输出 HTML 卡片 (链接保持 // 形式，与真实的第 1 页相同)。
+    """
+    card_html = "".join(
+        f'<a class="content-box" href="{item["url"]}"><article class="titletext">{item["title"]}</article>'
+        f'<span>{item["sjall"][8:10]}</span><em>{item["sjall"][:7]}</em></a>'
+        for item in items
+    ) if cards else ""
+    pager_html = "".join(f'<a href="/?webpageId={WEBPAGE_ID}&amp;{COMPONENT_ID}={p}">{p}</a>' for p in range(1, (pager or 0) + 1))
+    return (
+        f'<html><body><form method="post">'
+        f'<input type="hidden" name="__VIEWSTATE" value="{viewstate or f"VS{page}"}"/>'
+        f'<input type="hidden" name="newsComponentId" value="{COMPONENT_ID}"/></form>'
+        f'{card_html}<div class="pager">{pager_html}</div>'
+        f'<script>var sdata{COMPONENT_ID[:4]} = {json.dumps(items, ensure_ascii=False)};</script></body></html>'
+    )
+
+def list_page(page: int, total: int, per: int = 10, **options):
+    return analyze_list_page(list_html(page_items(page, total, per), page, **options))
+
+class PageServer:
+    """
+    假的 fetch_page_no：按页码返回 ListPage 并记录请求过的页码。
+    default_page: 页码超出范围时返回的页 (None 表示返回空页)，模拟对未知页码返回默认页的服务器。
+    """
+    def __init__(self, total: int, per: int = 10, default_page: int = None):
+        self.total = total
+        self.per = per
+        self.default_page = default_page
+        self.requests = []
+
+    @property
+    def page_count(self) -> int:
+        return -(-self.total // self.per)
+
+    def __call__(self, page_no: int):
+        self.requests.append(page_no)
+        if page_no > self.page_count and self.default_page is not None:
+            page_no = self.default_page
+        return list_page(page_no, self.total, self.per)
+
+class ListSite:
+    """
+    本地 HTTP 列表站点 (与学校网站的请求方式相同)，用于端到端测试 crawl_notices：
+    - GET /page/<webpageId>.html: 初始页面 (第 1 页，带 HTML 卡片)；
+    - GET /?webpageId=...&<组件ID>=<页码>: 第 n 页；
+    - POST /?webpageId=...: form 中组件 ID 字段为页码。stateful 时 ViewState 只对同一页和下一页有效，
+      过期的 ViewState 返回第 1 页 (与真实服务器相同)。
+    requests 记录每个请求 (方法, 页码)；fail_pages 中的页返回 500。用作上下文管理器。
+    """
+    def __init__(self, total: int, per: int = 10, stateful: bool = False, pager: int = None):
+        self.total = total
+        self.per = per
+        self.stateful = stateful
+        self.pager = pager
+        self.fail_pages = set()
+        self.requests = []
+        self.server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/page/{WEBPAGE_ID}.html"
+
+    def page_html(self, page: int, cards: bool = False) -> str:
+        return list_html(page_items(page, self.total, self.per), page, pager=self.pager, cards=cards)
+
+    def __enter__(self):
+        import threading
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+        from urllib.parse import urlsplit, parse_qs
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def reply(self, method, page, cards=False):
+                site.requests.append((method, page))
+                if page in site.fail_pages:
+                    self.send_response(500)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = site.page_html(page, cards).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                query = parse_qs(parts.query)
+                if parts.path.startswith("/page/"):
+                    return self.reply("GET", 1, cards=True)
+                return self.reply("GET", int(query.get(COMPONENT_ID, ["1"])[0]))
+
+            def do_POST(self):
+                form = parse_qs(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8"))
+                page = int(form.get(COMPONENT_ID, ["1"])[0])
+                if site.stateful:
+                    state_page = int(form.get("__VIEWSTATE", ["VS1"])[0][2:])
+                    if page not in (state_page, state_page + 1):
+                        page = 1
+                return self.reply("POST", page)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+def crawl(site: ListSite, tmp_path, **options) -> list[dict]:
+    """
+    用不限速的独立 client 抓取 site，返回 crawl_notices 的结果。
+    """
+    from http_client import HttpClient
+    from scrape_notices import crawl_notices
+    client = HttpClient(timeout=5, validator_cache=options.pop("validator_cache", None))
+    try:
+        return crawl_notices(site.url, str(tmp_path / "notices.txt"), client=client, **options)
+    finally:
+        client.close()
+
+def titles(notices: list[dict]) -> list[int]:
+    return [int(notice["title"].split()[-1]) for notice in notices]
@@ -0,0 +1,53 @@
+import sys
+import threading
+import pytest
+from http_client import FetchResult
+from image_cache import ImageCache
+
+@pytest.fixture
+def busy_switching():
+    # 缩短线程切换间隔，让计数的竞争更容易暴露
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+def hammer(worker, threads=8):
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+def test_image_cache_counters_are_exact_across_threads(tmp_path, busy_switching):
+    cache = ImageCache(str(tmp_path))
+    cache.put("http://h/a.png", {"Content-Type": "image/png"}, b"png")
+
+    def fetcher(headers):
+        return FetchResult("http://h/b.png", 404, {}, b"", 0)
+
+    def worker():
+        for _ in range(500):
+            cache.fetch("http://h/a.png", fetcher)
+            cache.fetch("http://h/b.png", fetcher)
+    hammer(worker)
+    assert (cache.hits, cache.misses) == (4000, 4000)
+
+def test_article_cache_counters_are_exact_across_threads(tmp_path, busy_switching):
+    from article_cache import ArticleCache
+    cache = ArticleCache(str(tmp_path))
+
+    def fetcher(headers):
+        return FetchResult("http://h/a.html", 200, {}, b"<html>body</html>", 0)
+
+    def extractor(html):
+        return "body"
+    cache.fetch("http://h/a.html", "markdown", fetcher, extractor)
+
+    def worker():
+        name = threading.current_thread().name
+        for i in range(200):
+            assert cache.fetch("http://h/a.html", "markdown", fetcher, extractor) == "body"
+            cache.fetch(f"http://h/{name}/{i}.html", "markdown", fetcher, extractor)
+    hammer(worker)
+    assert (cache.hits, cache.misses) == (1600, 1601)
@@ -0,0 +1,49 @@
+import pytest
+import scrape_notices
+from crawl_cursor import CrawlCursor
+from list_fixtures import ListSite, crawl, item_timestamp, titles
+
+@pytest.fixture(autouse=True)
+def fresh_post_memo(monkeypatch):
+    monkeypatch.setattr(scrape_notices, "_stateless_post_sites", {})
+
+def test_cursor_round_trip(tmp_path):
+    cursor = CrawlCursor(str(tmp_path / "c.json"))
+    cursor.save("http://a/page/x.html", "post", 7, 20, "c" * 32, "http://a/?webpageId=x", {"__VIEWSTATE": "VS6"},
+                False, [{"title": "t", "link": "/l"}], {"/l"}, 1)
+    state = cursor.load("http://a/page/x.html", "POST")
+    assert state["next_page"] == 7 and state["form_data"] == {"__VIEWSTATE": "VS6"} and state["seen_links"] == ["/l"]
+    # 其他来源或请求方法的游标不使用
+    assert cursor.load("http://b/page/x.html", "POST") is None
+    assert cursor.load("http://a/page/x.html", "GET") is None
+    assert cursor.clear() and not cursor.clear()
+
+@pytest.mark.parametrize("method, stateful", [("GET", False), ("POST", True)])
+def test_resume_after_failure_matches_uninterrupted_crawl(tmp_path, method, stateful):
+    cursor_path = str(tmp_path / "notices.cursor.json")
+    with ListSite(95, stateful=stateful) as site:
+        expected = titles(crawl(site, tmp_path, method=method, max_page=10))
+
+        site.fail_pages = {7}
+        partial = crawl(site, tmp_path, method=method, max_page=10, cursor_path=cursor_path, checkpoint_every=2)
+        assert titles(partial) == list(range(60))
+
+        # 逐页 POST 时游标中保存的是第 6 页响应的 ViewState，恢复后第 7 页的请求仍然有效
+        site.fail_pages = set()
+        site.requests.clear()
+        resumed = crawl(site, tmp_path, method=method, max_page=10, cursor_path=cursor_path, resume=True)
+    assert titles(resumed) == expected == list(range(95))
+    assert min(page for _, page in site.requests) == 7
+    assert not CrawlCursor(cursor_path).clear()
+
+def test_fresh_crawl_removes_stale_cursor(tmp_path):
+    cursor_path = str(tmp_path / "notices.cursor.json")
+    with ListSite(95) as site:
+        site.fail_pages = {4}
+        crawl(site, tmp_path, method="GET", max_page=10, cursor_path=cursor_path)
+        assert CrawlCursor(cursor_path).load(site.url, "GET")["next_page"] == 4
+
+        # 不使用 --resume 的抓取 (这里在第 1 页就到达高水位线，不会翻页) 也要删除过时的游标
+        site.fail_pages = set()
+        assert titles(crawl(site, tmp_path, method="GET", cursor_path=cursor_path, watermark=item_timestamp(3))) == [0, 1, 2]
+    assert not CrawlCursor(cursor_path).clear()
@@ -0,0 +1,81 @@
+import pytest
+import scrape_notices
+from list_page import timestamp_before, newest_timestamp
+from headless_runner import next_watermark
+from scrape_notices import find_first_page_until, parse_date_bound
+from list_fixtures import ListSite, PageServer, crawl, item_time, item_timestamp, titles
+
+@pytest.fixture(autouse=True)
+def fresh_post_memo(monkeypatch):
+    monkeypatch.setattr(scrape_notices, "_stateless_post_sites", {})
+
+def day(n):
+    return item_time(n).strftime("%Y-%m-%d")
+
+def test_timestamp_before_precision():
+    assert timestamp_before("20250903", "20250904143732")
+    assert not timestamp_before("20250904", "20250904143732")
+    assert not timestamp_before("20250904143732", "20250904143732")
+    # 高水位线：两者都是完整时间戳时相等也算；日期精度仍按同一天处理
+    assert timestamp_before("20250904143732", "20250904143732", or_equal=True)
+    assert not timestamp_before("20250904", "20250904143732", or_equal=True)
+
+def test_newest_timestamp_prefers_full_precision():
+    notices = [{"link": "/detail/20250903120000a.html"}, {"date": "2025-09-04"}]
+    assert newest_timestamp(notices, "20250901") == "20250904"
+    assert newest_timestamp([{"link": "/detail/20250904120000a.html"}], "20250904") == "20250904120000"
+
+def test_parse_date_bound():
+    assert parse_date_bound("2025-9-4") == parse_date_bound("2025/09/04") == "20250904"
+    with pytest.raises(ValueError):
+        parse_date_bound("2025-13-01")
+
+def test_find_first_page_until():
+    server = PageServer(500)
+    prefetched = {}
+    # 第 n 条每天一条、每页 10 条：until 为第 137 条的日期时从第 14 页开始
+    assert find_first_page_until(server, parse_date_bound(day(137)), 2, 50, prefetched) == 14
+    assert len(server.requests) <= 7
+    assert set(server.requests) == set(prefetched)
+    server.requests.clear()
+    assert find_first_page_until(server, parse_date_bound(day(3)), 2, 50, {}) == 2
+    assert server.requests == [2]
+
+@pytest.mark.parametrize("method", ["GET", "POST"])
+def test_watermark_is_exclusive(tmp_path, method):
+    with ListSite(95) as site:
+        notices = crawl(site, tmp_path, method=method, watermark=item_timestamp(15))
+    assert titles(notices) == list(range(15))
+    # 初始页面 + 第 2 页 (第 2 页最后一条已不晚于高水位线)
+    assert len(site.requests) == 2
+
+def test_watermark_inside_first_page_needs_one_request(tmp_path):
+    with ListSite(95) as site:
+        assert titles(crawl(site, tmp_path, watermark=item_timestamp(5))) == list(range(5))
+    assert len(site.requests) == 1
+
+def test_chained_watermarks_do_not_repeat_items(tmp_path):
+    with ListSite(95) as site:
+        first = crawl(site, tmp_path, watermark=item_timestamp(15))
+        watermark = newest_timestamp(first, item_timestamp(15))
+        assert crawl(site, tmp_path, watermark=watermark) == []
+
+def test_since_is_inclusive(tmp_path):
+    with ListSite(95) as site:
+        notices = crawl(site, tmp_path, method="GET", since=day(25))
+    assert titles(notices) == list(range(26))
+
+def test_until_skips_newer_pages(tmp_path):
+    with ListSite(95, pager=10) as site:
+        notices = crawl(site, tmp_path, method="GET", since=day(65), until=day(52))
+    assert titles(notices) == list(range(52, 66))
+    # 第 2-5 页都晚于 until，二分查找时只请求其中一部分
+    assert ("GET", 3) not in site.requests
+
+def test_next_watermark_stays_below_failed_items():
+    processed = [{"link": f"/detail/{item_timestamp(n)}n{n}.html"} for n in (0, 1, 3)]
+    failed = [{"link": f"/detail/{item_timestamp(2)}n2.html"}]
+    watermark = next_watermark(None, processed, failed)
+    assert timestamp_before(watermark, item_timestamp(2))
+    assert not timestamp_before(watermark, item_timestamp(3), or_equal=True)
+    assert next_watermark(None, processed, []) == item_timestamp(0)
@@ -0,0 +1,50 @@
+import pytest
+from scrape_notices import DEFAULT_MAX_PAGE, DISCOVERY_FACTOR, discover_page_count, _discover_page_count
+from list_fixtures import PageServer, list_page
+
+def count_pages(server, hint=None, known_page=1):
+    return discover_page_count(lambda page_no: bool(server(page_no).notices), hint, known_page)
+
+@pytest.mark.parametrize("total", [5, 10, 11, 95, 540, 2000])
+def test_finds_last_page_without_hint(total):
+    server = PageServer(total)
+    page_count, probes = count_pages(server)
+    assert page_count == server.page_count
+    assert probes == len(server.requests) <= 16
+
+def test_pager_hint_needs_two_requests():
+    server = PageServer(540)
+    assert count_pages(server, hint=54) == (54, 2)
+    assert server.requests == [54, 55]
+
+def test_short_pager_hint_is_a_lower_bound():
+    # 分页栏只显示附近 10 页
+    server = PageServer(540)
+    page_count, probes = count_pages(server, hint=10)
+    assert page_count == 54
+    assert probes <= 14
+
+def test_empty_first_page():
+    assert count_pages(PageServer(0), known_page=0)[0] == 0
+
+def test_probing_is_capped():
+    # 任何页码都返回新内容的服务器：最多探测到 _page_limit 的 DISCOVERY_FACTOR 倍
+    page_count, probes = count_pages(PageServer(10 ** 6))
+    assert page_count == DEFAULT_MAX_PAGE * DISCOVERY_FACTOR
+    assert probes <= 12
+
+def test_default_page_for_out_of_range_numbers_counts_as_past_the_end():
+    # 对超出范围的页码返回第 1 页的服务器
+    server = PageServer(95, default_page=1)
+    prefetched = {}
+    page_count = _discover_page_count(server, None, list_page(1, 95).notices, prefetched)
+    assert page_count == 10
+    assert len(server.requests) <= 8
+    assert all(page.notices for n, page in prefetched.items() if n <= page_count)
+
+def test_default_last_page_stays_bounded():
+    # 对超出范围的页码返回最后一页的服务器：只有第一个超出的探测点无法识别，结果不超过实际页数的两倍
+    server = PageServer(300, default_page=30)
+    page_count = _discover_page_count(server, None, list_page(1, 300).notices, {})
+    assert 30 <= page_count < 60
+    assert len(server.requests) <= 12
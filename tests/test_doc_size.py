@@ -0,0 +1,39 @@
+import zlib
+from article_processor import DocSizeEstimator
+
+class FakeDoc:
+    def __init__(self, size):
+        self.size = size
+
+    def save(self, buffer):
+        buffer.write(b"x" * self.size)
+
+def test_real_size_is_checked_rarely_near_the_limit():
+    limit = 10 * 1024 * 1024
+    estimator = DocSizeEstimator(limit)
+    estimator.reset(FakeDoc(30000))
+    text = "正文" * 2000
+    per_article = len(zlib.compress(text.encode("utf-8"))) * 3 + 5000
+    actual, checks, articles = 30000, 0, 0
+    while actual <= limit:
+        estimator.add(text, 5000)
+        actual += per_article
+        articles += 1
+        if estimator.needs_check():
+            checks += 1
+            estimator.calibrate(actual)
+    # 实际 XML 系数 (3) 与初始值 (2) 不同：仍在超出上限的那一篇就核实到，而且只保存了几次
+    assert estimator.needs_check()
+    assert checks <= 12 < articles // 10
+
+def test_plenty_of_headroom_stops_checks():
+    estimator = DocSizeEstimator(1000, margin=0.5)
+    estimator.reset(FakeDoc(0))
+    estimator.add("", 600)
+    assert estimator.needs_check()
+    # 核实后实际为 600 字节：剩余 400，估算值再增长 200 之前不再核实
+    estimator.calibrate(600)
+    estimator.add("", 150)
+    assert not estimator.needs_check()
+    estimator.add("", 100)
+    assert estimator.needs_check()
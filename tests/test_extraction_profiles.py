@@ -0,0 +1,17 @@
+from bs4 import BeautifulSoup
+from extraction_profiles import ExtractionProfiles
+
+def article(n, boilerplate=False):
+    paragraphs = "".join(f"<p>第 {n} 篇的第 {i} 段正文。</p>" for i in range(4))
+    extra = "<p>打印本页 关闭窗口</p>" if boilerplate else ""
+    return BeautifulSoup(f"<div>{paragraphs}{extra}</div>", "html.parser").div
+
+def test_new_fingerprints_survive_pruning_at_capacity():
+    profiles = ExtractionProfiles(path=None, min_pages=3, min_ratio=0.1, max_fingerprints=20)
+    # 先用只出现一次的正文段落把指纹表填满
+    for n in range(10):
+        profiles.strip_boilerplate("h", f"http://h/{n}.html", article(n))
+    removed = [profiles.strip_boilerplate("h", f"http://h/b{n}.html", article(100 + n, boilerplate=True)) for n in range(5)]
+    # 新出现的模板块在容量已满时仍能累计次数，第 3 次出现后开始删除
+    assert removed == [0, 0, 1, 1, 1]
+    assert len(profiles.hosts["h"]["fingerprints"]) <= 20
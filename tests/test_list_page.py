@@ -0,0 +1,33 @@
+import json
+import pytest
+from list_page import HAS_LXML, analyze_list_page, iter_sdata_items, parse_sdata
+from list_fixtures import COMPONENT_ID, list_html, page_items
+
+def test_sdata_string_containing_bracket_semicolon():
+    # 旧的非贪婪正则会在字符串中的 "];" 处截断数组
+    items = [{"title": "含有 ]; 的标题", "url": "//h/detail/1.html", "sjall": "2025-09-04 10:00"}, {"title": "第二条", "url": "/detail/2.html"}]
+    text = f"<script>var sdataAbcd = {json.dumps(items, ensure_ascii=False)};</script>"
+    notices = parse_sdata(text)
+    assert [notice["title"] for notice in notices] == ["含有 ]; 的标题", "第二条"]
+    assert notices[0]["link"] == "https://h/detail/1.html" and notices[0]["date"] == "2025-09-04"
+
+def test_sdata_empty_missing_and_malformed():
+    assert parse_sdata("var sdataX = [ ];") == []
+    assert parse_sdata("<html>no data</html>") == []
+    assert parse_sdata('var sdataX = [{"title": "a"} {"title": "b"}];') == []
+
+def test_sdata_items_are_decoded_lazily():
+    # 只取第一条时，后面格式错误的元素不会被解码
+    text = 'var sdataX = [{"title": "a"}, {broken'
+    assert next(iter_sdata_items(text)) == {"title": "a"}
+
+@pytest.mark.parametrize("parser", ["lxml", "html.parser"] if HAS_LXML else ["html.parser"])
+def test_single_pass_analysis(parser):
+    items = page_items(1, 95)
+    page = analyze_list_page(list_html(items, pager=10, cards=True), parser=parser)
+    assert [notice["title"] for notice in page.html_notices] == [item["title"] for item in items]
+    assert page.notices == page.json_notices
+    assert [notice["title"] for notice in page.json_notices] == [item["title"] for item in items]
+    assert page.link_component_id == COMPONENT_ID
+    assert page.form_data(COMPONENT_ID)["__VIEWSTATE"] == "VS1"
+    assert page.page_count_hint(COMPONENT_ID) == 10
@@ -0,0 +1,81 @@
+import pytest
+import scrape_notices
+from http_cache import ValidatorCache
+from list_templates import ListTemplateCache
+from list_fixtures import COMPONENT_ID, ListSite, crawl
+
+@pytest.fixture(autouse=True)
+def fresh_post_memo(monkeypatch):
+    monkeypatch.setattr(scrape_notices, "_stateless_post_sites", {})
+
+def test_template_data_page_has_its_own_validator_entry(tmp_path):
+    validators = ValidatorCache()
+    templates = ListTemplateCache()
+    history = {"//www.sdxd.edu.cn/detail/old.html"}
+    with ListSite(25) as site:
+        crawl(site, tmp_path, history=history, validator_cache=validators, template_cache=templates)
+        page_entry = dict(validators.entries[site.url])
+        data_key = f"{site.url}#{COMPONENT_ID}=1"
+
+        # 第二次运行按模板直接请求第 1 页数据，记录在单独的键下，不覆盖初始页面的验证器
+        crawl(site, tmp_path, history=history, validator_cache=validators, template_cache=templates)
+        assert validators.entries[site.url] == page_entry
+        assert data_key in validators.entries
+
+        # 第 1 页数据未变化：只发一个请求，不解析
+        site.requests.clear()
+        assert crawl(site, tmp_path, history=history, validator_cache=validators, template_cache=templates) == []
+        assert site.requests == [("POST", 1)]
+
+    # 后续处理失败时丢弃列表页 URL，第 1 页数据的记录一并丢弃
+    validators.discard(site.url)
+    assert not validators.entries
+
+def test_template_skips_initial_page(tmp_path):
+    templates = ListTemplateCache()
+    with ListSite(25) as site:
+        first = crawl(site, tmp_path, template_cache=templates)
+        assert site.requests[0] == ("GET", 1)
+        assert templates.get(site.url)["component_id"] == COMPONENT_ID
+
+        site.requests.clear()
+        assert [notice["title"] for notice in crawl(site, tmp_path, template_cache=templates)] == [notice["title"] for notice in first]
+        assert site.requests[0] == ("POST", 1)
+        assert ("GET", 1) not in site.requests
+
+def test_template_run_recognises_history_from_html_cards(tmp_path):
+    # history 中第 1 页的链接是 HTML 卡片的 //host/... 形式，按模板请求的第 1 页数据来自 sdata (https://host/...)
+    templates = ListTemplateCache()
+    with ListSite(25) as site:
+        history = {notice["link"] for notice in crawl(site, tmp_path, template_cache=templates)}
+        assert any(link.startswith("//") for link in history)
+        assert crawl(site, tmp_path, history=history, template_cache=templates) == []
+
+def test_stale_template_falls_back_to_initial_page(tmp_path):
+    templates = ListTemplateCache()
+    with ListSite(25) as site:
+        templates.update(site.url, "b" * 32, f"{site.url}?old", {"__VIEWSTATE": "old"})
+        notices = crawl(site, tmp_path, template_cache=templates)
+        assert len(notices) == 25
+        assert ("GET", 1) in site.requests
+    # 重新检测到的组件 ID 替换了失效的模板
+    assert templates.get(site.url)["component_id"] == COMPONENT_ID
+
+def test_stateless_verdict_survives_only_same_target(tmp_path):
+    path = str(tmp_path / "list_templates.json")
+    templates = ListTemplateCache(path)
+    templates.update("key", COMPONENT_ID, "http://a/?webpageId=x", {"f": "1"})
+    templates.set_stateless_post("key", True)
+    templates.save()
+
+    templates = ListTemplateCache(path)
+    entry = templates.get("key")
+    assert entry["stateless_post"] is True and entry["form"] == {"f": "1"}
+    # get() 返回副本
+    entry["form"]["f"] = "2"
+    assert templates.get("key")["form"] == {"f": "1"}
+
+    templates.update("key", COMPONENT_ID, "http://a/?webpageId=x", {"f": "3"})
+    assert templates.get("key")["stateless_post"] is True
+    templates.update("key", "b" * 32, "http://a/?webpageId=x", {})
+    assert templates.get("key")["stateless_post"] is None
@@ -0,0 +1,79 @@
+import threading
+import time
+from scrape_notices import iter_pages_concurrently
+from list_fixtures import PageServer
+
+def collect(pages, stop=None):
+    delivered = []
+    try:
+        for page_no, analysis, error in pages:
+            assert error is None
+            delivered.append(page_no)
+            if stop is not None and stop(page_no, analysis):
+                break
+    finally:
+        pages.close()
+    return delivered
+
+def test_pages_are_delivered_in_order():
+    server = PageServer(200)
+    lock = threading.Lock()
+
+    def slow_first(page_no):
+        # 页码小的页返回得更慢，交付顺序仍按页码
+        time.sleep(0.02 if page_no % 3 == 0 else 0)
+        with lock:
+            return server(page_no)
+    assert collect(iter_pages_concurrently(slow_first, 2, 12, concurrency=4)) == list(range(2, 13))
+
+def test_last_page_stops_submitting():
+    server = PageServer(45)
+    delivered = collect(iter_pages_concurrently(server, 2, 70, concurrency=4, is_last_page=lambda notices: not notices),
+                        stop=lambda page_no, analysis: not analysis.notices)
+    assert delivered == [2, 3, 4, 5, 6]
+    assert max(server.requests) <= 6 + 4 * 2
+
+def test_prefetched_pages_are_not_requested_again():
+    server = PageServer(60)
+    prefetched = {2: server(2), 3: server(3)}
+    server.requests.clear()
+    assert collect(iter_pages_concurrently(server, 2, 6, concurrency=2, prefetched=prefetched)) == [2, 3, 4, 5, 6]
+    assert sorted(server.requests) == [4, 5, 6]
+
+def test_incremental_run_does_not_fetch_ahead():
+    # 第 2 页已有旧内容：增量运行只请求这一页
+    server = PageServer(500)
+    pages = iter_pages_concurrently(server, 2, 70, concurrency=4, is_all_new=lambda notices: False)
+    assert collect(pages, stop=lambda page_no, analysis: True) == [2]
+    assert server.requests == [2]
+
+def fetch_log(server, delivered, log, delay=0.0):
+    # 记录每次请求发出时已经交付了多少页
+    def fetch_page_no(page_no):
+        log[page_no] = len(delivered)
+        time.sleep(delay)
+        return server(page_no)
+    return fetch_page_no
+
+def run(fetch_page_no, delivered, **options):
+    pages = iter_pages_concurrently(fetch_page_no, 2, 13, concurrency=4, **options)
+    try:
+        for page_no, analysis, error in pages:
+            assert error is None
+            delivered.append(page_no)
+    finally:
+        pages.close()
+
+def test_window_stays_at_one_page_until_pages_are_all_new():
+    delivered, log = [], {}
+    run(fetch_log(PageServer(500), delivered, log), delivered, is_all_new=lambda notices: False)
+    assert delivered == list(range(2, 14))
+    assert all(log[page_no] == page_no - 2 for page_no in delivered)
+
+def test_window_widens_after_all_new_pages():
+    delivered, log = [], {}
+    run(fetch_log(PageServer(500), delivered, log, delay=0.02), delivered, is_all_new=lambda notices: True)
+    assert delivered == list(range(2, 14))
+    # 第 2 页之后才请求第 3 页，窗口逐步加倍后可以提前好几页
+    assert log[3] == 1
+    assert min(log[page_no] - (page_no - 2) for page_no in delivered) <= -4
@@ -0,0 +1,16 @@
+import rate_limiter
+from rate_limiter import HostRateLimiter, configure_default_rate_limiter, get_default_rate_limiter
+
+def test_default_ceiling_is_polite():
+    limiter = HostRateLimiter()
+    for _ in range(200):
+        limiter.report(latency=0.05, status_code=200)
+    assert limiter.rate <= 2.0
+
+def test_ceiling_can_be_raised_explicitly(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "_default_rate_limiter", None)
+    configure_default_rate_limiter(max_rate=8.0)
+    host = get_default_rate_limiter()._host("http://h/")
+    for _ in range(200):
+        host.report(latency=0.05, status_code=200)
+    assert 2.0 < host.rate <= 8.0
@@ -0,0 +1,16 @@
+from retry_policy import RetryBudget
+
+def test_budget_is_capped():
+    budget = RetryBudget(ratio=0.2, min_tokens=10, max_tokens=50)
+    for _ in range(100000):
+        budget.deposit()
+    assert budget.tokens == budget.max_tokens == 50
+    # 长时间正常运行之后，故障时最多先连续重试 max_tokens 次
+    assert sum(budget.withdraw() for _ in range(1000)) == 50
+
+def test_budget_refills_at_ratio():
+    budget = RetryBudget(ratio=0.2, min_tokens=1, max_tokens=50)
+    assert budget.withdraw() and not budget.withdraw()
+    for _ in range(5):
+        budget.deposit()
+    assert budget.withdraw() and not budget.withdraw()
@@ -0,0 +1,37 @@
+from list_page import analyze_list_page, link_key
+from scrape_notices import probe_stateless_post
+from list_fixtures import PageServer, list_html, page_items
+
+def first_page_cards(total):
+    # 真实的第 1 页：HTML 卡片中的链接是 //host/...，sdata 翻页结果被改写为 https://host/...
+    return analyze_list_page(list_html(page_items(1, total), cards=True)).html_notices
+
+def test_link_key_ignores_scheme_and_host():
+    assert link_key("//www.sdxd.edu.cn/detail/1.html") == link_key("https://www.sdxd.edu.cn/detail/1.html") == "/detail/1.html"
+    assert link_key("/detail/1.html?a=1") == "/detail/1.html?a=1"
+
+def test_stateless_when_pages_are_distinct():
+    server = PageServer(95)
+    stateless, pages = probe_stateless_post(server, first_page_cards(95))
+    assert stateless is True
+    assert sorted(pages) == [2, 3]
+    assert pages[3].notices[0]["title"] == "通知 20"
+
+def test_stale_viewstate_answered_with_first_page():
+    # 服务器对过期的 ViewState 返回第 1 页：第 2 页正常，第 3 页重复第 1 页 (链接形式不同)
+    def fetch_page_no(page_no):
+        server_page = page_no if page_no == 2 else 1
+        return analyze_list_page(list_html(page_items(server_page, 95), server_page))
+    stateless, pages = probe_stateless_post(fetch_page_no, first_page_cards(95))
+    assert stateless is False
+    assert sorted(pages) == [2]
+
+def test_ambiguous_when_a_page_is_empty():
+    stateless, pages = probe_stateless_post(PageServer(15), first_page_cards(15))
+    assert stateless is None
+    assert sorted(pages) == [2]
+
+def test_ambiguous_without_first_page_notices():
+    stateless, pages = probe_stateless_post(PageServer(95), [])
+    assert stateless is None
+    assert sorted(pages) == [2]